@@ -0,0 +1,106 @@
+"""
+Бенчмарк списка записей: ORM + pydantic (прежний путь) против выборки
+колонок + orjson (текущий путь GET /api/appointments).
+
+Данные создаются во временной SQLite в памяти. Для каждого пути измеряются
+количество запросов в секунду и пиковое потребление памяти (tracemalloc).
+
+Запуск:
+    python -m benchmarks.bench_appointments_list [количество_записей]
+"""
+import asyncio
+import datetime
+import sys
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import selectinload
+
+from database.models import Appointment, User, Service
+from database.session import Base
+from miniapp.routers.appointments import AppointmentResponse, fetch_appointment_rows
+
+ROUNDS = 5
+
+async def seed(session: AsyncSession, count: int) -> None:
+    users = [User(telegram_id=1000 + i, username=f"user{i}", full_name=f"Клиент {i}") for i in range(200)]
+    services = [Service(name=f"Услуга {i}", duration_minutes=60, price=1500.0) for i in range(10)]
+    session.add_all(users + services)
+    await session.flush()
+
+    start = datetime.datetime(2024, 1, 1, 9, 0)
+    session.add_all(
+        Appointment(
+            user_id=users[i % len(users)].id,
+            service_id=services[i % len(services)].id,
+            start_time=start + datetime.timedelta(hours=i),
+            end_time=start + datetime.timedelta(hours=i, minutes=60),
+            status="confirmed",
+            created_at=start,
+        )
+        for i in range(count)
+    )
+    await session.commit()
+
+async def orm_path(session: AsyncSession, limit: int) -> bytes:
+    result = await session.execute(
+        select(Appointment)
+        .options(selectinload(Appointment.user), selectinload(Appointment.service))
+        .order_by(Appointment.start_time.desc(), Appointment.id.desc())
+        .limit(limit)
+    )
+    items = [
+        AppointmentResponse(
+            id=app.id,
+            user_id=app.user_id,
+            user_name=app.user.full_name,
+            user_username=app.user.username,
+            service_id=app.service_id,
+            service_name=app.service.name,
+            start_time=app.start_time,
+            end_time=app.end_time,
+            status=app.status,
+            created_at=app.created_at
+        )
+        for app in result.scalars().all()
+    ]
+    return JSONResponse(jsonable_encoder({"items": items, "next_cursor": None, "total": None})).body
+
+async def projection_path(session: AsyncSession, limit: int) -> bytes:
+    items = await fetch_appointment_rows(session, None, None, None, None, None, limit)
+    return ORJSONResponse({"items": items, "next_cursor": None, "total": None}).body
+
+async def measure(session_pool, func, limit: int) -> tuple[float, float]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        # Новая сессия на каждый запрос, как в get_async_session
+        async with session_pool() as session:
+            await func(session, limit)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ROUNDS / elapsed, peak / 1024 / 1024
+
+async def main(count: int) -> None:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_pool = async_sessionmaker(engine, expire_on_commit=False)
+
+    async with session_pool() as session:
+        await seed(session, count)
+
+    print(f"Записей: {count}")
+    for name, func in (("ORM + pydantic", orm_path), ("Колонки + orjson", projection_path)):
+        rps, peak_mb = await measure(session_pool, func, count)
+        print(f"{name:<20} {rps:8.2f} запр/с   пик памяти {peak_mb:8.1f} МБ")
+
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
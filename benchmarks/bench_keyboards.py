@@ -0,0 +1,51 @@
+"""
+Бенчмарк отрисовки клавиатур календаря и временных слотов.
+
+Сравнивает время одного вызова без кэша (кэш сбрасывается перед каждым вызовом)
+и с прогретым кэшем.
+
+Запуск:
+    python -m benchmarks.bench_keyboards
+"""
+import datetime
+import timeit
+
+from utils.keyboards import (
+    calendar_keyboard, render_calendar_keyboard,
+    time_slots_keyboard, render_time_slots_keyboard
+)
+
+ITERATIONS = 2000
+
+def _per_call_us(func, iterations: int = ITERATIONS) -> float:
+    return timeit.timeit(func, number=iterations) / iterations * 1_000_000
+
+def main() -> None:
+    today = datetime.date.today()
+    available_dates = {today + datetime.timedelta(days=i) for i in range(60) if i % 7 not in (5, 6)}
+    time_slots = [datetime.time(9 + i // 2, 30 * (i % 2)) for i in range(18)]
+
+    def calendar_cold():
+        render_calendar_keyboard.cache_clear()
+        calendar_keyboard(today.year, today.month, available_dates)
+
+    def calendar_warm():
+        calendar_keyboard(today.year, today.month, available_dates)
+
+    def slots_cold():
+        render_time_slots_keyboard.cache_clear()
+        time_slots_keyboard(time_slots)
+
+    def slots_warm():
+        time_slots_keyboard(time_slots)
+
+    for name, func in (
+        ("calendar_keyboard (без кэша)", calendar_cold),
+        ("calendar_keyboard (с кэшем)", calendar_warm),
+        ("time_slots_keyboard (без кэша)", slots_cold),
+        ("time_slots_keyboard (с кэшем)", slots_warm),
+    ):
+        print(f"{name:<35} {_per_call_us(func):10.1f} мкс/вызов")
+
+if __name__ == "__main__":
+    main()
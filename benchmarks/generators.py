@@ -0,0 +1,127 @@
+"""
+Генераторы синтетических данных для бенчмарков планирования.
+
+Масштаб задается классом Scale: количество услуг, записей в день, выходных
+и длина горизонта планирования. Данные строятся детерминированно
+(фиксированное зерно), чтобы результаты разных запусков были сравнимы.
+"""
+import datetime
+import random
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import User, Service, Appointment, WorkSchedule, Holiday, Settings
+
+TIMEZONE = "Europe/Moscow"
+WORK_START = datetime.time(9, 0)
+WORK_END = datetime.time(21, 0)
+
+@dataclass(frozen=True)
+class Scale:
+    """
+    Масштаб синтетических данных.
+
+    Attributes:
+        name (str): Имя масштаба (используется в ключах результатов).
+        services (int): Количество услуг.
+        appointments_per_day (int): Количество записей в день.
+        holidays (int): Количество выходных дней в пределах горизонта.
+        horizon_days (int): Горизонт планирования в днях.
+    """
+    name: str
+    services: int
+    appointments_per_day: int
+    holidays: int
+    horizon_days: int
+
+SCALES = (
+    Scale("small", services=3, appointments_per_day=4, holidays=2, horizon_days=30),
+    Scale("medium", services=20, appointments_per_day=12, holidays=20, horizon_days=90),
+    Scale("large", services=100, appointments_per_day=24, holidays=100, horizon_days=365),
+)
+
+def generate_services(count: int) -> list[Service]:
+    """
+    Возвращает услуги длительностью от 30 до 120 минут.
+    """
+    return [
+        Service(name=f"Услуга {i}", duration_minutes=30 + 15 * (i % 7), price=1000.0 + 100 * i, active=True)
+        for i in range(count)
+    ]
+
+def generate_schedule() -> list[WorkSchedule]:
+    """
+    Возвращает расписание: Пн-Сб рабочие дни, воскресенье выходной.
+    """
+    return [
+        WorkSchedule(weekday=weekday, start_time=WORK_START, end_time=WORK_END, is_working=weekday != 6)
+        for weekday in range(7)
+    ]
+
+def generate_day_appointments(
+    date: datetime.date,
+    per_day: int,
+    service_ids: list[int],
+    user_ids: list[int],
+    rng: random.Random
+) -> list[Appointment]:
+    """
+    Возвращает записи одного дня, равномерно распределенные по рабочему времени.
+    Время хранится в UTC без часового пояса (как его возвращает SQLite).
+    """
+    utc_offset = datetime.timedelta(hours=3)  # Europe/Moscow
+    work_minutes = (WORK_END.hour - WORK_START.hour) * 60
+    step = work_minutes // max(per_day, 1)
+    day_start = datetime.datetime.combine(date, WORK_START) - utc_offset
+    appointments = []
+    for i in range(per_day):
+        start_time = day_start + datetime.timedelta(minutes=i * step)
+        appointments.append(Appointment(
+            user_id=rng.choice(user_ids) if user_ids else None,
+            service_id=rng.choice(service_ids) if service_ids else None,
+            start_time=start_time,
+            end_time=start_time + datetime.timedelta(minutes=min(step, 60)),
+            status=rng.choice(("confirmed", "confirmed", "confirmed", "pending", "cancelled")),
+        ))
+    return appointments
+
+def generate_holiday_dates(count: int, start: datetime.date, horizon_days: int, rng: random.Random) -> list[datetime.date]:
+    """
+    Возвращает неповторяющиеся даты выходных в пределах горизонта.
+    """
+    offsets = rng.sample(range(horizon_days), min(count, horizon_days))
+    return sorted(start + datetime.timedelta(days=offset) for offset in offsets)
+
+async def seed_database(session: AsyncSession, scale: Scale, seed: int = 1) -> None:
+    """
+    Заполняет пустую базу данными указанного масштаба: настройки, расписание,
+    услуги, клиенты, выходные и записи на весь горизонт начиная с сегодняшнего дня.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        scale (Scale): Масштаб данных.
+        seed (int): Зерно генератора случайных чисел.
+    """
+    rng = random.Random(seed)
+    today = datetime.date.today()
+
+    session.add(Settings(id=1, admin_id=1, planning_horizon_days=scale.horizon_days, timezone=TIMEZONE))
+    session.add_all(generate_schedule())
+    services = generate_services(scale.services)
+    users = [User(telegram_id=1000 + i, username=f"user{i}", full_name=f"Клиент {i}") for i in range(200)]
+    session.add_all(services + users)
+    await session.flush()
+
+    session.add_all(
+        Holiday(date=date, reason="Выходной")
+        for date in generate_holiday_dates(scale.holidays, today, scale.horizon_days, rng)
+    )
+
+    service_ids = [service.id for service in services]
+    user_ids = [user.id for user in users]
+    for offset in range(scale.horizon_days):
+        session.add_all(generate_day_appointments(
+            today + datetime.timedelta(days=offset), scale.appointments_per_day, service_ids, user_ids, rng
+        ))
+    await session.commit()
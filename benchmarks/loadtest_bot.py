@@ -0,0 +1,250 @@
+"""
+Нагрузочный тест бота без обращения к Telegram.
+
+Собирает настоящий диспетчер (main.create_dispatcher) со всеми роутерами
+и middleware, подменяет сессию Bot заглушкой, которая запоминает исходящие
+вызовы, и прогоняет через dp.feed_update сценарий записи для множества
+одновременных пользователей:
+/start -> "Записаться" -> услуга -> дата -> время -> подтверждение.
+Дату и время пользователь выбирает среди кнопок клавиатуры, которую бот
+прислал на предыдущем шаге, как это делает настоящий клиент.
+
+База данных - временный файл SQLite с начальными данными.
+Выводит p50/p95/p99 времени обработки по обработчикам и общую пропускную способность.
+
+Запуск:
+    python -m benchmarks.loadtest_bot [--users 1000] [--concurrency 200] [--seed 1]
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import logging
+import os
+import random
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+_db_dir = tempfile.mkdtemp(prefix="nailbot-loadtest-")
+# Переменные окружения задаются до импорта модулей, читающих конфигурацию
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/loadtest.db"
+os.environ.setdefault("BOT_TOKEN", "123456:LOADTEST")
+os.environ.setdefault("ADMIN_ID", "1")
+# Ограничение частоты не должно влиять на результаты
+os.environ["RATE_LIMIT_BOT_RATE"] = "1000000"
+os.environ["RATE_LIMIT_BOT_BURST"] = "1000000"
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import TelegramMethod, SendMessage, EditMessageText
+from aiogram.types import Update, Message, InlineKeyboardMarkup
+
+from config import load_config
+from database.models import Service, Settings, WorkSchedule
+from database.session import engine, init_db, AsyncSessionLocal
+from main import create_dispatcher
+from utils.notifications import AdminNotifier
+
+ADMIN_ID = 1
+USER_ID_OFFSET = 10_000_000
+
+class StubSession(BaseSession):
+    """
+    Сессия Bot, которая не обращается к Telegram, а запоминает вызовы
+    и последнюю клавиатуру, отправленную в каждый чат.
+    """
+    def __init__(self):
+        super().__init__()
+        self.calls: Counter = Counter()
+        self.last_markup: dict[int, InlineKeyboardMarkup] = {}
+        self._message_ids = itertools.count(1)
+
+    async def make_request(self, bot: Bot, method: TelegramMethod, timeout=None):
+        self.calls[type(method).__name__] += 1
+        if isinstance(method, (SendMessage, EditMessageText)) and isinstance(method.reply_markup, InlineKeyboardMarkup):
+            self.last_markup[int(method.chat_id)] = method.reply_markup
+        if isinstance(method, SendMessage):
+            return Message.model_validate({
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": method.chat_id, "type": "private"},
+                "text": method.text,
+            }, context={"bot": bot})
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30, chunk_size=65536, raise_for_status=True):
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+class UpdateFactory:
+    """
+    Строит обновления Telegram от имени пользователя, привязанные к боту.
+    """
+    def __init__(self, bot: Bot):
+        self.bot = bot
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+
+    def _user(self, user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": f"Клиент {user_id}", "username": f"user{user_id}"}
+
+    def _message(self, user_id: int, text: str) -> dict:
+        return {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": self._user(user_id),
+            "text": text,
+        }
+
+    def message(self, user_id: int, text: str) -> Update:
+        data = {"update_id": next(self._update_ids), "message": self._message(user_id, text)}
+        if text.startswith("/"):
+            data["message"]["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text)}]
+        return Update.model_validate(data, context={"bot": self.bot})
+
+    def callback(self, user_id: int, data: str) -> Update:
+        return Update.model_validate({
+            "update_id": next(self._update_ids),
+            "callback_query": {
+                "id": str(next(self._update_ids)),
+                "from": self._user(user_id),
+                "chat_instance": str(user_id),
+                "message": self._message(user_id, "..."),
+                "data": data,
+            },
+        }, context={"bot": self.bot})
+
+class LatencyMiddleware:
+    """
+    Внутренний middleware, сохраняющий время работы каждого обработчика.
+    """
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+
+    async def __call__(self, handler, event, data):
+        callback = getattr(data.get("handler"), "callback", None)
+        name = getattr(callback, "__name__", "unknown")
+        started_at = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            self.errors[name] += 1
+            raise
+        finally:
+            self.samples[name].append(time.perf_counter() - started_at)
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def buttons(markup: InlineKeyboardMarkup | None, prefix: str) -> list[str]:
+    if markup is None:
+        return []
+    return [
+        button.callback_data
+        for row in markup.inline_keyboard
+        for button in row
+        if button.callback_data and button.callback_data.startswith(prefix)
+    ]
+
+async def seed() -> list[int]:
+    """
+    Создает схему и начальные данные: рабочие дни без выходных и несколько услуг.
+    """
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        session.add(Settings(id=1, admin_id=ADMIN_ID, planning_horizon_days=30, timezone="Europe/Moscow"))
+        for weekday in range(7):
+            session.add(WorkSchedule(
+                weekday=weekday, start_time=datetime.time(9, 0), end_time=datetime.time(21, 0), is_working=True
+            ))
+        services = [
+            Service(name="Маникюр", duration_minutes=60, price=1500.0),
+            Service(name="Педикюр", duration_minutes=90, price=2500.0),
+            Service(name="Покрытие гель-лаком", duration_minutes=45, price=1000.0),
+        ]
+        session.add_all(services)
+        await session.commit()
+        return [service.id for service in services]
+
+async def run_user(dp, bot: Bot, stub: StubSession, factory: UpdateFactory, user_id: int,
+                   service_ids: list[int], rng: random.Random, outcomes: Counter) -> None:
+    await dp.feed_update(bot, factory.message(user_id, "/start"))
+    await dp.feed_update(bot, factory.callback(user_id, "book_appointment"))
+    await dp.feed_update(bot, factory.callback(user_id, f"service_{rng.choice(service_ids)}"))
+
+    dates = buttons(stub.last_markup.get(user_id), "date_")
+    if not dates:
+        outcomes["no_dates"] += 1
+        return
+    stub.last_markup.pop(user_id, None)
+    await dp.feed_update(bot, factory.callback(user_id, rng.choice(dates)))
+
+    times = buttons(stub.last_markup.get(user_id), "time_")
+    if not times:
+        outcomes["no_slots"] += 1
+        return
+    await dp.feed_update(bot, factory.callback(user_id, rng.choice(times)))
+    await dp.feed_update(bot, factory.callback(user_id, "confirm_appointment"))
+    outcomes["booked"] += 1
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест сценария записи.")
+    parser.add_argument("--users", type=int, default=1000, help="количество пользователей")
+    parser.add_argument("--concurrency", type=int, default=200, help="одновременно активных пользователей")
+    parser.add_argument("--seed", type=int, default=1, help="зерно генератора случайных чисел")
+    args = parser.parse_args()
+
+    # main.py при импорте настраивает логирование на уровень INFO
+    logging.getLogger().setLevel(logging.WARNING)
+    # Лог каждого SQL-запроса исказил бы результаты
+    engine.echo = False
+
+    service_ids = await seed()
+
+    stub = StubSession()
+    bot = Bot(token=os.environ["BOT_TOKEN"], session=stub, parse_mode="HTML")
+    admin_notifier = AdminNotifier(bot, ADMIN_ID, window=60)
+    dp = create_dispatcher(load_config(), admin_notifier)
+    latency = LatencyMiddleware()
+    dp.message.middleware(latency)
+    dp.callback_query.middleware(latency)
+
+    rng = random.Random(args.seed)
+    outcomes: Counter = Counter()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    factory = UpdateFactory(bot)
+
+    async def limited(user_id: int) -> None:
+        async with semaphore:
+            await run_user(dp, bot, stub, factory, user_id, service_ids, rng, outcomes)
+
+    admin_notifier.start()
+    started_at = time.perf_counter()
+    await asyncio.gather(*(limited(USER_ID_OFFSET + i) for i in range(args.users)))
+    elapsed = time.perf_counter() - started_at
+    await admin_notifier.stop()
+    await engine.dispose()
+
+    total_updates = sum(len(samples) for samples in latency.samples.values())
+    print(f"Пользователей: {args.users}, одновременно: {args.concurrency}, база: {os.environ['DATABASE_URL']}")
+    print(f"{'Обработчик':<40} {'вызовов':>8} {'ошибок':>7} {'p50, мс':>9} {'p95, мс':>9} {'p99, мс':>9}")
+    for name, samples in sorted(latency.samples.items()):
+        samples.sort()
+        print(
+            f"{name:<40} {len(samples):>8} {latency.errors[name]:>7} "
+            f"{percentile(samples, 50) * 1000:>9.2f} {percentile(samples, 95) * 1000:>9.2f} "
+            f"{percentile(samples, 99) * 1000:>9.2f}"
+        )
+    print(f"\nВремя: {elapsed:.2f} с, обновлений: {total_updates} ({total_updates / elapsed:.1f}/с)")
+    print(f"Записей создано: {outcomes['booked']} ({outcomes['booked'] / elapsed:.1f}/с), "
+          f"без свободных дат: {outcomes['no_dates']}, без свободного времени: {outcomes['no_slots']}")
+    print("Вызовы Bot API: " + ", ".join(f"{name}={count}" for name, count in stub.calls.most_common()))
+
+if __name__ == "__main__":
+    asyncio.run(main())
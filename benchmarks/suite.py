@@ -0,0 +1,183 @@
+"""
+Набор бенчмарков ядра планирования.
+
+Каждая функция запускается на всех масштабах из benchmarks.generators.SCALES
+(услуги, записи в день, выходные, горизонт планирования):
+- get_available_time_slots: расчет слотов на день с M записями;
+- get_available_dates: доступные даты на весь горизонт (SQLite в памяти);
+- calendar_keyboard: отрисовка календаря без кэша;
+- check_upcoming_appointments: запросы напоминаний (бот-заглушка).
+
+Результаты (медиана и минимум времени одного вызова) сохраняются в JSON.
+Если есть сохраненный базовый результат, для каждой функции выводится
+отношение к нему, а при замедлении больше порога скрипт завершается с кодом 1.
+
+Запуск:
+    python -m benchmarks.suite [--scales small,medium] [--output benchmarks/results.json]
+                               [--baseline benchmarks/baseline.json] [--save-baseline]
+                               [--threshold 0.2]
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from benchmarks.generators import SCALES, TIMEZONE, Scale, generate_schedule, generate_day_appointments, seed_database
+from database.session import Base
+from handlers.booking import get_available_dates
+from utils.keyboards import calendar_keyboard, render_calendar_keyboard
+from utils.scheduler import check_upcoming_appointments
+from utils.time_utils import get_available_time_slots
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+DEFAULT_OUTPUT = BENCHMARKS_DIR / "results.json"
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+# Минимальное суммарное время замеров одной функции на одном масштабе
+MIN_MEASURE_SECONDS = 0.5
+MIN_ROUNDS = 5
+
+class StubBot:
+    """
+    Бот-заглушка для check_upcoming_appointments: сообщения никуда не отправляются.
+    """
+    async def send_message(self, *args, **kwargs) -> None:
+        pass
+
+async def measure(func) -> dict:
+    """
+    Вызывает асинхронную функцию, пока не наберется MIN_MEASURE_SECONDS
+    (но не меньше MIN_ROUNDS раз), и возвращает статистику в миллисекундах.
+    """
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < MIN_ROUNDS or time.perf_counter() - started < MIN_MEASURE_SECONDS:
+        call_started = time.perf_counter()
+        await func()
+        timings.append((time.perf_counter() - call_started) * 1000)
+    return {
+        "median_ms": round(statistics.median(timings), 4),
+        "min_ms": round(min(timings), 4),
+        "rounds": len(timings),
+    }
+
+async def run_scale(scale: Scale) -> dict:
+    """
+    Запускает все бенчмарки на одном масштабе данных.
+    """
+    results = {}
+    rng = random.Random(1)
+    tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+
+    # Расчет слотов: только вычисления, без базы данных
+    schedule = generate_schedule()[tomorrow.weekday() if tomorrow.weekday() != 6 else 0]
+    appointments = generate_day_appointments(tomorrow, scale.appointments_per_day, [1], [1], rng)
+
+    async def time_slots():
+        get_available_time_slots(schedule, appointments, 60, tomorrow, TIMEZONE)
+
+    results["get_available_time_slots"] = await measure(time_slots)
+
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_pool = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_pool() as session:
+        await seed_database(session, scale)
+
+    async def available_dates():
+        async with session_pool() as session:
+            return await get_available_dates(session)
+
+    results["get_available_dates"] = await measure(available_dates)
+
+    dates = await available_dates()
+
+    async def keyboard():
+        render_calendar_keyboard.cache_clear()
+        calendar_keyboard(tomorrow.year, tomorrow.month, dates)
+
+    results["calendar_keyboard"] = await measure(keyboard)
+
+    bot = StubBot()
+
+    async def reminders():
+        await check_upcoming_appointments(bot, session_pool)
+
+    results["check_upcoming_appointments"] = await measure(reminders)
+
+    await engine.dispose()
+    return {f"{name}[{scale.name}]": value for name, value in results.items()}
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Печатает сравнение с базовым результатом и возвращает ключи с замедлением больше порога.
+    """
+    regressions = []
+    print(f"\n{'Бенчмарк':<45} {'база, мс':>10} {'сейчас, мс':>11} {'отношение':>10}")
+    for key, value in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:<45} {'-':>10} {value['median_ms']:>11.3f} {'новый':>10}")
+            continue
+        ratio = value["median_ms"] / base["median_ms"] if base["median_ms"] else float("inf")
+        mark = ""
+        if ratio > 1 + threshold:
+            regressions.append(key)
+            mark = "  <-- замедление"
+        print(f"{key:<45} {base['median_ms']:>10.3f} {value['median_ms']:>11.3f} {ratio:>9.2f}x{mark}")
+    return regressions
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Бенчмарки ядра планирования.")
+    parser.add_argument("--scales", default=",".join(scale.name for scale in SCALES),
+                        help="масштабы через запятую")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="файл для результатов")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="файл базового результата")
+    parser.add_argument("--save-baseline", action="store_true", help="сохранить результаты как базовые")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="допустимое замедление относительно базы (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    selected = set(args.scales.split(","))
+    results = {}
+    for scale in SCALES:
+        if scale.name not in selected:
+            continue
+        print(f"Масштаб {scale.name}: {scale}")
+        results.update(await run_scale(scale))
+
+    report = {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f"Результаты сохранены в {args.output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+        print(f"Базовый результат сохранен в {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("Базовый результат не найден, сравнение пропущено (используйте --save-baseline).")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\nЗамедление больше {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
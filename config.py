@@ -24,8 +24,10 @@ class DbConfig:
 
     Attributes:
         database_url (str): URL для подключения к базе данных.
+        echo (bool): Выводить ли SQL-запросы в лог.
     """
     database_url: str
+    echo: bool
 
 @dataclass
 class SchedulerConfig:
@@ -47,6 +49,148 @@ class GoogleCalendarConfig:
     """
     url: str
 
+@dataclass
+class CalendarFeedConfig:
+    """
+    Класс для хранения конфигурации iCalendar-ленты записей.
+
+    Attributes:
+        token (str): Секретный токен доступа к ленте (пустая строка - лента отключена).
+    """
+    token: str
+
+@dataclass
+class NotificationsConfig:
+    """
+    Класс для хранения конфигурации уведомлений администратора.
+
+    Attributes:
+        admin_digest_window (int): Окно (в секундах), в течение которого события
+            для администратора объединяются в одну сводку.
+    """
+    admin_digest_window: int
+
+@dataclass
+class RateLimitConfig:
+    """
+    Класс для хранения конфигурации ограничения частоты запросов.
+
+    Attributes:
+        bot_rate (float): Скорость пополнения для пользователя бота (обновлений в секунду).
+        bot_burst (int): Максимальный всплеск обновлений от одного пользователя.
+        api_rate (float): Скорость пополнения для клиента API (запросов в секунду).
+        api_burst (int): Максимальный всплеск запросов от одного клиента API.
+    """
+    bot_rate: float
+    bot_burst: int
+    api_rate: float
+    api_burst: int
+
+@dataclass
+class MetricsConfig:
+    """
+    Класс для хранения конфигурации выгрузки метрик процесса бота.
+
+    Attributes:
+        host (str): Адрес HTTP-сервера метрик.
+        port (int): Порт HTTP-сервера метрик (0 - сервер отключен).
+        token (str): Bearer-токен доступа к /metrics API админ-панели
+            (пустая строка - метрики API отключены).
+    """
+    host: str
+    port: int
+    token: str
+
+@dataclass
+class QueryBudgetConfig:
+    """
+    Класс для хранения бюджета SQL-запросов на одно обновление или HTTP-запрос.
+
+    Attributes:
+        max_queries (int): Допустимое количество запросов (0 - без ограничения).
+        max_duration (float): Допустимое суммарное время запросов в секундах (0 - без ограничения).
+    """
+    max_queries: int
+    max_duration: float
+
+@dataclass
+class ProfilerConfig:
+    """
+    Класс для хранения конфигурации профилировщика по запросу.
+
+    Attributes:
+        enabled (bool): Разрешено ли профилирование (/profile и /api/profile).
+        default_duration (int): Длительность профилирования по умолчанию в секундах.
+        max_duration (int): Максимальная длительность профилирования в секундах.
+        interval (float): Интервал между образцами в секундах.
+    """
+    enabled: bool
+    default_duration: int
+    max_duration: int
+    interval: float
+
+@dataclass
+class TracingConfig:
+    """
+    Класс для хранения конфигурации трассировки.
+
+    Attributes:
+        sample_rate (float): Доля трассируемых обновлений и запросов от 0 до 1 (0 - трассировка выключена).
+        file (str): Файл для записи трасс.
+    """
+    sample_rate: float
+    file: str
+
+@dataclass
+class LoggingConfig:
+    """
+    Класс для хранения конфигурации логирования.
+
+    Attributes:
+        level (str): Общий уровень логирования.
+        json (bool): Выводить ли записи в формате JSON.
+        levels (dict[str, str]): Уровни для отдельных модулей ({имя логгера: уровень}).
+    """
+    level: str
+    json: bool
+    levels: dict[str, str]
+
+@dataclass
+class RunConfig:
+    """
+    Класс для хранения конфигурации режима запуска.
+
+    Attributes:
+        mode (str): "split" - бот и API запускаются отдельными процессами,
+            "combined" - main.py запускает API в том же процессе, что и бота,
+            "multitenant" - main.py обслуживает ботов всех салонов из TENANTS_FILE через вебхуки.
+        api_host (str): Адрес API в совмещенном режиме.
+        api_port (int): Порт API в совмещенном режиме.
+    """
+    mode: str
+    api_host: str
+    api_port: int
+
+@dataclass
+class TenantsConfig:
+    """
+    Класс для хранения конфигурации многоарендного режима (RUN_MODE=multitenant).
+
+    Attributes:
+        file (str): JSON-файл со списком салонов (id, bot_token, admin_id, необязательный database_url).
+        database_url (str): Шаблон URL базы данных салона с подстановкой {tenant_id}.
+        webhook_base_url (str): Внешний адрес сервера вебхуков (пустая строка - вебхуки не регистрируются).
+        webhook_host (str): Адрес сервера вебхуков.
+        webhook_port (int): Порт сервера вебхуков.
+        idle_ttl (int): Через сколько секунд без обновлений ресурсы салона освобождаются.
+    """
+    file: str
+    database_url: str
+    webhook_base_url: str
+    webhook_host: str
+    webhook_port: int
+    idle_ttl: int
+
 @dataclass
 class Config:
     """
@@ -57,11 +201,48 @@ class Config:
         db (DbConfig): Конфигурация базы данных.
         scheduler (SchedulerConfig): Конфигурация планировщика.
         google_calendar (GoogleCalendarConfig): Конфигурация Google Calendar.
+        notifications (NotificationsConfig): Конфигурация уведомлений администратора.
+        calendar_feed (CalendarFeedConfig): Конфигурация iCalendar-ленты записей.
+        rate_limit (RateLimitConfig): Конфигурация ограничения частоты запросов.
+        metrics (MetricsConfig): Конфигурация выгрузки метрик.
+        query_budget (QueryBudgetConfig): Бюджет SQL-запросов.
+        profiler (ProfilerConfig): Конфигурация профилировщика.
+        tracing (TracingConfig): Конфигурация трассировки.
+        logging (LoggingConfig): Конфигурация логирования.
+        run (RunConfig): Конфигурация режима запуска.
+        tenants (TenantsConfig): Конфигурация многоарендного режима.
     """
     tg_bot: TgBot
     db: DbConfig
     scheduler: SchedulerConfig
     google_calendar: GoogleCalendarConfig
+    notifications: NotificationsConfig
+    calendar_feed: CalendarFeedConfig
+    rate_limit: RateLimitConfig
+    metrics: MetricsConfig
+    query_budget: QueryBudgetConfig
+    profiler: ProfilerConfig
+    tracing: TracingConfig
+    logging: LoggingConfig
+    run: RunConfig
+    tenants: TenantsConfig
+
+def parse_log_levels(value: str) -> dict[str, str]:
+    """
+    Разбирает уровни логирования по модулям из строки вида "aiogram=WARNING,sqlalchemy.engine=INFO".
+
+    Args:
+        value (str): Строка с парами модуль=уровень через запятую.
+
+    Returns:
+        dict[str, str]: {имя логгера: уровень}.
+    """
+    levels = {}
+    for item in value.split(","):
+        name, _, level = item.partition("=")
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
 
 def load_config() -> Config:
     """
@@ -76,13 +257,63 @@ def load_config() -> Config:
             admin_id=int(os.getenv("ADMIN_ID", "0"))
         ),
         db=DbConfig(
-            database_url=os.getenv("DATABASE_URL", "sqlite+aiosqlite:///database/nails.db")
+            database_url=os.getenv("DATABASE_URL", "sqlite+aiosqlite:///database/nails.db"),
+            echo=os.getenv("DB_ECHO", "false").lower() == "true"
         ),
         scheduler=SchedulerConfig(
             timezone=os.getenv("TIMEZONE", "Europe/Moscow")
         ),
         google_calendar=GoogleCalendarConfig(
             url=os.getenv("GOOGLE_CALENDAR_URL", "")
+        ),
+        notifications=NotificationsConfig(
+            admin_digest_window=int(os.getenv("ADMIN_DIGEST_WINDOW", "60"))
+        ),
+        calendar_feed=CalendarFeedConfig(
+            token=os.getenv("CALENDAR_FEED_TOKEN", "")
+        ),
+        rate_limit=RateLimitConfig(
+            bot_rate=float(os.getenv("RATE_LIMIT_BOT_RATE", "1")),
+            bot_burst=int(os.getenv("RATE_LIMIT_BOT_BURST", "5")),
+            api_rate=float(os.getenv("RATE_LIMIT_API_RATE", "10")),
+            api_burst=int(os.getenv("RATE_LIMIT_API_BURST", "30"))
+        ),
+        metrics=MetricsConfig(
+            host=os.getenv("METRICS_HOST", "127.0.0.1"),
+            port=int(os.getenv("METRICS_PORT", "9101")),
+            token=os.getenv("METRICS_TOKEN", "")
+        ),
+        query_budget=QueryBudgetConfig(
+            max_queries=int(os.getenv("QUERY_BUDGET_MAX_QUERIES", "20")),
+            max_duration=int(os.getenv("QUERY_BUDGET_MAX_DURATION_MS", "500")) / 1000
+        ),
+        profiler=ProfilerConfig(
+            enabled=os.getenv("PROFILER_ENABLED", "false").lower() == "true",
+            default_duration=int(os.getenv("PROFILER_DEFAULT_DURATION", "10")),
+            max_duration=int(os.getenv("PROFILER_MAX_DURATION", "60")),
+            interval=int(os.getenv("PROFILER_INTERVAL_MS", "5")) / 1000
+        ),
+        tracing=TracingConfig(
+            sample_rate=float(os.getenv("TRACING_SAMPLE_RATE", "0")),
+            file=os.getenv("TRACING_FILE", "traces.jsonl")
+        ),
+        logging=LoggingConfig(
+            level=os.getenv("LOG_LEVEL", "INFO").upper(),
+            json=os.getenv("LOG_JSON", "false").lower() == "true",
+            levels=parse_log_levels(os.getenv("LOG_LEVELS", ""))
+        ),
+        run=RunConfig(
+            mode=os.getenv("RUN_MODE", "split").lower(),
+            api_host=os.getenv("API_HOST", "0.0.0.0"),
+            api_port=int(os.getenv("API_PORT", "8000"))
+        ),
+        tenants=TenantsConfig(
+            file=os.getenv("TENANTS_FILE", "tenants.json"),
+            database_url=os.getenv("TENANT_DATABASE_URL", "sqlite+aiosqlite:///database/tenants/{tenant_id}.db"),
+            webhook_base_url=os.getenv("WEBHOOK_BASE_URL", "").rstrip("/"),
+            webhook_host=os.getenv("WEBHOOK_HOST", "0.0.0.0"),
+            webhook_port=int(os.getenv("WEBHOOK_PORT", "8080")),
+            idle_ttl=int(os.getenv("TENANT_IDLE_TTL", "600"))
         )
     )
 
@@ -1,6 +1,7 @@
 import asyncio
 import datetime
 import logging
+from typing import Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -10,18 +11,20 @@ from config import load_config
 
 logger = logging.getLogger(__name__)
 
-async def create_initial_data(session: AsyncSession) -> None:
+async def create_initial_data(session: AsyncSession, admin_id: Optional[int] = None) -> None:
     """
     Функция для создания начальных данных в базе данных.
 
     Args:
         session (AsyncSession): Асинхронная сессия базы данных.
+        admin_id (Optional[int]): ID администратора (по умолчанию - ADMIN_ID из конфигурации).
     """
     logger.info("Создание начальных данных...")
 
-    # Загрузка конфигурации для получения admin_id
-    config = load_config()
-    admin_id = config.tg_bot.admin_id
+    if admin_id is None:
+        # Загрузка конфигурации для получения admin_id
+        config = load_config()
+        admin_id = config.tg_bot.admin_id
 
     # Создание настроек по умолчанию
     settings = await session.get(Settings, 1)
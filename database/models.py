@@ -1,7 +1,7 @@
 import datetime
 from typing import Optional
 
-from sqlalchemy import BigInteger, Boolean, DateTime, Float, ForeignKey, Integer, String, Time
+from sqlalchemy import BigInteger, Boolean, Date, DateTime, Float, ForeignKey, Index, Integer, String, Time, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -71,11 +71,21 @@ class Appointment(Base):
         end_time (datetime.datetime): Время окончания записи (UTC).
         status (str): Статус записи (например, 'pending', 'confirmed', 'cancelled', 'completed').
         google_event_id (Optional[str]): ID события в Google Calendar (если создано).
+        master_id (Optional[int]): ID мастера (None - запись без мастера, режим одного мастера).
+        price (Optional[float]): Стоимость услуги на момент записи (None - запись создана
+            до появления поля, в аналитике используется текущая цена услуги).
         created_at (datetime.datetime): Дата и время создания записи.
         user (User): Объект пользователя, связанный с записью.
         service (Service): Объект услуги, связанный с записью.
+        master (Optional[Master]): Объект мастера, связанный с записью.
     """
     __tablename__ = "appointments"
+    __table_args__ = (
+        # Индекс для пагинации по ключу (start_time, id) и выборок по времени
+        Index("ix_appointments_start_time_id", "start_time", "id"),
+        # Индекс занятости мастера: записи мастера за день
+        Index("ix_appointments_master_id_start_time", "master_id", "start_time"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False)
@@ -84,10 +94,13 @@ class Appointment(Base):
     end_time: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     status: Mapped[str] = mapped_column(String, default="pending", nullable=False)
     google_event_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    master_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("masters.id"), nullable=True)
+    price: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     user: Mapped["User"] = relationship("User", back_populates="appointments")
     service: Mapped["Service"] = relationship("Service", back_populates="appointments")
+    master: Mapped[Optional["Master"]] = relationship("Master", back_populates="appointments")
 
     def __repr__(self) -> str:
         return f"<Appointment(id={self.id}, user_id={self.user_id}, service_id={self.service_id}, start_time='{self.start_time}')>"
@@ -132,6 +145,75 @@ class Holiday(Base):
     def __repr__(self) -> str:
         return f"<Holiday(id={self.id}, date='{self.date}')>"
 
+class Master(Base):
+    """
+    Модель мастера салона.
+
+    Attributes:
+        id (int): Уникальный идентификатор мастера.
+        name (str): Имя мастера.
+        active (bool): Принимает ли мастер записи.
+        created_at (datetime.datetime): Дата и время добавления мастера.
+    """
+    __tablename__ = "masters"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    appointments: Mapped[list["Appointment"]] = relationship("Appointment", back_populates="master")
+
+    def __repr__(self) -> str:
+        return f"<Master(id={self.id}, name='{self.name}')>"
+
+class MasterSchedule(Base):
+    """
+    Модель расписания мастера по дням недели. Если для дня недели строки нет,
+    действует общее расписание салона (WorkSchedule).
+
+    Attributes:
+        id (int): Уникальный идентификатор записи расписания.
+        master_id (int): ID мастера.
+        weekday (int): День недели (0=понедельник, 6=воскресенье).
+        start_time (datetime.time): Время начала рабочего дня.
+        end_time (datetime.time): Время окончания рабочего дня.
+        is_working (bool): Флаг, указывающий, является ли день рабочим.
+    """
+    __tablename__ = "master_schedules"
+    __table_args__ = (UniqueConstraint("master_id", "weekday", name="uq_master_schedules_master_id_weekday"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    master_id: Mapped[int] = mapped_column(Integer, ForeignKey("masters.id", ondelete="CASCADE"), nullable=False)
+    weekday: Mapped[int] = mapped_column(Integer, nullable=False)
+    start_time: Mapped[datetime.time] = mapped_column(Time(timezone=True), nullable=False)
+    end_time: Mapped[datetime.time] = mapped_column(Time(timezone=True), nullable=False)
+    is_working: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<MasterSchedule(master_id={self.master_id}, weekday={self.weekday}, is_working={self.is_working})>"
+
+class MasterHoliday(Base):
+    """
+    Модель выходного дня мастера (в дополнение к выходным всего салона).
+
+    Attributes:
+        id (int): Уникальный идентификатор выходного дня.
+        master_id (int): ID мастера.
+        date (datetime.date): Дата выходного дня.
+        reason (Optional[str]): Причина выходного дня.
+    """
+    __tablename__ = "master_holidays"
+    __table_args__ = (UniqueConstraint("master_id", "date", name="uq_master_holidays_master_id_date"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    master_id: Mapped[int] = mapped_column(Integer, ForeignKey("masters.id", ondelete="CASCADE"), nullable=False)
+    date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    reason: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<MasterHoliday(master_id={self.master_id}, date='{self.date}')>"
+
 class Settings(Base):
     """
     Модель для хранения общих настроек приложения.
@@ -151,3 +233,71 @@ class Settings(Base):
 
     def __repr__(self) -> str:
         return f"<Settings(id={self.id}, admin_id={self.admin_id})>"
+
+class ChangeStamp(Base):
+    """
+    Модель отметки об изменении данных (версия и время последнего изменения таблицы).
+
+    Attributes:
+        name (str): Имя отслеживаемой таблицы (например, 'holidays').
+        version (int): Номер версии, увеличивается при каждом изменении.
+        updated_at (datetime.datetime): Дата и время последнего изменения.
+    """
+    __tablename__ = "change_stamps"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<ChangeStamp(name='{self.name}', version={self.version})>"
+
+class Event(Base):
+    """
+    Модель события для живой ленты администратора. Таблица читается по возрастанию id,
+    что позволяет передавать события между процессами бота и API.
+
+    Attributes:
+        id (int): Уникальный возрастающий идентификатор события.
+        kind (str): Тип события (например, 'appointment_created').
+        payload (str): Данные события в формате JSON.
+        created_at (datetime.datetime): Дата и время создания события.
+    """
+    __tablename__ = "events"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    payload: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[datetime.datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    def __repr__(self) -> str:
+        return f"<Event(id={self.id}, kind='{self.kind}')>"
+
+class DailyStats(Base):
+    """
+    Модель дневной сводки по услуге. Обновляется инкрементально при каждой
+    смене статуса записи, поэтому отчеты не зависят от объема истории.
+
+    Attributes:
+        day (datetime.date): День (в часовом поясе приложения).
+        service_id (int): ID услуги.
+        bookings (int): Количество активных записей (ожидает, подтверждена, завершена).
+        cancellations (int): Количество отмененных записей.
+        completed (int): Количество завершенных записей.
+        booked_minutes (int): Суммарная длительность активных записей в минутах.
+        booked_revenue (float): Стоимость активных записей.
+        revenue (float): Выручка по завершенным записям.
+    """
+    __tablename__ = "daily_stats"
+
+    day: Mapped[datetime.date] = mapped_column(Date, primary_key=True)
+    service_id: Mapped[int] = mapped_column(Integer, ForeignKey("services.id"), primary_key=True)
+    bookings: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    cancellations: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completed: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    booked_minutes: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    booked_revenue: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+    revenue: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<DailyStats(day='{self.day}', service_id={self.service_id})>"
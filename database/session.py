@@ -1,26 +1,93 @@
-from typing import AsyncGenerator
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncGenerator, Iterator, Optional
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import inspect, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
 from config import load_config
+from utils.metrics import instrument_engine
+from utils.query_budget import instrument_query_budget
+from utils.tracing import instrument_tracing
+
+logger = logging.getLogger(__name__)
 
 # Загрузка конфигурации для получения URL базы данных
 config = load_config()
 DATABASE_URL = config.db.database_url
 
+def create_database_engine(database_url: str) -> AsyncEngine:
+    """
+    Создает асинхронный движок SQLAlchemy с метриками, бюджетом запросов и трассировкой.
+
+    Args:
+        database_url (str): URL базы данных.
+
+    Returns:
+        AsyncEngine: Асинхронный движок.
+    """
+    db_engine = create_async_engine(database_url, echo=config.db.echo)
+    instrument_engine(db_engine)
+    instrument_query_budget(db_engine)
+    instrument_tracing(db_engine)
+    return db_engine
+
+def create_session_pool(db_engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    """
+    Создает фабрику асинхронных сессий для движка.
+
+    Args:
+        db_engine (AsyncEngine): Асинхронный движок.
+
+    Returns:
+        async_sessionmaker[AsyncSession]: Фабрика сессий.
+    """
+    return async_sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=db_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+    )
+
 # Создание асинхронного движка SQLAlchemy
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_database_engine(DATABASE_URL)
 
 # Создание фабрики асинхронных сессий
-AsyncSessionLocal = async_sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
+AsyncSessionLocal = create_session_pool(engine)
+
+# Фабрика сессий базы салона, обрабатывающего текущий запрос API (многоарендный режим)
+_current_session_pool: ContextVar[Optional[async_sessionmaker[AsyncSession]]] = ContextVar(
+    "current_session_pool", default=None
 )
 
+def current_session_pool() -> async_sessionmaker[AsyncSession]:
+    """
+    Возвращает фабрику сессий для текущего запроса: базу салона в многоарендном
+    режиме (см. use_session_pool) или основную базу из DATABASE_URL.
+
+    Returns:
+        async_sessionmaker[AsyncSession]: Фабрика сессий.
+    """
+    return _current_session_pool.get() or AsyncSessionLocal
+
+@contextmanager
+def use_session_pool(session_pool: async_sessionmaker[AsyncSession]) -> Iterator[None]:
+    """
+    Направляет get_async_session и current_session_pool внутри блока в указанную базу.
+
+    Args:
+        session_pool (async_sessionmaker[AsyncSession]): Фабрика сессий базы салона.
+    """
+    token = _current_session_pool.set(session_pool)
+    try:
+        yield
+    finally:
+        _current_session_pool.reset(token)
+
 class Base(DeclarativeBase):
     """
     Базовый класс для декларативного определения моделей SQLAlchemy.
@@ -34,12 +101,61 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     Yields:
         AsyncSession: Асинхронная сессия базы данных.
     """
-    async with AsyncSessionLocal() as session:
+    async with current_session_pool()() as session:
         yield session
 
-async def init_db() -> None:
+def dialect_insert(session: AsyncSession):
     """
-    Функция для инициализации базы данных, создания всех таблиц.
+    Возвращает конструктор INSERT с поддержкой ON CONFLICT для диалекта текущей БД.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+
+    Returns:
+        Callable: sqlalchemy.dialects.postgresql.insert или sqlalchemy.dialects.sqlite.insert.
+    """
+    if session.bind.dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+async def init_db(db_engine: AsyncEngine = engine) -> None:
+    """
+    Функция для инициализации базы данных, создания всех таблиц и индексов.
+
+    Args:
+        db_engine (AsyncEngine): Движок базы данных (по умолчанию - основной, из DATABASE_URL).
     """
-    async with engine.begin() as conn:
+    async with db_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # create_all не добавляет новые столбцы и индексы в уже существующие таблицы
+        await conn.run_sync(add_missing_columns)
+        await conn.run_sync(create_missing_indexes)
+
+def add_missing_columns(connection) -> None:
+    """
+    Добавляет в существующие таблицы необязательные столбцы, объявленные в моделях,
+    но отсутствующие в базе данных (например, appointments.master_id).
+
+    Args:
+        connection: Синхронное соединение SQLAlchemy.
+    """
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+            logger.info(f"Добавлен столбец {table.name}.{column.name}")
+
+def create_missing_indexes(connection) -> None:
+    """
+    Создает индексы, объявленные в моделях, если их еще нет в базе данных.
+
+    Args:
+        connection: Синхронное соединение SQLAlchemy.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
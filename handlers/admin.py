@@ -0,0 +1,58 @@
+import datetime
+import logging
+from typing import Optional
+
+from aiogram import Router, types
+from aiogram.filters import Command, CommandObject
+from aiogram.types import BufferedInputFile
+
+from config import load_config
+from utils.profiler import SamplingProfiler
+
+logger = logging.getLogger(__name__)
+router = Router()
+config = load_config()
+
+def is_admin(message: types.Message, admin_id: int) -> bool:
+    """
+    Фильтр сообщений администратора. admin_id передается диспетчером,
+    а в многоарендном режиме - TenantMiddleware (администратор своего салона).
+    """
+    return message.from_user is not None and message.from_user.id == admin_id
+
+# Команды этого роутера доступны только администратору
+router.message.filter(is_admin)
+
+@router.message(Command("profile"))
+async def profile_command_handler(message: types.Message, command: CommandObject, profiler: Optional[SamplingProfiler]) -> None:
+    """
+    Обработчик команды /profile [секунды]. Профилирует работающего бота
+    и присылает файл collapsed stacks для построения flamegraph.
+
+    Args:
+        message (types.Message): Объект сообщения от администратора.
+        command (CommandObject): Разобранная команда с аргументами.
+        profiler (Optional[SamplingProfiler]): Профилировщик (None, если отключен).
+    """
+    if profiler is None:
+        await message.answer("Профилировщик отключен. Включите его переменной PROFILER_ENABLED=true.")
+        return
+
+    try:
+        seconds = int(command.args) if command.args else config.profiler.default_duration
+    except ValueError:
+        await message.answer("Использование: /profile [секунды]")
+        return
+    seconds = max(1, min(seconds, config.profiler.max_duration))
+
+    if profiler.running:
+        await message.answer("Профилирование уже запущено.")
+        return
+
+    await message.answer(f"Профилирование запущено на {seconds} с...")
+    collapsed = await profiler.profile(seconds)
+    filename = f"bot-profile-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.folded"
+    await message.answer_document(
+        BufferedInputFile(collapsed.encode(), filename=filename),
+        caption="Профиль в формате collapsed stacks (flamegraph.pl, speedscope.app)."
+    )
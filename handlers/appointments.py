@@ -1,18 +1,20 @@
 import logging
 import datetime
 
-from aiogram import Router, types, F, Bot
+from aiogram import Router, types, F
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from database.models import Appointment, User
 from utils.keyboards import main_menu_keyboard, appointments_keyboard, confirmation_cancel_keyboard
-from config import load_config
+from utils.notifications import AdminNotifier
+from utils.change_stamps import bump_version
+from utils.events import record_event
+from utils.analytics import record_status_change
 
 logger = logging.getLogger(__name__)
 router = Router()
-config = load_config()
 
 async def get_user_appointments(session: AsyncSession, telegram_id: int) -> list[Appointment]:
     """
@@ -105,7 +107,7 @@ async def cancel_appointment_confirm_handler(callback: types.CallbackQuery, sess
     )
 
 @router.callback_query(F.data.startswith("confirm_cancel_"))
-async def cancel_appointment_confirmed_handler(callback: types.CallbackQuery, session: AsyncSession, bot: Bot) -> None:
+async def cancel_appointment_confirmed_handler(callback: types.CallbackQuery, session: AsyncSession, admin_notifier: AdminNotifier) -> None:
     """
     Обрабатывает подтвержденную отмену записи, обновляет статус в БД
     и отправляет уведомления.
@@ -118,7 +120,11 @@ async def cancel_appointment_confirmed_handler(callback: types.CallbackQuery, se
         await callback.message.edit_text("Запись не найдена.", reply_markup=main_menu_keyboard())
         return
 
+    old_status = appointment.status
     appointment.status = "cancelled"
+    await record_status_change(session, appointment, old_status, appointment.status)
+    record_event(session, "appointment_status", {"ids": [appointment.id], "status": "cancelled"})
+    await bump_version(session, "appointments")
     await session.commit()
 
     await callback.message.edit_text(
@@ -126,14 +132,11 @@ async def cancel_appointment_confirmed_handler(callback: types.CallbackQuery, se
         reply_markup=main_menu_keyboard()
     )
 
-    # Уведомление мастеру
-    await bot.send_message(
-        chat_id=config.tg_bot.admin_id,
-        text=(
-            f"Клиент отменил запись!\n\n"
-            f"Клиент: {appointment.user.full_name} (@{appointment.user.username or 'N/A'})\n"
-            f"Услуга: {appointment.service.name}\n"
-            f"Дата: {appointment.start_time.strftime('%d.%m.%Y')}\n"
-            f"Время: {appointment.start_time.strftime('%H:%M')}"
-        )
+    # Уведомление мастеру (отправляется в фоне, при всплеске - сводкой)
+    admin_notifier.notify(
+        f"Клиент отменил запись!\n\n"
+        f"Клиент: {appointment.user.full_name} (@{appointment.user.username or 'N/A'})\n"
+        f"Услуга: {appointment.service.name}\n"
+        f"Дата: {appointment.start_time.strftime('%d.%m.%Y')}\n"
+        f"Время: {appointment.start_time.strftime('%H:%M')}"
     )
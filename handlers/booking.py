@@ -1,35 +1,48 @@
 import logging
 import datetime
+from contextlib import aclosing
+from typing import Optional
+
 import pytz
 
-from aiogram import Router, types, F, Bot
+from aiogram import Router, types, F
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from database.models import Service, User, Appointment
+from database.models import Service, User, Appointment, WorkSchedule, Holiday
 from utils.keyboards import (
-    services_keyboard, calendar_keyboard, time_slots_keyboard,
+    services_keyboard, masters_keyboard, calendar_keyboard, time_slots_keyboard,
     confirmation_keyboard, main_menu_keyboard
 )
 from utils.time_utils import (
-    get_planning_horizon, is_working_day, is_holiday,
-    get_current_time_in_timezone, get_timezone, get_work_schedule_for_day,
-    get_appointments_for_day, get_available_time_slots
+    get_planning_horizon, get_current_time_in_timezone, get_timezone, get_work_schedule_for_day,
+    get_appointments_for_day, get_available_time_slots, stream_appointments_by_day,
+    dates_to_bitmap, bitmap_to_dates, as_date
+)
+from utils.masters import (
+    get_active_masters, get_master_available_dates, get_master_schedules, get_master_holidays,
+    get_master_time_slots, compute_master_slots, master_appointments_filter, merge_free_slots
 )
+from utils.change_stamps import get_version, bump_version
+from utils.events import record_event
+from utils.analytics import record_status_change
 from utils.google_calendar import generate_google_calendar_link
-from config import load_config
+from utils.notifications import AdminNotifier
 
 logger = logging.getLogger(__name__)
 router = Router()
-config = load_config()
+
+# Таблицы, от которых зависит список доступных дат
+AVAILABILITY_SOURCES = ("work_schedule", "holidays", "settings", "masters")
 
 class Booking(StatesGroup):
     """
     Состояния для процесса записи на услугу.
     """
     choosing_service = State()
+    choosing_master = State()
     choosing_date = State()
     choosing_time = State()
     confirming_appointment = State()
@@ -47,27 +60,147 @@ async def get_active_services(session: AsyncSession) -> list[Service]:
     result = await session.execute(select(Service).where(Service.active == True).order_by(Service.name))
     return result.scalars().all()
 
-async def get_available_dates(session: AsyncSession) -> list[datetime.date]:
+async def get_available_dates(session: AsyncSession) -> set[datetime.date]:
     """
-    Возвращает список доступных для записи дат.
+    Возвращает множество доступных для записи дат.
 
     Args:
         session (AsyncSession): Асинхронная сессия базы данных.
 
     Returns:
-        list[datetime.date]: Список доступных дат.
+        set[datetime.date]: Множество доступных дат.
     """
     planning_horizon = await get_planning_horizon(session)
     timezone_str = await get_timezone(session)
     today = get_current_time_in_timezone(timezone_str).date()
-    
-    available_dates = []
+
+    # Расписание и выходные загружаются один раз, а не для каждого дня горизонта
+    result = await session.execute(select(WorkSchedule.weekday).where(WorkSchedule.is_working == True))
+    working_weekdays = set(result.scalars())
+    holidays = {as_date(value) for value in (await session.execute(select(Holiday.date))).scalars()}
+
+    available_dates = set()
     for i in range(planning_horizon):
         current_date = today + datetime.timedelta(days=i)
-        if await is_working_day(session, current_date) and not await is_holiday(session, current_date):
-            available_dates.append(current_date)
+        if current_date.weekday() in working_weekdays and current_date not in holidays:
+            available_dates.add(current_date)
     return available_dates
 
+async def get_availability_snapshot(session: AsyncSession, master_ids: Optional[list[int]] = None) -> dict:
+    """
+    Рассчитывает доступные даты и упаковывает их в компактный снимок
+    для хранения в FSM: начало горизонта, битовая маска дат и версия данных.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        master_ids (Optional[list[int]]): Выбранные мастера (None - режим без мастеров).
+            Для нескольких мастеров дата доступна, если она доступна хотя бы у одного.
+
+    Returns:
+        dict: Снимок доступности.
+    """
+    version = await get_version(session, *AVAILABILITY_SOURCES)
+    timezone_str = await get_timezone(session)
+    today = get_current_time_in_timezone(timezone_str).date()
+    if master_ids is None:
+        available_dates = await get_available_dates(session)
+    else:
+        available_dates = set().union(*(await get_master_available_dates(session, master_ids)).values())
+    return {
+        "start": today.isoformat(),
+        "bitmap": dates_to_bitmap(today, available_dates),
+        "version": version,
+    }
+
+async def get_snapshot_available_dates(session: AsyncSession, state: FSMContext) -> set[datetime.date]:
+    """
+    Возвращает доступные даты из снимка в FSM. Снимок пересчитывается, только если
+    его нет, наступил новый день или изменились расписание, выходные или настройки.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        state (FSMContext): Контекст FSM пользователя.
+
+    Returns:
+        set[datetime.date]: Множество доступных дат.
+    """
+    user_data = await state.get_data()
+    snapshot = user_data.get("availability")
+
+    if snapshot is not None:
+        timezone_str = await get_timezone(session)
+        today = get_current_time_in_timezone(timezone_str).date()
+        if (
+            snapshot["start"] != today.isoformat()
+            or snapshot["version"] != await get_version(session, *AVAILABILITY_SOURCES)
+        ):
+            snapshot = None
+
+    if snapshot is None:
+        snapshot = await get_availability_snapshot(session, user_data.get("master_ids"))
+        await state.update_data(availability=snapshot)
+
+    return bitmap_to_dates(datetime.date.fromisoformat(snapshot["start"]), snapshot["bitmap"])
+
+async def find_nearest_free_slot(
+    session: AsyncSession,
+    available_dates: set[datetime.date],
+    service_duration: int,
+    master_ids: Optional[list[int]] = None
+) -> Optional[tuple[datetime.date, datetime.time, Optional[int]]]:
+    """
+    Ищет ближайшее свободное время для услуги, перебирая доступные даты по порядку
+    и останавливаясь на первом дне со свободным слотом.
+
+    Рабочие дни уже известны из снимка доступности, расписание загружается один раз,
+    а записи читаются одним запросом по индексу start_time только до найденного дня,
+    поэтому работа пропорциональна числу просмотренных дней, а не всему горизонту.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        available_dates (set[datetime.date]): Доступные даты из снимка.
+        service_duration (int): Длительность услуги в минутах.
+        master_ids (Optional[list[int]]): Выбранные мастера (None - режим без мастеров).
+
+    Returns:
+        Optional[tuple[datetime.date, datetime.time, Optional[int]]]: Дата, время и ID мастера
+            (None в режиме без мастеров) или None, если на горизонте нет свободного времени.
+    """
+    timezone_str = await get_timezone(session)
+    today = get_current_time_in_timezone(timezone_str).date()
+    dates = [date for date in available_dates if date >= today]
+
+    if master_ids is None:
+        result = await session.execute(select(WorkSchedule))
+        schedules = {schedule.weekday: schedule for schedule in result.scalars()}
+        days = stream_appointments_by_day(session, dates, timezone_str)
+        async with aclosing(days):
+            async for date, appointments in days:
+                time_slots = get_available_time_slots(
+                    schedules.get(date.weekday()), appointments, service_duration, date, timezone_str
+                )
+                if time_slots:
+                    return date, time_slots[0], None
+        return None
+
+    schedules = await get_master_schedules(session, master_ids)
+    holidays = await get_master_holidays(session, master_ids, today)
+    days = stream_appointments_by_day(
+        session, dates, timezone_str,
+        Appointment.status != "cancelled", master_appointments_filter(master_ids)
+    )
+    async with aclosing(days):
+        async for date, appointments in days:
+            slots, load = compute_master_slots(
+                master_ids, schedules, holidays.get(date, set()), appointments,
+                date, service_duration, timezone_str
+            )
+            slot_masters = merge_free_slots(slots, load)
+            if slot_masters:
+                slot, master_id = next(iter(slot_masters.items()))
+                return date, slot, master_id
+    return None
+
 @router.callback_query(F.data == "book_appointment")
 async def book_appointment_handler(callback: types.CallbackQuery, session: AsyncSession, state: FSMContext) -> None:
     """
@@ -100,14 +233,73 @@ async def service_chosen_handler(callback: types.CallbackQuery, session: AsyncSe
         await callback.message.edit_text("Выбранная услуга не найдена. Пожалуйста, попробуйте еще раз.")
         return
 
-    await state.update_data(service_id=service.id, service_name=service.name, service_duration=service.duration_minutes)
+    await state.update_data(
+        service_id=service.id,
+        service_name=service.name,
+        service_duration=service.duration_minutes,
+        service_price=service.price
+    )
+
+    masters = await get_active_masters(session)
+    if masters:
+        await state.update_data(masters={str(master.id): master.name for master in masters})
+        await callback.message.edit_text(
+            f"Вы выбрали услугу: {service.name}.\n\nТеперь выберите мастера:",
+            reply_markup=masters_keyboard(masters)
+        )
+        await state.set_state(Booking.choosing_master)
+        return
+
+    # Мастера не заведены: запись к салону, как до появления мастеров
+    await state.update_data(master_ids=None, master_id=None)
+    await show_date_selection(callback, session, state, f"Вы выбрали услугу: {service.name}.")
+
+@router.callback_query(Booking.choosing_master, F.data.startswith("master_"))
+async def master_chosen_handler(callback: types.CallbackQuery, session: AsyncSession, state: FSMContext) -> None:
+    """
+    Обработчик выбора мастера. Для "Любой мастер" доступность считается
+    по всем активным мастерам, предложенным пользователю.
+    """
+    await callback.answer()
+    choice = callback.data.split("_")[1]
+    user_data = await state.get_data()
+    masters = user_data.get("masters", {})
+
+    if choice == "any":
+        master_ids = [int(master_id) for master_id in masters]
+        master_id = None
+        header = "Вы выбрали любого мастера."
+    elif choice in masters:
+        master_ids = [int(choice)]
+        master_id = int(choice)
+        header = f"Вы выбрали мастера: {masters[choice]}."
+    else:
+        await callback.message.edit_text("Выбранный мастер не найден. Пожалуйста, начните заново.")
+        await state.clear()
+        return
+
+    await state.update_data(master_ids=master_ids, master_id=master_id)
+    await show_date_selection(callback, session, state, header)
+
+async def show_date_selection(callback: types.CallbackQuery, session: AsyncSession, state: FSMContext, header: str) -> None:
+    """
+    Рассчитывает снимок доступности для выбранных мастеров и показывает календарь.
+
+    Args:
+        callback (types.CallbackQuery): Колбэк, сообщение которого редактируется.
+        session (AsyncSession): Асинхронная сессия базы данных.
+        state (FSMContext): Контекст FSM пользователя.
+        header (str): Первая строка сообщения.
+    """
+    user_data = await state.get_data()
+    snapshot = await get_availability_snapshot(session, user_data.get("master_ids"))
+    await state.update_data(availability=snapshot)
+
+    today = datetime.date.fromisoformat(snapshot["start"])
+    available_dates = bitmap_to_dates(today, snapshot["bitmap"])
 
-    available_dates = await get_available_dates(session)
-    timezone_str = await get_timezone(session)
-    today = get_current_time_in_timezone(timezone_str).date()
-    
     await callback.message.edit_text(
-        f"Вы выбрали услугу: {service.name}.\n\nТеперь выберите дату:",
+        f"{header}\n\nТеперь выберите дату:",
         reply_markup=calendar_keyboard(today.year, today.month, available_dates)
     )
     await state.set_state(Booking.choosing_date)
@@ -129,7 +321,7 @@ async def calendar_navigation_handler(callback: types.CallbackQuery, session: As
     if action == "nav" and len(parts) >= 4:
         year, month = int(parts[2]), int(parts[3])
 
-        available_dates = await get_available_dates(session)
+        available_dates = await get_snapshot_available_dates(session, state)
 
         await callback.message.edit_text(
             "Выберите дату:",
@@ -149,17 +341,24 @@ async def date_chosen_handler(callback: types.CallbackQuery, session: AsyncSessi
     await state.update_data(selected_date=selected_date.isoformat())
     user_data = await state.get_data()
     service_duration = user_data.get("service_duration")
-    
-    timezone_str = await get_timezone(session)
-    schedule = await get_work_schedule_for_day(session, selected_date)
-    appointments = await get_appointments_for_day(session, selected_date)
-
-    if not schedule or not service_duration:
-        await callback.message.edit_text("Произошла ошибка. Пожалуйста, начните заново.")
-        await state.clear()
-        return
+    master_ids = user_data.get("master_ids")
 
-    time_slots = get_available_time_slots(schedule, appointments, service_duration, selected_date, timezone_str)
+    timezone_str = await get_timezone(session)
+    if master_ids is not None and service_duration:
+        slots, load = await get_master_time_slots(session, master_ids, selected_date, service_duration, timezone_str)
+        slot_masters = merge_free_slots(slots, load)
+        time_slots = list(slot_masters)
+        await state.update_data(slot_masters={slot.isoformat(): master_id for slot, master_id in slot_masters.items()})
+    else:
+        schedule = await get_work_schedule_for_day(session, selected_date)
+        appointments = await get_appointments_for_day(session, selected_date)
+
+        if not schedule or not service_duration:
+            await callback.message.edit_text("Произошла ошибка. Пожалуйста, начните заново.")
+            await state.clear()
+            return
+
+        time_slots = get_available_time_slots(schedule, appointments, service_duration, selected_date, timezone_str)
 
     if not time_slots:
         await callback.message.edit_text(
@@ -181,16 +380,34 @@ async def time_chosen_handler(callback: types.CallbackQuery, state: FSMContext)
     """
     await callback.answer()
     selected_time_str = callback.data.split("_")[1]
-    
+    await show_confirmation(callback, state, selected_time_str)
+
+async def show_confirmation(callback: types.CallbackQuery, state: FSMContext, selected_time_str: str) -> None:
+    """
+    Сохраняет выбранное время и показывает подтверждение записи.
+
+    Args:
+        callback (types.CallbackQuery): Колбэк, сообщение которого редактируется.
+        state (FSMContext): Контекст FSM пользователя (дата уже выбрана).
+        selected_time_str (str): Время в формате ISO.
+    """
     await state.update_data(selected_time=selected_time_str)
     
     user_data = await state.get_data()
     service_name = user_data.get("service_name")
     selected_date = datetime.date.fromisoformat(user_data.get("selected_date"))
+
+    master_line = ""
+    if user_data.get("master_ids") is not None:
+        # В режиме "любой мастер" мастер определяется выбранным временем
+        master_id = user_data.get("slot_masters", {}).get(selected_time_str)
+        await state.update_data(master_id=master_id)
+        master_line = f"<b>Мастер:</b> {user_data['masters'].get(str(master_id), '-')}\n"
     
     await callback.message.edit_text(
         f"<b>Подтвердите вашу запись:</b>\n\n"
         f"<b>Услуга:</b> {service_name}\n"
+        f"{master_line}"
         f"<b>Дата:</b> {selected_date.strftime('%d.%m.%Y')}\n"
         f"<b>Время:</b> {selected_time_str}\n\n"
         f"Все верно?",
@@ -198,8 +415,37 @@ async def time_chosen_handler(callback: types.CallbackQuery, state: FSMContext)
     )
     await state.set_state(Booking.confirming_appointment)
 
+@router.callback_query(Booking.choosing_date, F.data == "nearest_slot")
+async def nearest_slot_handler(callback: types.CallbackQuery, session: AsyncSession, state: FSMContext) -> None:
+    """
+    Обработчик кнопки "Ближайшее свободное время". Находит первое свободное
+    время для выбранной услуги и мастера и сразу переходит к подтверждению.
+    """
+    user_data = await state.get_data()
+    service_duration = user_data.get("service_duration")
+    if not service_duration:
+        await callback.answer()
+        await callback.message.edit_text("Произошла ошибка. Пожалуйста, начните заново.")
+        await state.clear()
+        return
+
+    master_ids = user_data.get("master_ids")
+    available_dates = await get_snapshot_available_dates(session, state)
+    nearest = await find_nearest_free_slot(session, available_dates, service_duration, master_ids)
+    if nearest is None:
+        await callback.answer("На ближайшие дни свободного времени нет.", show_alert=True)
+        return
+
+    await callback.answer()
+    selected_date, selected_time, master_id = nearest
+    await state.update_data(
+        selected_date=selected_date.isoformat(),
+        slot_masters={selected_time.isoformat(): master_id}
+    )
+    await show_confirmation(callback, state, selected_time.isoformat())
+
 @router.callback_query(Booking.confirming_appointment, F.data == "confirm_appointment")
-async def confirm_appointment_handler(callback: types.CallbackQuery, session: AsyncSession, state: FSMContext, bot: Bot) -> None:
+async def confirm_appointment_handler(callback: types.CallbackQuery, session: AsyncSession, state: FSMContext, admin_notifier: AdminNotifier) -> None:
     """
     Обработчик подтверждения записи. Сохраняет запись в БД,
     отправляет уведомления и генерирует ссылку на Google Calendar.
@@ -214,8 +460,11 @@ async def confirm_appointment_handler(callback: types.CallbackQuery, session: As
     service_id = user_data.get("service_id")
     service_name = user_data.get("service_name")
     service_duration = user_data.get("service_duration")
+    service_price = user_data.get("service_price")
     selected_date_str = user_data.get("selected_date")
     selected_time_str = user_data.get("selected_time")
+    master_id = user_data.get("master_id")
+    master_name = user_data.get("masters", {}).get(str(master_id)) if master_id is not None else None
 
     selected_date = datetime.date.fromisoformat(selected_date_str)
     selected_time = datetime.time.fromisoformat(selected_time_str)
@@ -236,9 +485,28 @@ async def confirm_appointment_handler(callback: types.CallbackQuery, session: As
         service_id=service_id,
         start_time=start_time_utc,
         end_time=end_time_utc,
-        status="confirmed"
+        status="confirmed",
+        master_id=master_id,
+        price=service_price
     )
     session.add(new_appointment)
+    await session.flush()
+    record_event(session, "appointment_created", {
+        "id": new_appointment.id,
+        "user_id": user.id,
+        "user_name": user.full_name,
+        "user_username": user.username,
+        "service_id": service_id,
+        "service_name": service_name,
+        "master_id": master_id,
+        "master_name": master_name,
+        "start_time": start_time_utc,
+        "end_time": end_time_utc,
+        "status": new_appointment.status,
+        "created_at": datetime.datetime.now(datetime.timezone.utc),
+    })
+    await record_status_change(session, new_appointment, None, new_appointment.status)
+    await bump_version(session, "appointments")
     await session.commit()
 
     calendar_link = generate_google_calendar_link(service_name, start_time_utc, end_time_utc)
@@ -252,16 +520,15 @@ async def confirm_appointment_handler(callback: types.CallbackQuery, session: As
         disable_web_page_preview=True
     )
 
-    # Уведомление мастеру
-    await bot.send_message(
-        chat_id=config.tg_bot.admin_id,
-        text=(
-            f"Новая запись!\n\n"
-            f"Клиент: {user.full_name} (@{user.username or 'N/A'})\n"
-            f"Услуга: {service_name}\n"
-            f"Дата: {selected_date.strftime('%d.%m.%Y')}\n"
-            f"Время: {selected_time_str}"
-        )
+    master_line = f"Мастер: {master_name}\n" if master_name else ""
+    # Уведомление мастеру (отправляется в фоне, при всплеске - сводкой)
+    admin_notifier.notify(
+        f"Новая запись!\n\n"
+        f"Клиент: {user.full_name} (@{user.username or 'N/A'})\n"
+        f"Услуга: {service_name}\n"
+        f"{master_line}"
+        f"Дата: {selected_date.strftime('%d.%m.%Y')}\n"
+        f"Время: {selected_time_str}"
     )
     
     await state.clear()
@@ -285,7 +552,7 @@ async def back_to_date_selection_handler(callback: types.CallbackQuery, session:
     к календарю.
     """
     await callback.answer()
-    available_dates = await get_available_dates(session)
+    available_dates = await get_snapshot_available_dates(session, state)
     timezone_str = await get_timezone(session)
     today = get_current_time_in_timezone(timezone_str).date()
 
@@ -1,25 +1,205 @@
 import asyncio
 import logging
+import signal
+from typing import Optional
 
+import uvicorn
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ParseMode
 from aiogram.fsm.storage.memory import MemoryStorage
+from aiohttp import web
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
 from config import load_config, Config
 from database.session import init_db, AsyncSessionLocal
 from database.init_db import create_initial_data
-from handlers import start, menu, booking, appointments, contacts, error_handler, unknown
+from handlers import start, menu, booking, appointments, contacts, admin, error_handler, unknown
 from middlewares.db import DbSessionMiddleware
-from utils.scheduler import setup_scheduler
+from middlewares.tenant import TenantMiddleware
+from middlewares.throttling import ThrottlingMiddleware
+from middlewares.metrics import HandlerMetricsMiddleware, TelegramApiMetricsMiddleware
+from middlewares.query_budget import QueryBudgetMiddleware
+from middlewares.tracing import UpdateTracingMiddleware, HandlerTracingMiddleware, TelegramApiTracingMiddleware
+from utils.notifications import AdminNotifier
+from utils.rate_limit import TokenBucketLimiter
+from utils.metrics import instrument_scheduler, start_metrics_server
+from utils.profiler import SamplingProfiler, code_labels
+from utils.tracing import configure_tracing
+from utils.scheduler import setup_scheduler, setup_tenant_scheduler
+from utils.tenants import TenantRegistry, TenantRequestHandler, WEBHOOK_PATH, load_tenants
+from utils.logging_setup import setup_logging
+from utils.change_stamps import enable_stamp_cache
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
-)
+# Настройка логирования (запись в фоновом потоке, не блокирует цикл событий)
+setup_logging("bot")
 logger = logging.getLogger(__name__)
 
+def create_dispatcher(
+    config: Config,
+    admin_notifier: Optional[AdminNotifier],
+    registry: Optional[TenantRegistry] = None
+) -> Dispatcher:
+    """
+    Создает диспетчер со всеми роутерами и middleware бота.
+    Используется при запуске бота и в нагрузочном тесте (benchmarks/loadtest_bot.py).
+
+    Args:
+        config (Config): Конфигурация приложения.
+        admin_notifier (Optional[AdminNotifier]): Буфер уведомлений администратору
+            (None в многоарендном режиме: буфер свой у каждого салона).
+        registry (Optional[TenantRegistry]): Реестр салонов многоарендного режима.
+
+    Returns:
+        Dispatcher: Настроенный диспетчер.
+    """
+    # Состояния FSM хранятся с ключом (бот, чат, пользователь), поэтому салоны не пересекаются
+    storage = MemoryStorage()
+    dp = Dispatcher(storage=storage)
+
+    # Буфер уведомлений и администратор (в многоарендном режиме их подставляет TenantMiddleware)
+    dp["admin_notifier"] = admin_notifier
+    dp["admin_id"] = config.tg_bot.admin_id
+
+    # Регистрация роутеров (порядок важен: от специфичных к общим)
+    dp.include_router(start.router)
+    dp.include_router(menu.router)
+    dp.include_router(booking.router)
+    dp.include_router(appointments.router)
+    dp.include_router(contacts.router)
+    dp.include_router(admin.router)
+    dp.include_router(unknown.router)
+    dp.include_router(error_handler.router)
+
+    # Регистрация middleware (трасса - первой, ограничение частоты - до открытия сессии БД)
+    dp.update.middleware(UpdateTracingMiddleware())
+    dp.update.middleware(ThrottlingMiddleware(
+        TokenBucketLimiter(rate=config.rate_limit.bot_rate, burst=config.rate_limit.bot_burst)
+    ))
+    if registry is not None:
+        dp.update.middleware(TenantMiddleware(registry))
+    else:
+        dp.update.middleware(DbSessionMiddleware(session_pool=AsyncSessionLocal))
+    # Внутренние middleware наследуются вложенными роутерами и видят выбранный обработчик
+    for observer in (dp.message, dp.callback_query):
+        observer.middleware(HandlerMetricsMiddleware())
+        observer.middleware(HandlerTracingMiddleware())
+        observer.middleware(QueryBudgetMiddleware(
+            max_queries=config.query_budget.max_queries, max_duration=config.query_budget.max_duration
+        ))
+
+    # Профилировщик для /profile; если он отключен, ничего не создается
+    dp["profiler"] = None
+    if config.profiler.enabled:
+        dp["profiler"] = SamplingProfiler(code_labels("handler", (
+            (handler.callback.__name__, handler.callback)
+            for router in dp.chain_tail
+            for observer in router.observers.values()
+            for handler in observer.handlers
+        )), interval=config.profiler.interval)
+
+    return dp
+
+class EmbeddedApiServer(uvicorn.Server):
+    """
+    Сервер uvicorn для совмещенного режима. Сигналы завершения обрабатывает
+    диспетчер бота, поэтому сервер не устанавливает свои обработчики.
+    """
+    def install_signal_handlers(self) -> None:
+        pass
+
+def create_api_server(config: Config, registry: Optional[TenantRegistry] = None) -> EmbeddedApiServer:
+    """
+    Создает сервер административного API для запуска в цикле событий бота.
+    Приложение использует тот же движок, пул соединений и шину кэша, что и бот.
+    В многоарендном режиме API каждого салона доступно по префиксу /t/{tenant_id}
+    и работает с ресурсами салона из реестра.
+
+    Args:
+        config (Config): Конфигурация приложения.
+        registry (Optional[TenantRegistry]): Реестр салонов (многоарендный режим).
+
+    Returns:
+        EmbeddedApiServer: Сервер uvicorn (запускается через serve()).
+    """
+    from miniapp.app import app
+
+    if registry is not None:
+        from miniapp.tenants import TenantApiMiddleware
+        app = TenantApiMiddleware(app, registry)
+
+    # log_config=None: логирование уже настроено через очередь
+    return EmbeddedApiServer(uvicorn.Config(
+        app, host=config.run.api_host, port=config.run.api_port, log_config=None
+    ))
+
+async def run_multitenant(config: Config) -> None:
+    """
+    Запускает многоарендный режим: боты всех салонов из TENANTS_FILE получают
+    обновления через вебхуки одного aiohttp-сервера и обрабатываются одним диспетчером.
+    Административное API всех салонов обслуживается этим же процессом
+    на API_HOST:API_PORT по адресам /t/{tenant_id}/...
+    Ресурсы салона (движок БД, буфер уведомлений) создаются при первом обновлении
+    или запросе API и освобождаются после TENANT_IDLE_TTL секунд простоя.
+
+    Args:
+        config (Config): Конфигурация приложения.
+    """
+    tenants = load_tenants(config.tenants.file, config.tenants.database_url)
+    registry = TenantRegistry(tenants, config)
+    registry.session.middleware(TelegramApiMetricsMiddleware())
+    registry.session.middleware(TelegramApiTracingMiddleware())
+    configure_tracing("bot")
+    dp = create_dispatcher(config, None, registry)
+
+    scheduler = AsyncIOScheduler(timezone=config.scheduler.timezone)
+    instrument_scheduler(scheduler)
+    metrics_server = await start_metrics_server(config.metrics.host, config.metrics.port)
+
+    app = web.Application()
+    TenantRequestHandler(dp, registry).register(app, path=WEBHOOK_PATH)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    # Кэш версий (enable_stamp_cache) не включается: его ключи не различают базы салонов
+    api_server = create_api_server(config, registry)
+    api_task = None
+
+    try:
+        if config.tenants.webhook_base_url:
+            await registry.set_webhooks(config.tenants.webhook_base_url, dp.resolve_used_update_types())
+        else:
+            logger.warning("WEBHOOK_BASE_URL не задан: вебхуки ботов должны быть установлены заранее.")
+
+        setup_tenant_scheduler(scheduler, registry)
+        scheduler.start()
+        registry.start()
+        api_task = asyncio.create_task(api_server.serve())
+
+        await web.TCPSite(runner, config.tenants.webhook_host, config.tenants.webhook_port).start()
+        logger.info(
+            f"Многоарендный режим: {len(tenants)} салонов, вебхуки на "
+            f"http://{config.tenants.webhook_host}:{config.tenants.webhook_port}{WEBHOOK_PATH}, "
+            f"API на http://{config.run.api_host}:{config.run.api_port}/t/{{tenant_id}}/"
+        )
+        # Работаем до SIGTERM/SIGINT (docker stop, Ctrl+C). Обработчики ставятся явно:
+        # без них процесс завершился бы, не выполнив finally, и буферы уведомлений
+        # салонов и движки БД не были бы закрыты
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop_event.set)
+        await stop_event.wait()
+        logger.info("Получен сигнал остановки.")
+    finally:
+        scheduler.shutdown()
+        if api_task is not None:
+            api_server.should_exit = True
+            await api_task
+        # Закрытие сервера вызывает registry.close() через TenantRequestHandler
+        await runner.cleanup()
+        if metrics_server is not None:
+            metrics_server.close()
+        logger.info("Бот остановлен.")
+
 async def main() -> None:
     """
     Основная функция для запуска Telegram-бота и планировщика задач.
@@ -29,30 +209,38 @@ async def main() -> None:
     # Загрузка конфигурации
     config: Config = load_config()
 
+    if config.run.mode == "multitenant":
+        await run_multitenant(config)
+        return
+
     # Инициализация бота и диспетчера
     bot = Bot(token=config.tg_bot.token, parse_mode=ParseMode.HTML)
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
+    bot.session.middleware(TelegramApiMetricsMiddleware())
+    bot.session.middleware(TelegramApiTracingMiddleware())
+    configure_tracing("bot")
+    admin_notifier = AdminNotifier(bot, config.tg_bot.admin_id, window=config.notifications.admin_digest_window)
+    dp = create_dispatcher(config, admin_notifier)
 
     # Инициализация планировщика
     scheduler = AsyncIOScheduler(timezone=config.scheduler.timezone)
+    instrument_scheduler(scheduler)
 
     # Инициализация базы данных
     await init_db()
     async with AsyncSessionLocal() as session:
         await create_initial_data(session)
 
-    # Регистрация роутеров (порядок важен: от специфичных к общим)
-    dp.include_router(start.router)
-    dp.include_router(menu.router)
-    dp.include_router(booking.router)
-    dp.include_router(appointments.router)
-    dp.include_router(contacts.router)
-    dp.include_router(unknown.router)
-    dp.include_router(error_handler.router)
-
-    # Регистрация middleware
-    dp.update.middleware(DbSessionMiddleware(session_pool=AsyncSessionLocal))
+    combined = config.run.mode == "combined"
+    api_server = None
+    api_task = None
+    if combined:
+        # Все записи идут через этот процесс, поэтому версии можно кэшировать в памяти
+        enable_stamp_cache()
+        api_server = create_api_server(config)
+        logger.info(f"Совмещенный режим: API на http://{config.run.api_host}:{config.run.api_port}")
+    # Локальный сервер метрик запускается во всех режимах: /metrics в API доступен
+    # только при заданном METRICS_TOKEN, и без него метрики бота иначе бы пропали
+    metrics_server = await start_metrics_server(config.metrics.host, config.metrics.port)
 
     try:
         # Настройка и запуск задач планировщика
@@ -60,11 +248,22 @@ async def main() -> None:
         scheduler.start()
         logger.info("Планировщик запущен.")
 
+        admin_notifier.start()
+
+        if api_server is not None:
+            api_task = asyncio.create_task(api_server.serve())
+
         # Запуск бота
         await dp.start_polling(bot)
     finally:
         # Остановка планировщика и бота при завершении работы
         scheduler.shutdown()
+        if api_task is not None:
+            api_server.should_exit = True
+            await api_task
+        if metrics_server is not None:
+            metrics_server.close()
+        await admin_notifier.stop()
         await bot.session.close()
         logger.info("Бот остановлен.")
 
@@ -0,0 +1,63 @@
+import time
+from typing import Callable, Dict, Any, Awaitable
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import TelegramMethod, Response
+from aiogram.types import TelegramObject
+
+from utils.metrics import BOT_UPDATE_DURATION, BOT_UPDATE_ERRORS, TELEGRAM_API_DURATION, TELEGRAM_API_ERRORS
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """
+    Middleware для учета времени работы и ошибок обработчиков бота.
+    Регистрируется как внутренний (dp.message.middleware(...)), чтобы
+    обработчик уже был выбран и его имя можно было использовать как метку.
+    """
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Вызывает обработчик и записывает его длительность.
+
+        Args:
+            handler (Callable): Обработчик события.
+            event (TelegramObject): Объект события.
+            data (Dict[str, Any]): Словарь с данными события.
+
+        Returns:
+            Any: Результат выполнения обработчика.
+        """
+        handler_object = data.get("handler")
+        name = getattr(getattr(handler_object, "callback", None), "__name__", "unknown")
+        started_at = time.perf_counter()
+        try:
+            return await handler(event, data)
+        except Exception:
+            BOT_UPDATE_ERRORS.labels(name).inc()
+            raise
+        finally:
+            BOT_UPDATE_DURATION.labels(name).observe(time.perf_counter() - started_at)
+
+class TelegramApiMetricsMiddleware(BaseRequestMiddleware):
+    """
+    Middleware сессии бота для учета времени и ошибок вызовов Telegram Bot API.
+    """
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod
+    ) -> Response:
+        name = type(method).__name__
+        started_at = time.perf_counter()
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            TELEGRAM_API_ERRORS.labels(name, type(e).__name__).inc()
+            raise
+        finally:
+            TELEGRAM_API_DURATION.labels(name).observe(time.perf_counter() - started_at)
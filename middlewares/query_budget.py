@@ -0,0 +1,41 @@
+from typing import Callable, Dict, Any, Awaitable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from utils.query_budget import track_queries, check_budget
+
+class QueryBudgetMiddleware(BaseMiddleware):
+    """
+    Middleware для контроля количества и времени SQL-запросов одного обработчика.
+    Регистрируется как внутренний, чтобы в предупреждении было имя обработчика.
+    """
+    def __init__(self, max_queries: int, max_duration: float):
+        super().__init__()
+        self.max_queries = max_queries
+        self.max_duration = max_duration
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Вызывает обработчик и проверяет, уложился ли он в бюджет запросов.
+
+        Args:
+            handler (Callable): Обработчик события.
+            event (TelegramObject): Объект события.
+            data (Dict[str, Any]): Словарь с данными события.
+
+        Returns:
+            Any: Результат выполнения обработчика.
+        """
+        handler_object = data.get("handler")
+        name = getattr(getattr(handler_object, "callback", None), "__name__", "unknown")
+        with track_queries() as stats:
+            try:
+                return await handler(event, data)
+            finally:
+                check_budget(name, stats, self.max_queries, self.max_duration)
@@ -0,0 +1,49 @@
+import logging
+from typing import Callable, Dict, Any, Awaitable
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.types import TelegramObject
+
+from utils.tenants import TenantRegistry
+
+logger = logging.getLogger(__name__)
+
+class TenantMiddleware(BaseMiddleware):
+    """
+    Middleware многоарендного режима (вместо DbSessionMiddleware). Определяет салон
+    по боту, получившему обновление, и передает в обработчики сессию базы данных
+    салона, его администратора и буфер уведомлений.
+    """
+    def __init__(self, registry: TenantRegistry):
+        super().__init__()
+        self.registry = registry
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Выполняет обработчик с ресурсами салона.
+
+        Args:
+            handler (Callable): Обработчик события.
+            event (TelegramObject): Объект события (обновление).
+            data (Dict[str, Any]): Словарь с данными события.
+
+        Returns:
+            Any: Результат выполнения обработчика или None для неизвестного бота.
+        """
+        bot: Bot = data["bot"]
+        tenant_id = self.registry.tenant_for_bot(bot.id)
+        if tenant_id is None:
+            logger.warning(f"Обновление для незарегистрированного бота {bot.id}")
+            return None
+
+        async with self.registry.use(tenant_id) as runtime, runtime.session_pool() as session:
+            data["session"] = session
+            data["tenant"] = runtime.tenant
+            data["admin_id"] = runtime.tenant.admin_id
+            data["admin_notifier"] = runtime.admin_notifier
+            return await handler(event, data)
@@ -0,0 +1,53 @@
+from typing import Callable, Dict, Any, Awaitable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update, User
+
+from utils.rate_limit import TokenBucketLimiter
+
+THROTTLED_MESSAGE = "Слишком много запросов. Пожалуйста, подождите немного."
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Middleware для ограничения частоты обновлений от одного пользователя.
+    Должен регистрироваться раньше DbSessionMiddleware, чтобы отклоненные
+    обновления не открывали сессию базы данных.
+
+    На отклоненный callback всегда отвечается всплывающим уведомлением, а на
+    отклоненное сообщение - не чаще одного ответа за время полного пополнения
+    корзины, чтобы флуд не превращался в такой же поток ответов бота.
+    """
+    def __init__(self, limiter: TokenBucketLimiter):
+        super().__init__()
+        self.limiter = limiter
+        self.reply_limiter = TokenBucketLimiter(rate=limiter.rate / limiter.burst, burst=1)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Пропускает обновление в обработчик, если лимит пользователя не исчерпан.
+
+        Args:
+            handler (Callable): Обработчик события.
+            event (TelegramObject): Объект события (обновление).
+            data (Dict[str, Any]): Словарь с данными события.
+
+        Returns:
+            Any: Результат выполнения обработчика или None для отклоненного обновления.
+        """
+        user: User | None = data.get("event_from_user")
+        # Лимит отдельный для каждого бота (в многоарендном режиме - для каждого салона)
+        key = (data["bot"].id, user.id) if user is not None else None
+        if key is None or self.limiter.allow(key):
+            return await handler(event, data)
+
+        # Отвечаем без обращения к БД: на callback - чтобы у клиента пропал индикатор загрузки
+        if isinstance(event, Update) and event.callback_query:
+            await event.callback_query.answer(THROTTLED_MESSAGE)
+        elif isinstance(event, Update) and event.message and self.reply_limiter.allow(key):
+            await event.message.answer(THROTTLED_MESSAGE)
+        return None
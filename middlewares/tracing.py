@@ -0,0 +1,73 @@
+from typing import Callable, Dict, Any, Awaitable
+
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.methods import TelegramMethod, Response
+from aiogram.types import TelegramObject, Update
+
+from utils.tracing import start_trace, span
+
+class UpdateTracingMiddleware(BaseMiddleware):
+    """
+    Middleware, начинающий трассу для каждого обновления. Регистрируется
+    первым на dp.update, чтобы в трассу попали все остальные middleware.
+    """
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Выполняет обработку обновления внутри трассы.
+
+        Args:
+            handler (Callable): Обработчик события.
+            event (TelegramObject): Объект события (обновление).
+            data (Dict[str, Any]): Словарь с данными события.
+
+        Returns:
+            Any: Результат выполнения обработчика.
+        """
+        update_type = event.event_type if isinstance(event, Update) else type(event).__name__
+        with start_trace(f"update {update_type}", "SERVER", update_id=getattr(event, "update_id", "")):
+            return await handler(event, data)
+
+class HandlerTracingMiddleware(BaseMiddleware):
+    """
+    Внутренний middleware, оборачивающий выбранный обработчик в участок трассы.
+    """
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        """
+        Вызывает обработчик внутри участка трассы с его именем.
+
+        Args:
+            handler (Callable): Обработчик события.
+            event (TelegramObject): Объект события.
+            data (Dict[str, Any]): Словарь с данными события.
+
+        Returns:
+            Any: Результат выполнения обработчика.
+        """
+        handler_object = data.get("handler")
+        name = getattr(getattr(handler_object, "callback", None), "__name__", "unknown")
+        with span(f"handler {name}"):
+            return await handler(event, data)
+
+class TelegramApiTracingMiddleware(BaseRequestMiddleware):
+    """
+    Middleware сессии бота, добавляющий участок трассы для каждого вызова Bot API.
+    """
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType,
+        bot: Bot,
+        method: TelegramMethod
+    ) -> Response:
+        with span(f"telegram {type(method).__name__}", "CLIENT"):
+            return await make_request(bot, method)
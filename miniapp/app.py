@@ -1,14 +1,19 @@
 import logging
-from pathlib import Path
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse, HTMLResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware
 
-from miniapp.routers import services, appointments, schedule, settings
+from miniapp.rate_limit import RateLimitMiddleware
+from miniapp import metrics
+from miniapp.query_budget import QueryBudgetMiddleware
+from miniapp.tracing import TracingMiddleware
+from utils.tracing import configure_tracing
+from miniapp.assets import AssetStore, create_assets_router
+from miniapp.routers import services, masters, appointments, schedule, settings, calendar, events, analytics, profiler
+from utils.logging_setup import setup_logging
 
-logging.basicConfig(level=logging.INFO)
+# Настройка логирования (запись в фоновом потоке, не блокирует цикл событий)
+setup_logging("miniapp")
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
@@ -17,9 +22,18 @@ app = FastAPI(
     version="1.0.0"
 )
 
-BASE_DIR = Path(__file__).resolve().parent
-app.mount("/static", StaticFiles(directory=str(BASE_DIR / "static")), name="static")
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
+# Статические файлы хэшируются и сжимаются, а index.html рендерится один раз при запуске
+app.include_router(create_assets_router(AssetStore()))
+
+# Ограничение частоты запросов к /api по адресу клиента
+app.add_middleware(RateLimitMiddleware)
+# Время обработки запросов для /metrics (включая отклоненные ограничителем)
+app.add_middleware(metrics.MetricsMiddleware)
+# Предупреждения о запросах, превысивших бюджет SQL-запросов (поиск N+1)
+app.add_middleware(QueryBudgetMiddleware)
+# Трасса запроса (участки SQL-запросов добавляются автоматически), TRACING_SAMPLE_RATE > 0
+configure_tracing("miniapp")
+app.add_middleware(TracingMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,9 +44,15 @@ app.add_middleware(
 )
 
 app.include_router(services.router)
+app.include_router(masters.router)
 app.include_router(appointments.router)
 app.include_router(schedule.router)
 app.include_router(settings.router)
+app.include_router(calendar.router)
+app.include_router(events.router)
+app.include_router(analytics.router)
+app.include_router(profiler.router)
+app.include_router(metrics.router)
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -45,13 +65,6 @@ async def global_exception_handler(request: Request, exc: Exception):
         content={"detail": "Внутренняя ошибка сервера"}
     )
 
-@app.get("/", response_class=HTMLResponse)
-async def read_root(request: Request):
-    """
-    Главная страница административной панели.
-    """
-    return templates.TemplateResponse("index.html", {"request": request})
-
 @app.get("/api")
 async def api_info():
     """
@@ -0,0 +1,200 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+from dataclasses import dataclass
+from pathlib import Path
+
+import brotli
+from fastapi import APIRouter, HTTPException, Request, Response
+from jinja2 import Environment, FileSystemLoader
+
+from miniapp.etag import etag_matches
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent
+STATIC_DIR = BASE_DIR / "static"
+TEMPLATES_DIR = BASE_DIR / "templates"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# Файлы меньше этого размера не сжимаются
+MIN_COMPRESS_SIZE = 256
+
+@dataclass
+class Asset:
+    """
+    Подготовленный к отдаче файл: исходное содержимое и сжатые варианты.
+
+    Attributes:
+        content (bytes): Исходное содержимое.
+        gzip (bytes | None): Вариант, сжатый gzip.
+        br (bytes | None): Вариант, сжатый brotli.
+        media_type (str): MIME-тип.
+        etag (str): Строгий ETag исходного содержимого (у сжатых вариантов
+            к нему добавляется суффикс кодировки, см. variant_etag).
+        cache_control (str): Значение заголовка Cache-Control.
+    """
+    content: bytes
+    gzip: bytes | None
+    br: bytes | None
+    media_type: str
+    etag: str
+    cache_control: str
+
+def make_asset(content: bytes, media_type: str, cache_control: str) -> Asset:
+    """
+    Подготавливает файл к отдаче: считает ETag и заранее сжимает содержимое.
+    """
+    compress = len(content) >= MIN_COMPRESS_SIZE
+    return Asset(
+        content=content,
+        gzip=gzip.compress(content, compresslevel=9, mtime=0) if compress else None,
+        br=brotli.compress(content, quality=11) if compress else None,
+        media_type=media_type,
+        etag=f'"{hashlib.sha256(content).hexdigest()[:32]}"',
+        cache_control=cache_control,
+    )
+
+class AssetStore:
+    """
+    Статические файлы админ-панели, подготовленные при запуске.
+
+    Каждый файл из static/ доступен под именем с хэшем содержимого
+    (например, script.3f2a9c1b7d4e.js) и кэшируется клиентом навсегда.
+    index.html рендерится один раз со ссылками на хэшированные имена.
+    """
+    def __init__(self, static_dir: Path = STATIC_DIR, templates_dir: Path = TEMPLATES_DIR):
+        self.assets: dict[str, Asset] = {}
+        self.urls: dict[str, str] = {}
+
+        for path in sorted(static_dir.iterdir()):
+            if not path.is_file():
+                continue
+            content = path.read_bytes()
+            media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            if media_type.startswith("text/") or media_type == "application/javascript":
+                media_type += "; charset=utf-8"
+
+            digest = hashlib.sha256(content).hexdigest()[:12]
+            hashed_name = f"{path.stem}.{digest}{path.suffix}"
+            self.assets[hashed_name] = make_asset(content, media_type, IMMUTABLE_CACHE_CONTROL)
+            # Исходные имена остаются доступны, но требуют перепроверки
+            self.assets[path.name] = make_asset(content, media_type, REVALIDATE_CACHE_CONTROL)
+            self.urls[path.name] = f"/static/{hashed_name}"
+
+        environment = Environment(loader=FileSystemLoader(str(templates_dir)), autoescape=True)
+        index_html = environment.get_template("index.html").render(asset_url=self.asset_url)
+        self.index = make_asset(index_html.encode(), "text/html; charset=utf-8", REVALIDATE_CACHE_CONTROL)
+
+        logger.info(f"Подготовлено статических файлов: {len(self.urls)}")
+
+    def asset_url(self, name: str) -> str:
+        """
+        Возвращает URL файла из static/ с хэшем содержимого в имени.
+        """
+        return self.urls[name]
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """
+    Разбирает заголовок Accept-Encoding.
+
+    Args:
+        header (str): Значение заголовка (например, "gzip, br;q=0.5, *;q=0").
+
+    Returns:
+        dict[str, float]: {кодировка в нижнем регистре: вес q}. Кодировки без q имеют вес 1.
+    """
+    weights = {}
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    return weights
+
+def choose_encoding(asset: Asset, accept_encoding: str) -> str | None:
+    """
+    Выбирает сжатый вариант файла с наибольшим весом q среди принимаемых клиентом
+    (при равных весах - brotli как более компактный).
+
+    Args:
+        asset (Asset): Файл.
+        accept_encoding (str): Значение заголовка Accept-Encoding.
+
+    Returns:
+        str | None: "br", "gzip" или None для исходного содержимого.
+    """
+    weights = parse_accept_encoding(accept_encoding)
+    default = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding, body in (("br", asset.br), ("gzip", asset.gzip)):
+        q = weights.get(encoding, default)
+        if body is not None and q > best_q:
+            best, best_q = encoding, q
+    # Исходное содержимое выбирается вместо сжатого, только если клиент явно предпочитает его
+    if best is not None and weights.get("identity", 0.0) > best_q:
+        return None
+    return best
+
+def variant_etag(asset: Asset, encoding: str | None) -> str:
+    """
+    Возвращает строгий ETag варианта файла: байты сжатых вариантов отличаются
+    от исходных, поэтому у каждого варианта свой ETag.
+    """
+    if encoding is None:
+        return asset.etag
+    return f'{asset.etag[:-1]}-{encoding}"'
+
+def asset_response(request: Request, asset: Asset) -> Response:
+    """
+    Отдает подготовленный файл в наиболее подходящем клиенту варианте
+    (Accept-Encoding с учетом весов q) или 304 при совпадении ETag этого варианта.
+    """
+    encoding = choose_encoding(asset, request.headers.get("accept-encoding", ""))
+    etag = variant_etag(asset, encoding)
+    headers = {"ETag": etag, "Cache-Control": asset.cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(etag, request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    body = asset.content
+    if encoding is not None:
+        body = getattr(asset, encoding)
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type=asset.media_type, headers=headers)
+
+def create_assets_router(store: AssetStore) -> APIRouter:
+    """
+    Создает роутер для index.html и статических файлов из подготовленного хранилища.
+    """
+    router = APIRouter(tags=["static"])
+
+    @router.get("/", include_in_schema=False)
+    async def read_root(request: Request):
+        """
+        Главная страница административной панели.
+        """
+        return asset_response(request, store.index)
+
+    @router.get("/static/{name}", include_in_schema=False)
+    async def read_static(name: str, request: Request):
+        """
+        Статический файл административной панели.
+        """
+        asset = store.assets.get(name)
+        if asset is None:
+            raise HTTPException(status_code=404, detail="Файл не найден")
+        return asset_response(request, asset)
+
+    return router
@@ -1,17 +1,62 @@
 import hashlib
 import hmac
+import json
+import time
+from collections import OrderedDict
 from typing import Optional
 from urllib.parse import parse_qsl
 
-from fastapi import HTTPException, Header
+from fastapi import HTTPException, Header, Query
 from config import load_config
+from miniapp.tenants import current_tenant
+from utils.metrics import CACHE_HITS, CACHE_MISSES
 
 config = load_config()
 
+# Максимальный возраст init data (по полю auth_date), в секундах
+INIT_DATA_MAX_AGE = 24 * 60 * 60
+# Максимальное количество проверенных init data в кэше
+VERIFIED_CACHE_SIZE = 256
+
+# Секретный ключ зависит только от токена бота, поэтому вычисляется один раз
+SECRET_KEY = hmac.new(
+    key=b"WebAppData",
+    msg=config.tg_bot.token.encode(),
+    digestmod=hashlib.sha256
+).digest()
+
+# (ID салона, init_data) -> (момент истечения, распарсенные данные) в порядке последнего обращения (LRU).
+# ID салона входит в ключ, чтобы init data, проверенные ключом одного бота, не принимались другим салоном
+_verified_cache: OrderedDict[tuple[str, str], tuple[float, dict]] = OrderedDict()
+_cache_hits = CACHE_HITS.labels("init_data")
+_cache_misses = CACHE_MISSES.labels("init_data")
+
+def _get_cached(key: tuple[str, str], now: float) -> Optional[dict]:
+    entry = _verified_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, parsed_data = entry
+    if expires_at <= now:
+        del _verified_cache[key]
+        return None
+    # Активная сессия панели не должна вытесняться первой только потому, что начата раньше других
+    _verified_cache.move_to_end(key)
+    return parsed_data
+
+def _put_cached(key: tuple[str, str], expires_at: float, parsed_data: dict) -> None:
+    _verified_cache[key] = (expires_at, parsed_data)
+    _verified_cache.move_to_end(key)
+    if len(_verified_cache) > VERIFIED_CACHE_SIZE:
+        _verified_cache.popitem(last=False)
+
 def verify_telegram_web_app_data(init_data: str) -> dict:
     """
     Проверяет подпись данных от Telegram WebApp Init Data.
 
+    Успешно проверенные строки кэшируются до истечения срока действия auth_date,
+    поэтому повторные запросы панели не пересчитывают подпись. В многоарендном
+    режиме подпись проверяется ключом бота салона, которому адресован запрос.
+
     Args:
         init_data (str): Строка с данными инициализации от Telegram WebApp.
 
@@ -19,8 +64,19 @@ def verify_telegram_web_app_data(init_data: str) -> dict:
         dict: Распарсенные данные пользователя.
 
     Raises:
-        HTTPException: Если подпись недействительна.
+        HTTPException: Если подпись недействительна или данные устарели.
     """
+    tenant = current_tenant()
+    secret_key = tenant.web_app_secret if tenant is not None else SECRET_KEY
+    cache_key = (tenant.id if tenant is not None else "", init_data)
+
+    now = time.time()
+    cached = _get_cached(cache_key, now)
+    if cached is not None:
+        _cache_hits.inc()
+        return cached
+    _cache_misses.inc()
+
     try:
         parsed_data = dict(parse_qsl(init_data))
 
@@ -31,28 +87,30 @@ def verify_telegram_web_app_data(init_data: str) -> dict:
 
         data_check_string = '\n'.join(f"{k}={v}" for k, v in sorted(parsed_data.items()))
 
-        secret_key = hmac.new(
-            key=b"WebAppData",
-            msg=config.tg_bot.token.encode(),
-            digestmod=hashlib.sha256
-        ).digest()
-
         calculated_hash = hmac.new(
             key=secret_key,
             msg=data_check_string.encode(),
             digestmod=hashlib.sha256
         ).hexdigest()
 
-        if calculated_hash != received_hash:
+        if not hmac.compare_digest(calculated_hash, received_hash):
             raise HTTPException(status_code=403, detail="Invalid hash")
 
-        return parsed_data
+        expires_at = int(parsed_data.get('auth_date', 0)) + INIT_DATA_MAX_AGE
+        if expires_at <= now:
+            raise HTTPException(status_code=403, detail="Init data expired")
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=403, detail=f"Verification failed: {str(e)}")
 
+    _put_cached(cache_key, expires_at, parsed_data)
+    return parsed_data
+
 async def verify_admin(authorization: Optional[str] = Header(None)) -> dict:
     """
-    Проверяет, является ли пользователь администратором.
+    Проверяет, является ли пользователь администратором (в многоарендном
+    режиме - администратором салона, которому адресован запрос).
 
     Args:
         authorization (Optional[str]): Заголовок Authorization с init_data.
@@ -75,11 +133,50 @@ async def verify_admin(authorization: Optional[str] = Header(None)) -> dict:
     if 'user' not in user_data:
         raise HTTPException(status_code=403, detail="User data not found")
 
-    import json
     user_info = json.loads(user_data['user'])
     user_id = user_info.get('id')
 
-    if user_id != config.tg_bot.admin_id:
+    tenant = current_tenant()
+    admin_id = tenant.admin_id if tenant is not None else config.tg_bot.admin_id
+    if user_id != admin_id:
         raise HTTPException(status_code=403, detail="Access denied")
 
     return user_info
+
+async def verify_feed_token(token: str = Query("")) -> None:
+    """
+    Проверяет токен доступа к iCalendar-ленте (календарные клиенты
+    не умеют передавать Telegram init data, поэтому используется секретный токен в URL).
+    В многоарендном режиме у каждого салона свой токен.
+
+    Args:
+        token (str): Токен из параметра запроса.
+
+    Raises:
+        HTTPException: Если лента отключена или токен неверен.
+    """
+    tenant = current_tenant()
+    feed_token = tenant.calendar_feed_token if tenant is not None else config.calendar_feed.token
+    if not feed_token:
+        raise HTTPException(status_code=404, detail="Calendar feed disabled")
+
+    if not hmac.compare_digest(token.encode(), feed_token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid token")
+
+async def verify_metrics_token(authorization: str = Header("")) -> None:
+    """
+    Проверяет Bearer-токен доступа к /metrics (Prometheus не умеет передавать
+    Telegram init data, а метрики не должны быть доступны всем, кто видит API).
+
+    Args:
+        authorization (str): Заголовок Authorization вида "Bearer <токен>".
+
+    Raises:
+        HTTPException: Если метрики отключены или токен неверен.
+    """
+    if not config.metrics.token:
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip().encode(), config.metrics.token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid token", headers={"WWW-Authenticate": "Bearer"})
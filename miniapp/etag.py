@@ -0,0 +1,51 @@
+from typing import Callable, Awaitable
+
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.session import get_async_session
+from utils.change_stamps import get_stamp
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """
+    Проверяет, совпадает ли ETag с одним из значений заголовка If-None-Match.
+
+    Args:
+        etag (str): Текущий ETag ресурса (в кавычках).
+        if_none_match (str | None): Значение заголовка If-None-Match.
+
+    Returns:
+        bool: True, если клиент уже имеет актуальную версию.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in if_none_match.split(","))
+
+def conditional_get(*names: str) -> Callable[..., Awaitable[dict]]:
+    """
+    Создает зависимость для условных GET-запросов по отметкам изменения таблиц.
+
+    Зависимость вычисляет строгий ETag по версиям таблиц `names` и, если он совпадает
+    с If-None-Match, сразу отвечает 304 без выполнения основного запроса.
+    Иначе возвращает заголовки, которые нужно добавить к ответу.
+
+    Args:
+        *names (str): Имена таблиц, от которых зависит ответ.
+
+    Returns:
+        Callable: Зависимость FastAPI, возвращающая словарь заголовков.
+    """
+    async def dependency(request: Request, session: AsyncSession = Depends(get_async_session)) -> dict:
+        version, updated_at = await get_stamp(session, *names)
+        stamp = int(updated_at.timestamp() * 1_000_000) if updated_at else 0
+        etag = f'"{version}-{stamp}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if etag_matches(etag, request.headers.get("if-none-match")):
+            raise HTTPException(status_code=304, headers=headers)
+
+        return headers
+
+    return dependency
@@ -0,0 +1,48 @@
+import time
+
+from fastapi import APIRouter, Depends, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from miniapp.auth import verify_metrics_token
+from utils.metrics import CONTENT_TYPE, HTTP_REQUEST_DURATION, render_metrics
+
+router = APIRouter(tags=["metrics"])
+
+class MetricsMiddleware:
+    """
+    ASGI middleware для учета времени обработки запросов по шаблону маршрута
+    (например, /api/appointments/{appointment_id}), а не по фактическому пути,
+    чтобы количество значений меток оставалось ограниченным.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Маршрутизатор дописывает найденный маршрут в scope
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_DURATION.labels(scope["method"], route, status_code).observe(
+                time.perf_counter() - started_at
+            )
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(verify_metrics_token)])
+async def metrics():
+    """
+    Метрики процесса в текстовом формате Prometheus (доступ по METRICS_TOKEN).
+    """
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE)
@@ -0,0 +1,32 @@
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config import load_config
+from utils.query_budget import track_queries, check_budget
+
+config = load_config()
+
+class QueryBudgetMiddleware:
+    """
+    ASGI middleware для контроля количества и времени SQL-запросов одного HTTP-запроса.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_queries: int = config.query_budget.max_queries,
+        max_duration: float = config.query_budget.max_duration
+    ):
+        self.app = app
+        self.max_queries = max_queries
+        self.max_duration = max_duration
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                route = getattr(scope.get("route"), "path", scope["path"])
+                check_budget(f"{scope['method']} {route}", stats, self.max_queries, self.max_duration)
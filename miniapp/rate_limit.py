@@ -0,0 +1,39 @@
+import math
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config import load_config
+from utils.rate_limit import TokenBucketLimiter
+
+config = load_config()
+
+API_PREFIX = "/api"
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware, ограничивающий частоту запросов к API по адресу клиента.
+    Отклоненный запрос получает ответ 429 с заголовком Retry-After
+    и не доходит до проверки авторизации и базы данных.
+    """
+    def __init__(self, app: ASGIApp, rate: float = config.rate_limit.api_rate, burst: int = config.rate_limit.api_burst):
+        self.app = app
+        self.limiter = TokenBucketLimiter(rate=rate, burst=burst)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(API_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        retry_after = self.limiter.retry_after(client[0] if client else None)
+        if retry_after == 0:
+            await self.app(scope, receive, send)
+            return
+
+        response = JSONResponse(
+            status_code=429,
+            content={"detail": "Слишком много запросов"},
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)) if math.isfinite(retry_after) else 60)}
+        )
+        await response(scope, receive, send)
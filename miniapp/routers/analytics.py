@@ -0,0 +1,152 @@
+import datetime
+import logging
+from collections import defaultdict
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import DailyStats, Service, WorkSchedule, Holiday
+from database.session import get_async_session
+from miniapp.auth import verify_admin
+from utils.analytics import STAT_FIELDS
+from utils.time_utils import as_date
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/analytics", tags=["analytics"])
+
+MAX_RANGE_DAYS = 3 * 366
+
+class AnalyticsItem(BaseModel):
+    period: str
+    service_id: int | None = None
+    service_name: str | None = None
+    bookings: int
+    cancellations: int
+    completed: int
+    booked_minutes: int
+    booked_revenue: float
+    revenue: float
+    capacity_minutes: int
+    occupancy: float
+
+class AnalyticsResponse(BaseModel):
+    group_by: str
+    items: List[AnalyticsItem]
+    totals: AnalyticsItem
+
+def period_key(day: datetime.date, group_by: str) -> str:
+    """
+    Возвращает ключ периода для дня: дата, понедельник недели или месяц (YYYY-MM).
+    """
+    if group_by == "week":
+        return (day - datetime.timedelta(days=day.weekday())).isoformat()
+    if group_by == "month":
+        return f"{day.year:04d}-{day.month:02d}"
+    return day.isoformat()
+
+async def get_capacity_by_day(session: AsyncSession, date_from: datetime.date, date_to: datetime.date) -> dict:
+    """
+    Рассчитывает рабочее время мастера (в минутах) по дням диапазона
+    по расписанию и выходным.
+    """
+    result = await session.execute(select(WorkSchedule))
+    minutes_by_weekday = {
+        schedule.weekday: (
+            (schedule.end_time.hour * 60 + schedule.end_time.minute)
+            - (schedule.start_time.hour * 60 + schedule.start_time.minute)
+        ) if schedule.is_working else 0
+        for schedule in result.scalars().all()
+    }
+
+    result = await session.execute(
+        select(Holiday.date).where(Holiday.date >= date_from, Holiday.date <= date_to)
+    )
+    holidays = {as_date(value) for value in result.scalars().all()}
+
+    capacity = {}
+    day = date_from
+    while day <= date_to:
+        capacity[day] = 0 if day in holidays else max(minutes_by_weekday.get(day.weekday(), 0), 0)
+        day += datetime.timedelta(days=1)
+    return capacity
+
+def build_item(period: str, values: list, capacity_minutes: int, service_id=None, service_name=None) -> AnalyticsItem:
+    """
+    Формирует элемент отчета с процентом загрузки.
+    """
+    stats = dict(zip(STAT_FIELDS, values))
+    occupancy = round(stats["booked_minutes"] / capacity_minutes * 100, 1) if capacity_minutes else 0.0
+    return AnalyticsItem(
+        period=period,
+        service_id=service_id,
+        service_name=service_name,
+        capacity_minutes=capacity_minutes,
+        occupancy=occupancy,
+        **stats
+    )
+
+@router.get("/", response_model=AnalyticsResponse)
+async def get_analytics(
+    date_from: datetime.date,
+    date_to: datetime.date,
+    group_by: str = Query("day", pattern="^(day|week|month)$"),
+    by_service: bool = False,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Выручка, количество записей и отмен и загрузка мастера по дням, неделям или месяцам
+    (при by_service=true - с разбивкой по услугам). Данные берутся из дневных сводок,
+    поэтому время ответа зависит только от длины диапазона, а не от объема истории.
+    """
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="Дата окончания раньше даты начала")
+    if (date_to - date_from).days + 1 > MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Диапазон не может превышать {MAX_RANGE_DAYS} дней")
+
+    columns = [DailyStats.day]
+    if by_service:
+        columns += [DailyStats.service_id, Service.name]
+    query = select(*columns, *(func.sum(getattr(DailyStats, field)) for field in STAT_FIELDS)).where(
+        DailyStats.day >= date_from, DailyStats.day <= date_to
+    ).group_by(*columns)
+    if by_service:
+        query = query.join(Service, DailyStats.service_id == Service.id)
+
+    result = await session.execute(query)
+    capacity_by_day = await get_capacity_by_day(session, date_from, date_to)
+
+    capacity_by_period = defaultdict(int)
+    for day, minutes in capacity_by_day.items():
+        capacity_by_period[period_key(day, group_by)] += minutes
+
+    grouped = defaultdict(lambda: [0] * len(STAT_FIELDS))
+    names = {}
+    totals = [0] * len(STAT_FIELDS)
+    for row in result.all():
+        day = as_date(row[0])
+        if by_service:
+            key = (period_key(day, group_by), row[1])
+            names[row[1]] = row[2]
+            values = row[3:]
+        else:
+            key = (period_key(day, group_by), None)
+            values = row[1:]
+        for i, value in enumerate(values):
+            grouped[key][i] += value or 0
+            totals[i] += value or 0
+
+    items = [
+        build_item(period, values, capacity_by_period[period], service_id, names.get(service_id))
+        for (period, service_id), values in sorted(grouped.items(), key=lambda item: (item[0][0], item[0][1] or 0))
+    ]
+    return AnalyticsResponse(
+        group_by=group_by,
+        items=items,
+        totals=build_item(
+            f"{date_from.isoformat()}/{date_to.isoformat()}", totals, sum(capacity_by_day.values())
+        )
+    )
@@ -1,20 +1,39 @@
+import base64
+import csv
 import datetime
+import io
 import logging
-from typing import List
+from typing import AsyncIterator, List
 
-from fastapi import APIRouter, Depends, HTTPException
+import orjson
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import select, update, func, or_, and_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from database.models import Appointment, User, Service
-from database.session import get_async_session
+from database.models import Appointment, User, Service, Master
+from database.session import get_async_session, current_session_pool
 from miniapp.auth import verify_admin
+from utils.change_stamps import bump_version
+from utils.events import record_event
+from utils.analytics import StatusChange, apply_status_changes, record_status_change
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/appointments", tags=["appointments"])
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+MAX_BULK_SIZE = 1000
+VALID_STATUSES = ["pending", "confirmed", "cancelled", "completed"]
+EXPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = (
+    "id", "user_id", "user_name", "user_username", "service_id", "service_name",
+    "master_id", "master_name", "start_time", "end_time", "status", "created_at"
+)
+
 class AppointmentResponse(BaseModel):
     id: int
     user_id: int
@@ -22,6 +41,8 @@ class AppointmentResponse(BaseModel):
     user_username: str | None
     service_id: int
     service_name: str
+    master_id: int | None = None
+    master_name: str | None = None
     start_time: datetime.datetime
     end_time: datetime.datetime
     status: str
@@ -30,21 +51,65 @@ class AppointmentResponse(BaseModel):
     class Config:
         from_attributes = True
 
-@router.get("/", response_model=List[AppointmentResponse])
-async def get_appointments(
-    status: str | None = None,
-    date_from: datetime.date | None = None,
-    date_to: datetime.date | None = None,
-    session: AsyncSession = Depends(get_async_session),
-    user: dict = Depends(verify_admin)
+class AppointmentPage(BaseModel):
+    items: List[AppointmentResponse]
+    next_cursor: str | None
+    total: int | None = None
+
+class AppointmentFilter(BaseModel):
+    status: str | None = None
+    date_from: datetime.date | None = None
+    date_to: datetime.date | None = None
+    master_id: int | None = None
+
+class BulkStatusUpdate(BaseModel):
+    status: str
+    ids: List[int] | None = None
+    filter: AppointmentFilter | None = None
+
+class BulkCancel(BaseModel):
+    ids: List[int]
+
+class BulkItemResult(BaseModel):
+    id: int
+    result: str
+
+class BulkResponse(BaseModel):
+    updated: int
+    results: List[BulkItemResult]
+
+def encode_cursor(start_time: datetime.datetime, appointment_id: int) -> str:
+    """
+    Кодирует позицию (start_time, id) последней записи страницы в непрозрачный курсор.
+    """
+    raw = f"{start_time.isoformat()}|{appointment_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    """
+    Декодирует курсор, созданный encode_cursor.
+
+    Raises:
+        HTTPException: Если курсор поврежден.
+    """
+    try:
+        start_time_str, appointment_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.datetime.fromisoformat(start_time_str), int(appointment_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Неверный курсор")
+
+def apply_filters(
+    query,
+    status: str | None,
+    date_from: datetime.date | None,
+    date_to: datetime.date | None,
+    master_id: int | None = None
 ):
     """
-    Получить список всех записей с фильтрацией.
+    Применяет к запросу фильтры списка записей.
     """
-    query = select(Appointment).options(
-        selectinload(Appointment.user),
-        selectinload(Appointment.service)
-    ).order_by(Appointment.start_time.desc())
+    if master_id is not None:
+        query = query.where(Appointment.master_id == master_id)
 
     if status:
         query = query.where(Appointment.status == status)
@@ -55,24 +120,267 @@ async def get_appointments(
     if date_to:
         query = query.where(Appointment.start_time <= datetime.datetime.combine(date_to, datetime.time.max))
 
-    result = await session.execute(query)
-    appointments = result.scalars().all()
-
-    return [
-        AppointmentResponse(
-            id=app.id,
-            user_id=app.user_id,
-            user_name=app.user.full_name,
-            user_username=app.user.username,
-            service_id=app.service_id,
-            service_name=app.service.name,
-            start_time=app.start_time,
-            end_time=app.end_time,
-            status=app.status,
-            created_at=app.created_at
+    return query
+
+def appointment_rows_query(
+    status: str | None,
+    date_from: datetime.date | None,
+    date_to: datetime.date | None,
+    master_id: int | None = None
+):
+    """
+    Строит запрос с JOIN только колонок AppointmentResponse и фильтрами списка записей.
+    """
+    return apply_filters(
+        select(
+            Appointment.id,
+            Appointment.user_id,
+            User.full_name.label("user_name"),
+            User.username.label("user_username"),
+            Appointment.service_id,
+            Service.name.label("service_name"),
+            Appointment.master_id,
+            Master.name.label("master_name"),
+            Appointment.start_time,
+            Appointment.end_time,
+            Appointment.status,
+            Appointment.created_at,
         )
-        for app in appointments
-    ]
+        .join(User, Appointment.user_id == User.id)
+        .join(Service, Appointment.service_id == Service.id)
+        .outerjoin(Master, Appointment.master_id == Master.id),
+        status, date_from, date_to, master_id
+    )
+
+async def fetch_appointment_rows(
+    session: AsyncSession,
+    status: str | None,
+    date_from: datetime.date | None,
+    date_to: datetime.date | None,
+    master_id: int | None,
+    cursor: str | None,
+    limit: int
+) -> list[dict]:
+    """
+    Выбирает записи одним запросом с JOIN только нужных колонок (без загрузки
+    ORM-объектов) и возвращает их в виде словарей полей AppointmentResponse.
+    """
+    query = appointment_rows_query(status, date_from, date_to, master_id).order_by(
+        Appointment.start_time.desc(), Appointment.id.desc()
+    )
+
+    if cursor:
+        cursor_start_time, cursor_id = decode_cursor(cursor)
+        query = query.where(or_(
+            Appointment.start_time < cursor_start_time,
+            and_(Appointment.start_time == cursor_start_time, Appointment.id < cursor_id)
+        ))
+
+    result = await session.execute(query.limit(limit))
+    return [dict(row) for row in result.mappings()]
+
+@router.get("/", response_model=AppointmentPage)
+async def get_appointments(
+    status: str | None = None,
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    master_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    with_total: bool = False,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Получить страницу записей с фильтрацией (от новых к старым).
+
+    Пагинация по ключу (start_time, id): для следующей страницы передайте
+    next_cursor из ответа. Общее количество считается только при with_total=true.
+    """
+    # Запрашиваем на одну запись больше, чтобы узнать, есть ли следующая страница
+    appointments = await fetch_appointment_rows(session, status, date_from, date_to, master_id, cursor, limit + 1)
+
+    next_cursor = None
+    if len(appointments) > limit:
+        appointments = appointments[:limit]
+        next_cursor = encode_cursor(appointments[-1]["start_time"], appointments[-1]["id"])
+
+    total = None
+    if with_total:
+        total_result = await session.execute(
+            apply_filters(select(func.count(Appointment.id)), status, date_from, date_to, master_id)
+        )
+        total = total_result.scalar_one()
+
+    return ORJSONResponse({"items": appointments, "next_cursor": next_cursor, "total": total})
+
+async def stream_export(
+    export_format: str,
+    status: str | None,
+    date_from: datetime.date | None,
+    date_to: datetime.date | None,
+    master_id: int | None
+) -> AsyncIterator[bytes]:
+    """
+    Отдает записи в формате CSV или NDJSON, читая их из БД пачками через серверный курсор.
+    Память не зависит от размера выборки.
+    """
+    if export_format == "csv":
+        # BOM, чтобы Excel корректно открывал кириллицу
+        yield ("\ufeff" + ",".join(EXPORT_COLUMNS) + "\r\n").encode()
+
+    query = appointment_rows_query(status, date_from, date_to, master_id).order_by(Appointment.start_time, Appointment.id)
+    async with current_session_pool()() as session:
+        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows(
+                    [value.isoformat() if isinstance(value, datetime.datetime) else value for value in row]
+                    for row in rows
+                )
+                yield buffer.getvalue().encode()
+            else:
+                yield b"".join(orjson.dumps(dict(row._mapping)) + b"\n" for row in rows)
+
+@router.get("/export")
+async def export_appointments(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    status: str | None = None,
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    master_id: int | None = None,
+    user: dict = Depends(verify_admin)
+):
+    """
+    Выгрузить записи в CSV или NDJSON (с теми же фильтрами, что и список).
+    """
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_export(format, status, date_from, date_to, master_id),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="appointments.{format}"'}
+    )
+
+async def bulk_set_status(
+    session: AsyncSession,
+    status: str,
+    ids: List[int] | None,
+    appointment_filter: AppointmentFilter | None
+) -> BulkResponse:
+    """
+    Меняет статус набора записей в одной транзакции: по одному UPDATE ... RETURNING
+    на каждый прежний статус, так что прежние статусы для дневных сводок известны
+    без отдельной выборки и список id не передается в запрос повторно.
+    Фильтр, затрагивающий больше MAX_BULK_SIZE записей, отклоняется до изменений.
+    Для списка id возвращает результат по каждому id ('updated', 'unchanged' или 'not_found').
+    """
+    if ids is None and appointment_filter is None:
+        raise HTTPException(status_code=400, detail="Укажите ids или filter")
+
+    if appointment_filter is not None and not any(
+        value is not None for value in appointment_filter.model_dump().values()
+    ):
+        # Пустой фильтр выбрал бы все записи в базе
+        raise HTTPException(status_code=400, detail="Фильтр должен содержать хотя бы одно условие")
+
+    if ids is not None and len(ids) > MAX_BULK_SIZE:
+        raise HTTPException(status_code=400, detail=f"Не более {MAX_BULK_SIZE} записей за раз")
+
+    def matching(query):
+        if ids is not None:
+            query = query.where(Appointment.id.in_(ids))
+        if appointment_filter is not None:
+            query = apply_filters(
+                query, appointment_filter.status, appointment_filter.date_from,
+                appointment_filter.date_to, appointment_filter.master_id
+            )
+        return query
+
+    if ids is None:
+        # Подсчет ограничен, чтобы широкий фильтр не сканировал всю таблицу до конца
+        bounded = matching(select(Appointment.id).where(Appointment.status != status)).limit(MAX_BULK_SIZE + 1)
+        result = await session.execute(select(func.count()).select_from(bounded.subquery()))
+        if result.scalar_one() > MAX_BULK_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Фильтр затрагивает больше {MAX_BULK_SIZE} записей, сузьте его (например, диапазоном дат)"
+            )
+
+    changes: list[StatusChange] = []
+    updated_ids: set[int] = set()
+    for old_status in VALID_STATUSES:
+        if old_status == status:
+            continue
+        result = await session.execute(
+            matching(update(Appointment))
+            .where(Appointment.status == old_status)
+            .values(status=status)
+            .returning(
+                Appointment.id, Appointment.start_time, Appointment.end_time,
+                Appointment.service_id, Appointment.price
+            ),
+            execution_options={"synchronize_session": False}
+        )
+        for row in result:
+            updated_ids.add(row.id)
+            changes.append(StatusChange(row.start_time, row.end_time, row.service_id, old_status, status, row.price))
+
+    found_ids = updated_ids
+    if ids is not None and len(updated_ids) < len(set(ids)):
+        result = await session.execute(select(Appointment.id).where(Appointment.id.in_(set(ids) - updated_ids)))
+        found_ids = updated_ids | set(result.scalars())
+
+    if updated_ids:
+        await apply_status_changes(session, changes)
+        record_event(session, "appointment_status", {"ids": sorted(updated_ids), "status": status})
+        await bump_version(session, "appointments")
+    await session.commit()
+
+    if ids is not None:
+        results = [
+            BulkItemResult(
+                id=appointment_id,
+                result="updated" if appointment_id in updated_ids
+                else "unchanged" if appointment_id in found_ids
+                else "not_found"
+            )
+            for appointment_id in dict.fromkeys(ids)
+        ]
+    else:
+        results = [BulkItemResult(id=appointment_id, result="updated") for appointment_id in sorted(updated_ids)]
+
+    return BulkResponse(updated=len(updated_ids), results=results)
+
+@router.post("/bulk-status", response_model=BulkResponse)
+async def bulk_update_appointment_status(
+    data: BulkStatusUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Изменить статус нескольких записей по списку id или по фильтру.
+    """
+    if data.status not in VALID_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Недопустимый статус. Допустимые: {VALID_STATUSES}")
+
+    response = await bulk_set_status(session, data.status, data.ids, data.filter)
+    logger.info(f"Массово обновлен статус {response.updated} записей на {data.status}")
+    return response
+
+@router.post("/bulk-cancel", response_model=BulkResponse)
+async def bulk_cancel_appointments(
+    data: BulkCancel,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Отменить несколько записей.
+    """
+    response = await bulk_set_status(session, "cancelled", data.ids, None)
+    logger.info(f"Массово отменено {response.updated} записей администратором")
+    return response
 
 @router.put("/{appointment_id}/status")
 async def update_appointment_status(
@@ -84,9 +392,8 @@ async def update_appointment_status(
     """
     Обновить статус записи.
     """
-    valid_statuses = ["pending", "confirmed", "cancelled", "completed"]
-    if status not in valid_statuses:
-        raise HTTPException(status_code=400, detail=f"Недопустимый статус. Допустимые: {valid_statuses}")
+    if status not in VALID_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Недопустимый статус. Допустимые: {VALID_STATUSES}")
 
     appointment = await session.get(Appointment, appointment_id, options=[
         selectinload(Appointment.user),
@@ -96,7 +403,11 @@ async def update_appointment_status(
     if not appointment:
         raise HTTPException(status_code=404, detail="Запись не найдена")
 
+    old_status = appointment.status
     appointment.status = status
+    await record_status_change(session, appointment, old_status, appointment.status)
+    record_event(session, "appointment_status", {"ids": [appointment.id], "status": status})
+    await bump_version(session, "appointments")
     await session.commit()
 
     logger.info(f"Обновлен статус записи {appointment_id} на {status}")
@@ -119,7 +430,11 @@ async def cancel_appointment(
     if not appointment:
         raise HTTPException(status_code=404, detail="Запись не найдена")
 
+    old_status = appointment.status
     appointment.status = "cancelled"
+    await record_status_change(session, appointment, old_status, appointment.status)
+    record_event(session, "appointment_status", {"ids": [appointment.id], "status": "cancelled"})
+    await bump_version(session, "appointments")
     await session.commit()
 
     logger.info(f"Отменена запись {appointment_id} администратором")
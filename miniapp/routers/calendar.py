@@ -0,0 +1,115 @@
+import datetime
+import hashlib
+import logging
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Appointment, User, Service
+from database.session import get_async_session, current_session_pool
+from miniapp.auth import verify_feed_token
+from miniapp.etag import etag_matches
+from utils.change_stamps import get_stamp
+from utils.ical import CALENDAR_HEADER, CALENDAR_FOOTER, format_vevent
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/calendar", tags=["calendar"])
+
+# Таблицы, изменение которых меняет содержимое ленты
+FEED_SOURCES = ("appointments", "services")
+FEED_BATCH_SIZE = 500
+DEFAULT_PAST_DAYS = 30
+
+def build_feed_query(date_from: datetime.date, date_to: datetime.date | None):
+    """
+    Строит запрос с выборкой только нужных для ленты колонок.
+    """
+    query = (
+        select(
+            Appointment.id,
+            Appointment.start_time,
+            Appointment.end_time,
+            Appointment.status,
+            Appointment.created_at,
+            Service.name,
+            User.full_name,
+            User.username,
+        )
+        .join(Service, Appointment.service_id == Service.id)
+        .join(User, Appointment.user_id == User.id)
+        .where(Appointment.start_time >= datetime.datetime.combine(date_from, datetime.time.min))
+        .order_by(Appointment.start_time, Appointment.id)
+    )
+    if date_to:
+        query = query.where(Appointment.start_time <= datetime.datetime.combine(date_to, datetime.time.max))
+    return query
+
+async def stream_feed(date_from: datetime.date, date_to: datetime.date | None) -> AsyncIterator[str]:
+    """
+    Построчно отдает iCalendar-ленту, читая записи из БД пачками через серверный курсор.
+    """
+    yield CALENDAR_HEADER
+    async with current_session_pool()() as session:
+        result = await session.stream(
+            build_feed_query(date_from, date_to).execution_options(yield_per=FEED_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield "".join(
+                format_vevent(
+                    uid=f"appointment-{row.id}@nailbot",
+                    summary=f"{row.name}: {row.full_name}",
+                    start_time=row.start_time,
+                    end_time=row.end_time,
+                    status=row.status,
+                    created_at=row.created_at,
+                    description=f"Клиент: {row.full_name} (@{row.username or 'N/A'})",
+                )
+                for row in rows
+            )
+    yield CALENDAR_FOOTER
+
+@router.get("/appointments.ics", dependencies=[Depends(verify_feed_token)])
+async def get_appointments_feed(
+    request: Request,
+    date_from: datetime.date | None = None,
+    date_to: datetime.date | None = None,
+    session: AsyncSession = Depends(get_async_session)
+):
+    """
+    iCalendar-лента записей для подписки из календарных приложений.
+    По умолчанию включает записи начиная с 30 дней назад.
+    """
+    if date_from is None:
+        date_from = datetime.date.today() - datetime.timedelta(days=DEFAULT_PAST_DAYS)
+
+    version, updated_at = await get_stamp(session, *FEED_SOURCES)
+    etag_source = f"{version}:{date_from.isoformat()}:{date_to.isoformat() if date_to else ''}"
+    etag = f'"{hashlib.sha256(etag_source.encode()).hexdigest()[:32]}"'
+
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if updated_at is not None:
+        headers["Last-Modified"] = format_datetime(updated_at.replace(microsecond=0), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag_matches(etag, if_none_match):
+            return Response(status_code=304, headers=headers)
+    elif updated_at is not None and "if-modified-since" in request.headers:
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"])
+        except (TypeError, ValueError):
+            since = None
+        if since is not None and since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+        if since is not None and updated_at.replace(microsecond=0) <= since:
+            return Response(status_code=304, headers=headers)
+
+    return StreamingResponse(
+        stream_feed(date_from, date_to),
+        media_type="text/calendar; charset=utf-8",
+        headers=headers
+    )
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import StreamingResponse
+
+from database.models import Event
+from database.session import AsyncSessionLocal, current_session_pool
+from miniapp.auth import verify_admin
+from miniapp.tenants import current_runtime
+from utils.events import EventBroadcaster, get_events_after
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+# Интервал отправки комментария-пинга, чтобы прокси не закрывали соединение
+KEEPALIVE_INTERVAL = 15
+
+broadcaster = EventBroadcaster(AsyncSessionLocal)
+
+def get_broadcaster() -> EventBroadcaster:
+    """
+    Возвращает рассылку событий базы текущего запроса (в многоарендном режиме - базы салона).
+    """
+    runtime = current_runtime()
+    return runtime.broadcaster if runtime is not None else broadcaster
+
+def format_sse(event: Event) -> str:
+    """
+    Форматирует событие в формате Server-Sent Events.
+    """
+    return f"id: {event.id}\nevent: {event.kind}\ndata: {event.payload}\n\n"
+
+async def stream_events(request: Request, last_event_id: Optional[int]) -> AsyncIterator[str]:
+    """
+    Отдает события подписчику: сначала пропущенные после last_event_id,
+    затем новые по мере появления.
+    """
+    broadcaster = get_broadcaster()
+    queue = await broadcaster.subscribe()
+    try:
+        yield "retry: 3000\n\n"
+
+        sent_id = broadcaster.last_id
+        if last_event_id is not None and last_event_id < sent_id:
+            # Досылаем события, пропущенные за время переподключения
+            replay_until = sent_id
+            sent_id = last_event_id
+            async with current_session_pool()() as session:
+                while sent_id < replay_until:
+                    events = await get_events_after(session, sent_id)
+                    if not events:
+                        break
+                    for event in events:
+                        yield format_sse(event)
+                        sent_id = event.id
+
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event.id > sent_id:
+                yield format_sse(event)
+                sent_id = event.id
+    finally:
+        broadcaster.unsubscribe(queue)
+
+@router.get("/stream")
+async def events_stream(
+    request: Request,
+    last_event_id: Optional[int] = Header(None),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Живая лента событий (новые записи, отмены, смена статусов) в формате Server-Sent Events.
+    """
+    return StreamingResponse(
+        stream_events(request, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,304 @@
+import datetime
+import logging
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Master, MasterSchedule, MasterHoliday
+from database.session import get_async_session
+from miniapp.auth import verify_admin
+from miniapp.etag import conditional_get
+from utils.change_stamps import bump_version
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/masters", tags=["masters"])
+
+class MasterCreate(BaseModel):
+    name: str
+    active: bool = True
+
+class MasterUpdate(BaseModel):
+    name: str | None = None
+    active: bool | None = None
+
+class MasterResponse(BaseModel):
+    id: int
+    name: str
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class MasterScheduleUpdate(BaseModel):
+    start_time: str
+    end_time: str
+    is_working: bool
+
+class MasterScheduleResponse(BaseModel):
+    weekday: int
+    start_time: str
+    end_time: str
+    is_working: bool
+
+class MasterHolidayCreate(BaseModel):
+    date: datetime.date
+    reason: str = ""
+
+class MasterHolidayResponse(BaseModel):
+    id: int
+    date: datetime.date
+    reason: str | None
+
+    class Config:
+        from_attributes = True
+
+async def get_master_or_404(session: AsyncSession, master_id: int) -> Master:
+    """
+    Возвращает мастера по ID или отвечает 404.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        master_id (int): ID мастера.
+
+    Returns:
+        Master: Мастер.
+    """
+    master = await session.get(Master, master_id)
+    if not master:
+        raise HTTPException(status_code=404, detail="Мастер не найден")
+    return master
+
+@router.get("/", response_model=List[MasterResponse])
+async def get_masters(
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin),
+    etag_headers: dict = Depends(conditional_get("masters"))
+):
+    """
+    Получить список всех мастеров.
+    """
+    result = await session.execute(select(Master.id, Master.name, Master.active).order_by(Master.name, Master.id))
+    return ORJSONResponse([dict(row) for row in result.mappings()], headers=etag_headers)
+
+@router.post("/", response_model=MasterResponse)
+async def create_master(
+    master_data: MasterCreate,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Добавить мастера. Пока у мастера нет своего расписания, он работает по расписанию салона.
+    """
+    new_master = Master(name=master_data.name, active=master_data.active)
+    session.add(new_master)
+    await bump_version(session, "masters")
+    await session.commit()
+    await session.refresh(new_master)
+
+    logger.info(f"Добавлен мастер: {new_master.name}")
+    return new_master
+
+@router.put("/{master_id}", response_model=MasterResponse)
+async def update_master(
+    master_id: int,
+    master_data: MasterUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Обновить имя или активность мастера.
+    """
+    master = await get_master_or_404(session, master_id)
+
+    if master_data.name is not None:
+        master.name = master_data.name
+
+    if master_data.active is not None:
+        master.active = master_data.active
+
+    await bump_version(session, "masters")
+    await session.commit()
+    await session.refresh(master)
+
+    logger.info(f"Обновлен мастер: {master.name}")
+    return master
+
+@router.delete("/{master_id}")
+async def delete_master(
+    master_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Деактивировать мастера (его записи сохраняются).
+    """
+    master = await get_master_or_404(session, master_id)
+
+    master.active = False
+    await bump_version(session, "masters")
+    await session.commit()
+
+    logger.info(f"Деактивирован мастер: {master.name}")
+    return {"status": "success", "message": "Мастер деактивирован"}
+
+@router.get("/{master_id}/schedule", response_model=List[MasterScheduleResponse])
+async def get_master_schedule(
+    master_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Получить собственное расписание мастера. Дни недели, которых нет в ответе,
+    мастер работает по расписанию салона.
+    """
+    await get_master_or_404(session, master_id)
+    result = await session.execute(
+        select(MasterSchedule).where(MasterSchedule.master_id == master_id).order_by(MasterSchedule.weekday)
+    )
+    return ORJSONResponse([
+        {
+            "weekday": schedule.weekday,
+            "start_time": schedule.start_time.strftime('%H:%M'),
+            "end_time": schedule.end_time.strftime('%H:%M'),
+            "is_working": schedule.is_working,
+        }
+        for schedule in result.scalars()
+    ])
+
+@router.put("/{master_id}/schedule/{weekday}", response_model=MasterScheduleResponse)
+async def update_master_schedule(
+    master_id: int,
+    weekday: int,
+    schedule_data: MasterScheduleUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Задать расписание мастера на день недели (вместо расписания салона).
+    """
+    if weekday < 0 or weekday > 6:
+        raise HTTPException(status_code=400, detail="День недели должен быть от 0 (Пн) до 6 (Вс)")
+
+    await get_master_or_404(session, master_id)
+
+    try:
+        start_time = datetime.datetime.strptime(schedule_data.start_time, '%H:%M').time()
+        end_time = datetime.datetime.strptime(schedule_data.end_time, '%H:%M').time()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Неверный формат времени. Используйте HH:MM")
+
+    result = await session.execute(
+        select(MasterSchedule).where(MasterSchedule.master_id == master_id, MasterSchedule.weekday == weekday)
+    )
+    schedule = result.scalar_one_or_none()
+    if not schedule:
+        schedule = MasterSchedule(master_id=master_id, weekday=weekday)
+        session.add(schedule)
+
+    schedule.start_time = start_time
+    schedule.end_time = end_time
+    schedule.is_working = schedule_data.is_working
+
+    await bump_version(session, "masters")
+    await session.commit()
+
+    logger.info(f"Обновлено расписание мастера {master_id} для дня недели {weekday}")
+    return MasterScheduleResponse(
+        weekday=weekday,
+        start_time=start_time.strftime('%H:%M'),
+        end_time=end_time.strftime('%H:%M'),
+        is_working=schedule.is_working
+    )
+
+@router.delete("/{master_id}/schedule/{weekday}")
+async def reset_master_schedule(
+    master_id: int,
+    weekday: int,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Удалить расписание мастера на день недели: мастер снова работает по расписанию салона.
+    """
+    result = await session.execute(
+        select(MasterSchedule).where(MasterSchedule.master_id == master_id, MasterSchedule.weekday == weekday)
+    )
+    schedule = result.scalar_one_or_none()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Расписание мастера для этого дня не найдено")
+
+    await session.delete(schedule)
+    await bump_version(session, "masters")
+    await session.commit()
+
+    logger.info(f"Сброшено расписание мастера {master_id} для дня недели {weekday}")
+    return {"status": "success", "message": "Используется расписание салона"}
+
+@router.get("/{master_id}/holidays", response_model=List[MasterHolidayResponse])
+async def get_master_holidays(
+    master_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Получить выходные дни мастера (общие выходные салона сюда не входят).
+    """
+    await get_master_or_404(session, master_id)
+    result = await session.execute(
+        select(MasterHoliday.id, MasterHoliday.date, MasterHoliday.reason)
+        .where(MasterHoliday.master_id == master_id)
+        .order_by(MasterHoliday.date)
+    )
+    return ORJSONResponse([dict(row) for row in result.mappings()])
+
+@router.post("/{master_id}/holidays", response_model=MasterHolidayResponse)
+async def create_master_holiday(
+    master_id: int,
+    holiday_data: MasterHolidayCreate,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Добавить выходной день мастера.
+    """
+    await get_master_or_404(session, master_id)
+
+    result = await session.execute(
+        select(MasterHoliday).where(MasterHoliday.master_id == master_id, MasterHoliday.date == holiday_data.date)
+    )
+    if result.scalar_one_or_none():
+        raise HTTPException(status_code=400, detail="Этот день уже отмечен как выходной мастера")
+
+    new_holiday = MasterHoliday(master_id=master_id, date=holiday_data.date, reason=holiday_data.reason)
+    session.add(new_holiday)
+    await bump_version(session, "masters")
+    await session.commit()
+    await session.refresh(new_holiday)
+
+    logger.info(f"Добавлен выходной мастера {master_id}: {new_holiday.date}")
+    return new_holiday
+
+@router.delete("/{master_id}/holidays/{holiday_id}")
+async def delete_master_holiday(
+    master_id: int,
+    holiday_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Удалить выходной день мастера.
+    """
+    holiday = await session.get(MasterHoliday, holiday_id)
+    if not holiday or holiday.master_id != master_id:
+        raise HTTPException(status_code=404, detail="Выходной день мастера не найден")
+
+    await session.delete(holiday)
+    await bump_version(session, "masters")
+    await session.commit()
+
+    logger.info(f"Удален выходной мастера {master_id}: {holiday.date}")
+    return {"status": "success", "message": "Выходной день мастера удален"}
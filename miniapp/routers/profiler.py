@@ -0,0 +1,54 @@
+import datetime
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+from fastapi.routing import APIRoute
+
+from config import load_config
+from miniapp.auth import verify_admin
+from utils.profiler import SamplingProfiler, code_labels
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/profile", tags=["profile"])
+config = load_config()
+
+# Создается при первом запросе, если профилирование разрешено
+_profiler: Optional[SamplingProfiler] = None
+
+def get_profiler(request: Request) -> SamplingProfiler:
+    """
+    Возвращает профилировщик с метками маршрутов приложения.
+
+    Raises:
+        HTTPException: Если профилирование отключено.
+    """
+    global _profiler
+    if not config.profiler.enabled:
+        raise HTTPException(status_code=404, detail="Профилировщик отключен")
+    if _profiler is None:
+        _profiler = SamplingProfiler(code_labels("route", (
+            (f"{','.join(sorted(route.methods))} {route.path}", route.endpoint)
+            for route in request.app.routes
+            if isinstance(route, APIRoute)
+        )), interval=config.profiler.interval)
+    return _profiler
+
+@router.post("/", response_class=PlainTextResponse)
+async def run_profile(
+    seconds: int = Query(None, ge=1),
+    user: dict = Depends(verify_admin),
+    profiler: SamplingProfiler = Depends(get_profiler)
+):
+    """
+    Профилирует процесс API в течение seconds секунд и возвращает файл
+    collapsed stacks для построения flamegraph. Образцы относятся к маршрутам.
+    """
+    if profiler.running:
+        raise HTTPException(status_code=409, detail="Профилирование уже запущено")
+
+    seconds = min(seconds or config.profiler.default_duration, config.profiler.max_duration)
+    collapsed = await profiler.profile(seconds)
+    filename = f"api-profile-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.folded"
+    return PlainTextResponse(collapsed, headers={"Content-Disposition": f'attachment; filename="{filename}"'})
@@ -3,17 +3,23 @@ import logging
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models import WorkSchedule, Holiday
-from database.session import get_async_session
+from database.session import get_async_session, dialect_insert
 from miniapp.auth import verify_admin
+from miniapp.etag import conditional_get
+from utils.time_utils import as_date
+from utils.change_stamps import bump_version
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["schedule"])
 
+MAX_HOLIDAY_RANGE_DAYS = 366
+
 class WorkScheduleResponse(BaseModel):
     id: int
     weekday: int
@@ -33,6 +39,19 @@ class HolidayCreate(BaseModel):
     date: datetime.date
     reason: str = ""
 
+class HolidayRangeCreate(BaseModel):
+    date_from: datetime.date
+    date_to: datetime.date
+    reason: str = ""
+
+class HolidayRangeItemResult(BaseModel):
+    date: datetime.date
+    result: str
+
+class HolidayRangeResponse(BaseModel):
+    created: int
+    results: List[HolidayRangeItemResult]
+
 class HolidayResponse(BaseModel):
     id: int
     date: datetime.date
@@ -44,7 +63,8 @@ class HolidayResponse(BaseModel):
 @router.get("/work-schedule", response_model=List[WorkScheduleResponse])
 async def get_work_schedule(
     session: AsyncSession = Depends(get_async_session),
-    user: dict = Depends(verify_admin)
+    user: dict = Depends(verify_admin),
+    etag_headers: dict = Depends(conditional_get("work_schedule"))
 ):
     """
     Получить рабочее расписание на все дни недели.
@@ -52,16 +72,19 @@ async def get_work_schedule(
     result = await session.execute(select(WorkSchedule).order_by(WorkSchedule.weekday))
     schedules = result.scalars().all()
 
-    return [
-        WorkScheduleResponse(
-            id=schedule.id,
-            weekday=schedule.weekday,
-            start_time=schedule.start_time.strftime('%H:%M'),
-            end_time=schedule.end_time.strftime('%H:%M'),
-            is_working=schedule.is_working
-        )
-        for schedule in schedules
-    ]
+    return ORJSONResponse(
+        [
+            {
+                "id": schedule.id,
+                "weekday": schedule.weekday,
+                "start_time": schedule.start_time.strftime('%H:%M'),
+                "end_time": schedule.end_time.strftime('%H:%M'),
+                "is_working": schedule.is_working,
+            }
+            for schedule in schedules
+        ],
+        headers=etag_headers
+    )
 
 @router.put("/work-schedule/{weekday}")
 async def update_work_schedule(
@@ -92,6 +115,7 @@ async def update_work_schedule(
     schedule.end_time = end_time
     schedule.is_working = schedule_data.is_working
 
+    await bump_version(session, "work_schedule")
     await session.commit()
     await session.refresh(schedule)
 
@@ -110,14 +134,16 @@ async def update_work_schedule(
 @router.get("/holidays", response_model=List[HolidayResponse])
 async def get_holidays(
     session: AsyncSession = Depends(get_async_session),
-    user: dict = Depends(verify_admin)
+    user: dict = Depends(verify_admin),
+    etag_headers: dict = Depends(conditional_get("holidays"))
 ):
     """
     Получить список всех выходных дней.
     """
-    result = await session.execute(select(Holiday).order_by(Holiday.date))
-    holidays = result.scalars().all()
-    return holidays
+    result = await session.execute(
+        select(Holiday.id, Holiday.date, Holiday.reason).order_by(Holiday.date)
+    )
+    return ORJSONResponse([dict(row) for row in result.mappings()], headers=etag_headers)
 
 @router.post("/holidays", response_model=HolidayResponse)
 async def create_holiday(
@@ -140,12 +166,54 @@ async def create_holiday(
     )
 
     session.add(new_holiday)
+    await bump_version(session, "holidays")
     await session.commit()
     await session.refresh(new_holiday)
 
     logger.info(f"Добавлен выходной день: {new_holiday.date}")
     return new_holiday
 
+@router.post("/holidays/range", response_model=HolidayRangeResponse)
+async def create_holiday_range(
+    holiday_data: HolidayRangeCreate,
+    session: AsyncSession = Depends(get_async_session),
+    user: dict = Depends(verify_admin)
+):
+    """
+    Добавить выходные дни на диапазон дат (например, отпуск) одним запросом.
+    Уже существующие даты пропускаются.
+    """
+    if holiday_data.date_to < holiday_data.date_from:
+        raise HTTPException(status_code=400, detail="Дата окончания раньше даты начала")
+
+    days = (holiday_data.date_to - holiday_data.date_from).days + 1
+    if days > MAX_HOLIDAY_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Диапазон не может превышать {MAX_HOLIDAY_RANGE_DAYS} дней")
+
+    dates = [holiday_data.date_from + datetime.timedelta(days=i) for i in range(days)]
+
+    result = await session.execute(select(Holiday.date).where(Holiday.date.in_(dates)))
+    existing_dates = {as_date(value) for value in result.scalars().all()}
+
+    insert_stmt = dialect_insert(session)(Holiday).values(
+        [{"date": date, "reason": holiday_data.reason} for date in dates]
+    ).on_conflict_do_nothing(index_elements=[Holiday.date])
+    await session.execute(insert_stmt)
+
+    created = len(dates) - len(existing_dates)
+    if created:
+        await bump_version(session, "holidays")
+    await session.commit()
+
+    logger.info(f"Добавлены выходные дни с {holiday_data.date_from} по {holiday_data.date_to}: {created} новых")
+    return HolidayRangeResponse(
+        created=created,
+        results=[
+            HolidayRangeItemResult(date=date, result="exists" if date in existing_dates else "created")
+            for date in dates
+        ]
+    )
+
 @router.delete("/holidays/{holiday_id}")
 async def delete_holiday(
     holiday_id: int,
@@ -161,6 +229,7 @@ async def delete_holiday(
         raise HTTPException(status_code=404, detail="Выходной день не найден")
 
     await session.delete(holiday)
+    await bump_version(session, "holidays")
     await session.commit()
 
     logger.info(f"Удален выходной день: {holiday.date}")
@@ -2,6 +2,7 @@ import logging
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,6 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from database.models import Service
 from database.session import get_async_session
 from miniapp.auth import verify_admin
+from miniapp.etag import conditional_get
+from utils.change_stamps import bump_version
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/services", tags=["services"])
@@ -41,14 +44,23 @@ class ServiceResponse(BaseModel):
 @router.get("/", response_model=List[ServiceResponse])
 async def get_services(
     session: AsyncSession = Depends(get_async_session),
-    user: dict = Depends(verify_admin)
+    user: dict = Depends(verify_admin),
+    etag_headers: dict = Depends(conditional_get("services"))
 ):
     """
     Получить список всех услуг.
     """
-    result = await session.execute(select(Service).order_by(Service.name))
-    services = result.scalars().all()
-    return services
+    result = await session.execute(
+        select(
+            Service.id,
+            Service.name,
+            Service.duration_minutes,
+            Service.price,
+            Service.description,
+            Service.active,
+        ).order_by(Service.name)
+    )
+    return ORJSONResponse([dict(row) for row in result.mappings()], headers=etag_headers)
 
 @router.post("/", response_model=ServiceResponse)
 async def create_service(
@@ -74,6 +86,7 @@ async def create_service(
     )
 
     session.add(new_service)
+    await bump_version(session, "services")
     await session.commit()
     await session.refresh(new_service)
 
@@ -116,6 +129,7 @@ async def update_service(
     if service_data.active is not None:
         service.active = service_data.active
 
+    await bump_version(session, "services")
     await session.commit()
     await session.refresh(service)
 
@@ -137,6 +151,7 @@ async def delete_service(
         raise HTTPException(status_code=404, detail="Услуга не найдена")
 
     service.active = False
+    await bump_version(session, "services")
     await session.commit()
 
     logger.info(f"Деактивирована услуга: {service.name}")
@@ -1,12 +1,15 @@
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models import Settings
 from database.session import get_async_session
 from miniapp.auth import verify_admin
+from miniapp.etag import conditional_get
+from utils.change_stamps import bump_version
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/settings", tags=["settings"])
@@ -27,7 +30,8 @@ class SettingsUpdate(BaseModel):
 @router.get("/", response_model=SettingsResponse)
 async def get_settings(
     session: AsyncSession = Depends(get_async_session),
-    user: dict = Depends(verify_admin)
+    user: dict = Depends(verify_admin),
+    etag_headers: dict = Depends(conditional_get("settings"))
 ):
     """
     Получить текущие настройки приложения.
@@ -37,7 +41,15 @@ async def get_settings(
     if not settings:
         raise HTTPException(status_code=404, detail="Настройки не найдены")
 
-    return settings
+    return ORJSONResponse(
+        {
+            "id": settings.id,
+            "admin_id": settings.admin_id,
+            "planning_horizon_days": settings.planning_horizon_days,
+            "timezone": settings.timezone,
+        },
+        headers=etag_headers
+    )
 
 @router.put("/", response_model=SettingsResponse)
 async def update_settings(
@@ -64,6 +76,7 @@ async def update_settings(
             raise HTTPException(status_code=400, detail="Недопустимый часовой пояс")
         settings.timezone = settings_data.timezone
 
+    await bump_version(session, "settings")
     await session.commit()
     await session.refresh(settings)
 
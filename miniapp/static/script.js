@@ -1,4 +1,5 @@
-const API_BASE_URL = window.location.origin;
+// В многоарендном режиме панель салона открывается по адресу /t/{id}/, и API салона лежит под тем же префиксом
+const API_BASE_URL = window.location.origin + window.location.pathname.replace(/\/+$/, '');
 let tg = window.Telegram.WebApp;
 
 tg.ready();
@@ -45,23 +46,41 @@ function showTab(tabName) {
     }
 }
 
+// Кэш GET-ответов с валидаторами: url -> { etag, data }
+const responseCache = new Map();
+
 async function apiRequest(url, options = {}) {
+    const method = (options.method || 'GET').toUpperCase();
+    const cached = method === 'GET' ? responseCache.get(url) : undefined;
+
     try {
         const response = await fetch(`${API_BASE_URL}${url}`, {
             ...options,
+            // Валидаторы обрабатываются вручную, HTTP-кэш браузера не используется
+            cache: 'no-store',
             headers: {
                 'Content-Type': 'application/json',
                 'Authorization': authHeader,
+                ...(cached ? { 'If-None-Match': cached.etag } : {}),
                 ...options.headers,
             },
         });
 
+        if (response.status === 304 && cached) {
+            return cached.data;
+        }
+
         if (!response.ok) {
             const error = await response.json();
             throw new Error(error.detail || 'Ошибка запроса');
         }
 
-        return await response.json();
+        const data = await response.json();
+        const etag = response.headers.get('ETag');
+        if (method === 'GET' && etag) {
+            responseCache.set(url, { etag, data });
+        }
+        return data;
     } catch (error) {
         showNotification(error.message, 'error');
         throw error;
@@ -186,14 +205,18 @@ async function updateSchedule(weekday) {
     showNotification('Расписание обновлено');
 }
 
-async function loadAppointments() {
-    const status = document.getElementById('status-filter').value;
-    const params = status ? `?status=${status}` : '';
-    const appointments = await apiRequest(`/api/appointments${params}`);
-    const container = document.getElementById('appointments-list');
-
-    container.innerHTML = appointments.map(app => `
-        <div class="list-item">
+const APPOINTMENTS_PAGE_SIZE = 50;
+let appointmentsCursor = null;
+let appointmentsLoading = false;
+let appointmentsGeneration = 0;
+let appointmentsObserver = null;
+// Загруженные записи по id, чтобы перерисовывать их при событиях живой ленты
+const appointmentsById = new Map();
+
+function renderAppointment(app) {
+    appointmentsById.set(app.id, app);
+    return `
+        <div class="list-item" data-appointment-id="${app.id}">
             <div class="list-item-header">
                 <div class="list-item-title">${app.user_name} (@${app.user_username || 'N/A'})</div>
                 <span class="status-badge status-${app.status}">${app.status}</span>
@@ -209,7 +232,163 @@ async function loadAppointments() {
                 ` : ''}
             </div>
         </div>
-    `).join('');
+    `;
+}
+
+async function loadAppointments() {
+    const container = document.getElementById('appointments-list');
+    appointmentsGeneration++;
+    appointmentsCursor = null;
+    appointmentsLoading = false;
+    appointmentsById.clear();
+    container.innerHTML = '<div id="appointments-sentinel"></div>';
+
+    if (appointmentsObserver) {
+        appointmentsObserver.disconnect();
+    }
+    // Следующая страница подгружается, когда пользователь прокрутил список до конца
+    appointmentsObserver = new IntersectionObserver(entries => {
+        if (entries.some(entry => entry.isIntersecting) && appointmentsCursor) {
+            loadAppointmentsPage();
+        }
+    });
+    appointmentsObserver.observe(document.getElementById('appointments-sentinel'));
+
+    await loadAppointmentsPage();
+}
+
+async function loadAppointmentsPage() {
+    if (appointmentsLoading) {
+        return;
+    }
+    appointmentsLoading = true;
+    const generation = appointmentsGeneration;
+
+    try {
+        const params = new URLSearchParams({ limit: APPOINTMENTS_PAGE_SIZE });
+        const status = document.getElementById('status-filter').value;
+        if (status) {
+            params.set('status', status);
+        }
+        if (appointmentsCursor) {
+            params.set('cursor', appointmentsCursor);
+        }
+
+        const page = await apiRequest(`/api/appointments?${params}`);
+        // Фильтр или вкладка могли смениться, пока шел запрос
+        if (generation !== appointmentsGeneration) {
+            return;
+        }
+
+        const sentinel = document.getElementById('appointments-sentinel');
+        sentinel.insertAdjacentHTML('beforebegin', page.items.map(renderAppointment).join(''));
+        appointmentsCursor = page.next_cursor;
+    } finally {
+        if (generation === appointmentsGeneration) {
+            appointmentsLoading = false;
+        }
+    }
+}
+
+function applyLiveEvent(kind, data) {
+    const filter = document.getElementById('status-filter').value;
+    const container = document.getElementById('appointments-list');
+
+    if (kind === 'appointment_created') {
+        showNotification(`Новая запись: ${data.user_name}, ${data.service_name}`);
+        if (document.getElementById('appointments-tab').classList.contains('active')
+                && (!filter || filter === data.status)) {
+            container.insertAdjacentHTML('afterbegin', renderAppointment(data));
+        }
+    } else if (kind === 'appointment_status') {
+        for (const id of data.ids) {
+            const app = appointmentsById.get(id);
+            const element = container.querySelector(`[data-appointment-id="${id}"]`);
+            if (!app || !element) {
+                continue;
+            }
+            if (filter && filter !== data.status) {
+                appointmentsById.delete(id);
+                element.remove();
+            } else {
+                element.outerHTML = renderAppointment({ ...app, status: data.status });
+            }
+        }
+    }
+}
+
+async function connectLiveFeed() {
+    // EventSource не умеет передавать заголовок Authorization, поэтому поток читается через fetch
+    let lastEventId = null;
+    while (true) {
+        try {
+            const headers = { 'Authorization': authHeader };
+            if (lastEventId) {
+                headers['Last-Event-ID'] = lastEventId;
+            }
+            const response = await fetch(`${API_BASE_URL}/api/events/stream`, { headers, cache: 'no-store' });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+
+            const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+            let buffer = '';
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) {
+                    break;
+                }
+                buffer += value;
+
+                let boundary;
+                while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const block = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+
+                    let kind = null;
+                    let data = '';
+                    for (const line of block.split('\n')) {
+                        if (line.startsWith('id: ')) {
+                            lastEventId = line.slice(4);
+                        } else if (line.startsWith('event: ')) {
+                            kind = line.slice(7);
+                        } else if (line.startsWith('data: ')) {
+                            data += line.slice(6);
+                        }
+                    }
+                    if (kind && data) {
+                        applyLiveEvent(kind, JSON.parse(data));
+                    }
+                }
+            }
+        } catch (error) {
+            console.warn('Живая лента отключена:', error);
+        }
+        await new Promise(resolve => setTimeout(resolve, 3000));
+    }
+}
+
+async function exportAppointments(format) {
+    const params = new URLSearchParams({ format });
+    const status = document.getElementById('status-filter').value;
+    if (status) {
+        params.set('status', status);
+    }
+
+    const response = await fetch(`${API_BASE_URL}/api/appointments/export?${params}`, {
+        headers: { 'Authorization': authHeader },
+    });
+    if (!response.ok) {
+        showNotification('Не удалось выгрузить записи', 'error');
+        return;
+    }
+
+    const url = URL.createObjectURL(await response.blob());
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = `appointments.${format}`;
+    link.click();
+    URL.revokeObjectURL(url);
 }
 
 async function cancelAppointment(id) {
@@ -327,3 +506,4 @@ function closeModal() {
 document.getElementById('user-info').textContent = tg.initDataUnsafe?.user?.first_name || 'Администратор';
 
 loadServices();
+connectLiveFeed();
@@ -0,0 +1,67 @@
+import re
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from database.session import use_session_pool
+
+if TYPE_CHECKING:
+    from utils.tenants import Tenant, TenantRegistry, TenantRuntime
+
+# /t/{tenant_id}/... - админ-панель и API салона в многоарендном режиме
+TENANT_PATH = re.compile(r"^/t/([A-Za-z0-9_-]{1,64})(/.*)?$")
+# Пути, общие для всех салонов (статика одинакова, метрики и проверка здоровья - процесса)
+SHARED_PATHS = ("/static/", "/metrics", "/health")
+
+_current_runtime: ContextVar[Optional["TenantRuntime"]] = ContextVar("current_tenant_runtime", default=None)
+
+def current_runtime() -> Optional["TenantRuntime"]:
+    """
+    Возвращает ресурсы салона, обрабатывающего текущий запрос (None вне многоарендного режима).
+    """
+    return _current_runtime.get()
+
+def current_tenant() -> Optional["Tenant"]:
+    """
+    Возвращает салон текущего запроса (None вне многоарендного режима).
+    """
+    runtime = _current_runtime.get()
+    return runtime.tenant if runtime is not None else None
+
+class TenantApiMiddleware:
+    """
+    ASGI middleware многоарендного режима: один процесс API для всех салонов.
+
+    Салон определяется по префиксу пути /t/{tenant_id}: префикс отбрасывается,
+    и запрос обрабатывается обычными маршрутами с базой данных салона
+    (get_async_session), его ботом и администратором (проверка init data в
+    miniapp/auth.py). Пока запрос выполняется, ресурсы салона не освобождаются.
+    """
+    def __init__(self, app: ASGIApp, registry: "TenantRegistry"):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        match = TENANT_PATH.match(scope["path"])
+        if match is None or match.group(1) not in self.registry.tenants:
+            if match is None and scope["path"].startswith(SHARED_PATHS):
+                await self.app(scope, receive, send)
+                return
+            response = JSONResponse(status_code=404, content={"detail": "Салон не найден"})
+            await response(scope, receive, send)
+            return
+
+        scope = dict(scope, path=match.group(2) or "/")
+        async with self.registry.use(match.group(1)) as runtime:
+            token = _current_runtime.set(runtime)
+            try:
+                with use_session_pool(runtime.session_pool):
+                    await self.app(scope, receive, send)
+            finally:
+                _current_runtime.reset(token)
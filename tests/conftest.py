@@ -0,0 +1,101 @@
+"""
+Общие фикстуры тестов: SQLite в памяти с синтетическими данными
+и заглушки колбэков Telegram для вызова обработчиков напрямую.
+"""
+import os
+from types import SimpleNamespace
+
+# Основной движок создается при импорте database.session, поэтому URL задается до импортов проекта
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+from typing import AsyncIterator, Optional
+
+import pytest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.generators import SCALES, seed_database
+from database.models import Master
+from database.session import Base, create_session_pool
+from utils.query_budget import instrument_query_budget
+
+SCALE = SCALES[0]
+MASTERS = 3
+# Telegram ID клиента из синтетических данных (seed_database создает клиентов с ID от 1000)
+USER_TELEGRAM_ID = 1000
+
+class FakeMessage:
+    """
+    Сообщение-заглушка: запоминает отредактированный текст и клавиатуру.
+    """
+    def __init__(self):
+        self.text: Optional[str] = None
+        self.reply_markup = None
+
+    async def edit_text(self, text: str, reply_markup=None, **kwargs) -> None:
+        self.text = text
+        self.reply_markup = reply_markup
+
+    async def answer(self, text: str, reply_markup=None, **kwargs) -> None:
+        self.text = text
+        self.reply_markup = reply_markup
+
+class FakeCallback:
+    """
+    Колбэк-заглушка с данными кнопки, отправителем и сообщением-заглушкой.
+    """
+    def __init__(self, data: str, user_id: int = USER_TELEGRAM_ID):
+        self.data = data
+        self.from_user = SimpleNamespace(id=user_id)
+        self.message = FakeMessage()
+
+    async def answer(self, *args, **kwargs) -> None:
+        pass
+
+class FakeNotifier:
+    """
+    Буфер уведомлений администратору, запоминающий тексты вместо отправки.
+    """
+    def __init__(self):
+        self.messages: list[str] = []
+
+    def notify(self, text: str) -> None:
+        self.messages.append(text)
+
+async def create_database(masters: int = 0) -> tuple:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    instrument_query_budget(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_pool = create_session_pool(engine)
+    async with session_pool() as session:
+        await seed_database(session, SCALE)
+        session.add_all(Master(name=f"Мастер {i}", active=True) for i in range(masters))
+        await session.commit()
+    return engine, session_pool
+
+@pytest.fixture
+async def session_pool() -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    """
+    База без мастеров (запись к салону).
+    """
+    engine, pool = await create_database()
+    yield pool
+    await engine.dispose()
+
+@pytest.fixture
+async def masters_session_pool() -> AsyncIterator[async_sessionmaker[AsyncSession]]:
+    """
+    База с несколькими мастерами.
+    """
+    engine, pool = await create_database(MASTERS)
+    yield pool
+    await engine.dispose()
+
+@pytest.fixture
+def state() -> FSMContext:
+    return FSMContext(storage=MemoryStorage(), key=StorageKey(bot_id=1, chat_id=1, user_id=1))
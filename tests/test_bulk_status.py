@@ -0,0 +1,55 @@
+"""
+Массовая смена статуса записей: ограничения фильтра и обновление дневных сводок.
+"""
+import datetime
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+
+from database.models import Appointment, DailyStats
+from miniapp.routers.appointments import MAX_BULK_SIZE, AppointmentFilter, bulk_set_status
+
+async def test_empty_filter_rejected(session_pool):
+    async with session_pool() as session:
+        with pytest.raises(HTTPException) as error:
+            await bulk_set_status(session, "cancelled", None, AppointmentFilter())
+        assert error.value.status_code == 400
+
+        result = await session.execute(select(func.count()).where(Appointment.status != "cancelled"))
+        assert result.scalar_one() > 0
+
+async def test_filter_over_limit_rejected(session_pool, monkeypatch):
+    monkeypatch.setattr("miniapp.routers.appointments.MAX_BULK_SIZE", 5)
+    async with session_pool() as session:
+        with pytest.raises(HTTPException) as error:
+            await bulk_set_status(session, "cancelled", None, AppointmentFilter(status="confirmed"))
+        assert error.value.status_code == 400
+
+async def test_filter_updates_matching_rows(session_pool):
+    async with session_pool() as session:
+        day = (await session.execute(select(func.min(Appointment.start_time)))).scalar_one().date()
+        appointment_filter = AppointmentFilter(date_from=day, date_to=day)
+        response = await bulk_set_status(session, "completed", None, appointment_filter)
+
+        result = await session.execute(
+            select(Appointment.status).where(
+                Appointment.start_time >= datetime.datetime.combine(day, datetime.time.min),
+                Appointment.start_time <= datetime.datetime.combine(day, datetime.time.max),
+            )
+        )
+        statuses = result.scalars().all()
+        assert 0 < response.updated <= MAX_BULK_SIZE
+        assert set(statuses) == {"completed"}
+        assert (await session.execute(select(func.sum(DailyStats.completed)))).scalar_one() == response.updated
+
+async def test_ids_results(session_pool):
+    async with session_pool() as session:
+        await session.execute(update(Appointment).where(Appointment.id == 1).values(status="confirmed"))
+        await session.commit()
+
+        response = await bulk_set_status(session, "cancelled", [1, 1, 10**9], None)
+        assert [(item.id, item.result) for item in response.results] == [(1, "updated"), (10**9, "not_found")]
+
+        response = await bulk_set_status(session, "cancelled", [1], None)
+        assert [(item.id, item.result) for item in response.results] == [(1, "unchanged")]
@@ -0,0 +1,249 @@
+"""
+Бюджеты SQL-запросов горячих путей записи и админ-панели.
+
+Число запросов не должно зависеть от количества дней горизонта, записей
+и мастеров: если тест падает после изменения кода, в тексте ошибки
+перечислены все выполненные запросы, среди которых стоит искать N+1.
+"""
+import datetime
+import random
+from contextlib import contextmanager
+from typing import Iterator
+
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import event, func, select, update
+
+from benchmarks.generators import generate_day_appointments
+from conftest import USER_TELEGRAM_ID, FakeCallback, FakeNotifier
+from database.models import Appointment, Service, Settings, User
+from handlers.appointments import (
+    my_appointments_handler, cancel_appointment_list_handler,
+    cancel_appointment_confirm_handler, cancel_appointment_confirmed_handler
+)
+from handlers.booking import (
+    Booking, service_chosen_handler, master_chosen_handler, date_chosen_handler,
+    time_chosen_handler, confirm_appointment_handler, nearest_slot_handler
+)
+from miniapp.routers.appointments import (
+    AppointmentFilter, BulkCancel, BulkStatusUpdate, get_appointments,
+    bulk_update_appointment_status, bulk_cancel_appointments
+)
+from miniapp.routers.schedule import HolidayRangeCreate, create_holiday_range
+from utils.query_budget import assert_max_queries
+from utils.time_utils import STREAM_BATCH_SIZE, bitmap_to_dates
+
+# Длинный горизонт для поиска ближайшего времени (записи есть на каждый его день)
+LONG_HORIZON_DAYS = 365
+
+async def first_available_date(state) -> datetime.date:
+    snapshot = (await state.get_data())["availability"]
+    return min(bitmap_to_dates(datetime.date.fromisoformat(snapshot["start"]), snapshot["bitmap"]))
+
+def first_time_slot(callback: FakeCallback) -> str:
+    return next(
+        button.callback_data
+        for row in callback.message.reply_markup.inline_keyboard
+        for button in row
+        if button.callback_data.startswith("time_")
+    )
+
+async def choose_time_and_confirm(session_pool, state, date_callback: FakeCallback) -> None:
+    callback = FakeCallback(first_time_slot(date_callback))
+    with assert_max_queries(0):
+        await time_chosen_handler(callback, state)
+    assert await state.get_state() == Booking.confirming_appointment
+
+    notifier = FakeNotifier()
+    async with session_pool() as session:
+        with assert_max_queries(7):
+            await confirm_appointment_handler(FakeCallback("confirm_appointment"), session, state, notifier)
+    assert await state.get_state() is None
+    assert len(notifier.messages) == 1
+
+async def give_user_upcoming_appointments(session) -> int:
+    """
+    Переназначает клиенту USER_TELEGRAM_ID все предстоящие подтвержденные записи,
+    чтобы бюджет проверял, что запросов не становится больше вместе с записями.
+    """
+    user_id = (await session.execute(select(User.id).where(User.telegram_id == USER_TELEGRAM_ID))).scalar_one()
+    upcoming = (Appointment.status == "confirmed", Appointment.start_time >= datetime.datetime.now(datetime.timezone.utc))
+    await session.execute(update(Appointment).where(*upcoming).values(user_id=user_id))
+    await session.commit()
+    return (await session.execute(select(func.count()).select_from(Appointment).where(*upcoming))).scalar_one()
+
+async def extend_horizon(session_pool, days: int) -> int:
+    """
+    Продлевает горизонт планирования и заполняет записями каждый его день
+    (по 4 в день, как в синтетических данных: свободное время есть уже в первый день).
+
+    Returns:
+        int: Количество записей в базе.
+    """
+    rng = random.Random(1)
+    today = datetime.date.today()
+    async with session_pool() as session:
+        await session.execute(update(Settings).values(planning_horizon_days=days))
+        service_ids = (await session.execute(select(Service.id))).scalars().all()
+        user_ids = (await session.execute(select(User.id))).scalars().all()
+        seeded_until = (await session.execute(select(func.max(Appointment.start_time)))).scalar_one().date()
+        for offset in range((seeded_until - today).days + 1, days):
+            session.add_all(generate_day_appointments(today + datetime.timedelta(days=offset), 4, service_ids, user_ids, rng))
+        await session.commit()
+        return (await session.execute(select(func.count()).select_from(Appointment))).scalar_one()
+
+@contextmanager
+def count_loaded_appointments() -> Iterator[list]:
+    """
+    Собирает записи, загруженные из БД внутри блока.
+    """
+    loaded = []
+
+    def on_load(target, context) -> None:
+        loaded.append(target.id)
+
+    event.listen(Appointment, "load", on_load)
+    try:
+        yield loaded
+    finally:
+        event.remove(Appointment, "load", on_load)
+
+async def check_nearest_slot(session_pool, state, max_queries: int) -> None:
+    callback = FakeCallback("nearest_slot")
+    async with session_pool() as session:
+        with assert_max_queries(max_queries), count_loaded_appointments() as loaded:
+            await nearest_slot_handler(callback, session, state)
+    assert await state.get_state() == Booking.confirming_appointment
+    # Записи читаются только до найденного дня (одна пачка), а не за весь горизонт
+    assert len(loaded) <= STREAM_BATCH_SIZE
+
+async def test_booking_without_masters(session_pool, state):
+    await state.set_state(Booking.choosing_service)
+
+    callback = FakeCallback("service_1")
+    async with session_pool() as session:
+        with assert_max_queries(8):
+            await service_chosen_handler(callback, session, state)
+    assert await state.get_state() == Booking.choosing_date
+
+    callback = FakeCallback(f"date_{(await first_available_date(state)).isoformat()}")
+    async with session_pool() as session:
+        with assert_max_queries(3):
+            await date_chosen_handler(callback, session, state)
+    assert await state.get_state() == Booking.choosing_time
+
+    await choose_time_and_confirm(session_pool, state, callback)
+
+async def test_booking_with_any_master(masters_session_pool, state):
+    await state.set_state(Booking.choosing_service)
+
+    callback = FakeCallback("service_1")
+    async with masters_session_pool() as session:
+        with assert_max_queries(2):
+            await service_chosen_handler(callback, session, state)
+    assert await state.get_state() == Booking.choosing_master
+
+    callback = FakeCallback("master_any")
+    async with masters_session_pool() as session:
+        with assert_max_queries(8):
+            await master_chosen_handler(callback, session, state)
+    assert await state.get_state() == Booking.choosing_date
+
+    callback = FakeCallback(f"date_{(await first_available_date(state)).isoformat()}")
+    async with masters_session_pool() as session:
+        with assert_max_queries(5):
+            await date_chosen_handler(callback, session, state)
+    assert await state.get_state() == Booking.choosing_time
+
+    await choose_time_and_confirm(masters_session_pool, state, callback)
+
+async def test_appointments_list(session_pool):
+    async with session_pool() as session:
+        with assert_max_queries(2):
+            response = await get_appointments(
+                status=None, date_from=None, date_to=None, master_id=None,
+                cursor=None, limit=100, with_total=True, session=session, user={}
+            )
+    assert isinstance(response, ORJSONResponse)
+
+async def test_my_appointments(session_pool):
+    async with session_pool() as session:
+        assert await give_user_upcoming_appointments(session) > 1
+
+    for handler in (my_appointments_handler, cancel_appointment_list_handler):
+        callback = FakeCallback("my_appointments")
+        async with session_pool() as session:
+            with assert_max_queries(2):
+                await handler(callback, session)
+        assert callback.message.reply_markup is not None
+
+async def test_cancel_appointment(session_pool):
+    async with session_pool() as session:
+        await give_user_upcoming_appointments(session)
+        appointment_id = (await session.execute(
+            select(Appointment.id).join(User).where(User.telegram_id == USER_TELEGRAM_ID).limit(1)
+        )).scalar_one()
+
+    async with session_pool() as session:
+        with assert_max_queries(2):
+            await cancel_appointment_confirm_handler(FakeCallback(f"cancel_appointment_{appointment_id}"), session)
+
+    notifier = FakeNotifier()
+    async with session_pool() as session:
+        with assert_max_queries(9):
+            await cancel_appointment_confirmed_handler(FakeCallback(f"confirm_cancel_{appointment_id}"), session, notifier)
+    assert len(notifier.messages) == 1
+
+    async with session_pool() as session:
+        assert (await session.get(Appointment, appointment_id)).status == "cancelled"
+
+async def test_bulk_status(session_pool):
+    async with session_pool() as session:
+        ids = (await session.execute(select(Appointment.id).limit(50))).scalars().all()
+        first_day = (await session.execute(select(func.min(Appointment.start_time)))).scalar_one().date()
+
+    async with session_pool() as session:
+        with assert_max_queries(9):
+            response = await bulk_update_appointment_status(BulkStatusUpdate(status="completed", ids=ids), session, {})
+    assert response.updated > 0
+
+    appointment_filter = AppointmentFilter(date_from=first_day, date_to=first_day + datetime.timedelta(days=10))
+    async with session_pool() as session:
+        with assert_max_queries(9):
+            response = await bulk_update_appointment_status(
+                BulkStatusUpdate(status="pending", filter=appointment_filter), session, {}
+            )
+    assert response.updated > 0
+
+    async with session_pool() as session:
+        with assert_max_queries(8):
+            response = await bulk_cancel_appointments(BulkCancel(ids=ids), session, {})
+    assert response.updated > 0
+
+async def test_holiday_range(session_pool):
+    date_from = datetime.date.today()
+    async with session_pool() as session:
+        with assert_max_queries(3):
+            response = await create_holiday_range(
+                HolidayRangeCreate(date_from=date_from, date_to=date_from + datetime.timedelta(days=59)), session, {}
+            )
+    assert len(response.results) == 60
+
+async def test_nearest_slot_without_masters(session_pool, state):
+    assert await extend_horizon(session_pool, LONG_HORIZON_DAYS) > 3 * STREAM_BATCH_SIZE
+
+    await state.set_state(Booking.choosing_service)
+    async with session_pool() as session:
+        await service_chosen_handler(FakeCallback("service_1"), session, state)
+
+    await check_nearest_slot(session_pool, state, 5)
+
+async def test_nearest_slot_with_any_master(masters_session_pool, state):
+    assert await extend_horizon(masters_session_pool, LONG_HORIZON_DAYS) > 3 * STREAM_BATCH_SIZE
+
+    await state.set_state(Booking.choosing_service)
+    async with masters_session_pool() as session:
+        await service_chosen_handler(FakeCallback("service_1"), session, state)
+    async with masters_session_pool() as session:
+        await master_chosen_handler(FakeCallback("master_any"), session, state)
+
+    await check_nearest_slot(masters_session_pool, state, 7)
@@ -0,0 +1,116 @@
+"""
+Жизненный цикл ресурсов салонов в многоарендном режиме.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from urllib.parse import urlencode
+
+import pytest
+from fastapi import Depends, FastAPI
+
+from config import load_config
+from miniapp.auth import verify_admin
+from miniapp.tenants import TenantApiMiddleware
+from utils.tenants import Tenant, TenantRegistry
+
+class FakeRuntime:
+    def __init__(self, tenant: Tenant):
+        self.tenant = tenant
+        self.last_used = 0.0
+        self.in_use = 0
+        self.session_pool = None
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+@pytest.fixture
+async def registry(monkeypatch):
+    tenants = [
+        Tenant(id="salon", bot_token="1:token", admin_id=1, database_url="sqlite+aiosqlite://"),
+        Tenant(id="other", bot_token="2:token", admin_id=1, database_url="sqlite+aiosqlite://"),
+    ]
+    registry = TenantRegistry({tenant.id: tenant for tenant in tenants}, load_config())
+    created = []
+
+    async def create_runtime(tenant: Tenant) -> FakeRuntime:
+        await asyncio.sleep(0.01)
+        runtime = FakeRuntime(tenant)
+        created.append(runtime)
+        return runtime
+
+    monkeypatch.setattr(registry, "_create_runtime", create_runtime)
+    registry.created = created
+    yield registry
+    await registry.session.close()
+
+async def test_transient_runtime_released_after_job(registry):
+    async with registry.use_transient("salon") as runtime:
+        assert registry._runtimes["salon"] is runtime
+    assert runtime.closed
+    assert "salon" not in registry._runtimes
+
+async def test_update_during_job_shares_runtime(registry):
+    async def job():
+        async with registry.use_transient("salon"):
+            await asyncio.sleep(0.05)
+
+    async def update():
+        async with registry.use("salon"):
+            pass
+
+    await asyncio.gather(job(), update())
+    # Один набор ресурсов, который остается до освобождения по простою
+    assert len(registry.created) == 1
+    assert registry._runtimes["salon"] is registry.created[0]
+    assert not registry.created[0].closed
+
+async def test_transient_keeps_active_runtime(registry):
+    async with registry.use("salon") as active:
+        pass
+    async with registry.use_transient("salon") as runtime:
+        assert runtime is active
+    assert not active.closed
+
+def sign_init_data(tenant: Tenant, user_id: int) -> str:
+    data = {"auth_date": str(int(time.time())), "user": json.dumps({"id": user_id})}
+    data_check_string = "\n".join(f"{k}={v}" for k, v in sorted(data.items()))
+    data["hash"] = hmac.new(tenant.web_app_secret, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urlencode(data)
+
+async def call(app, path: str, init_data: str) -> int:
+    scope = {
+        "type": "http", "method": "GET", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"authorization", f"tma {init_data}".encode())],
+        "scheme": "http", "server": ("test", 80), "client": ("test", 1), "http_version": "1.1",
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    return messages[0]["status"]
+
+async def test_api_scoped_to_tenant(registry):
+    api = FastAPI()
+
+    @api.get("/api/me")
+    async def me(user: dict = Depends(verify_admin)):
+        return user
+
+    app = TenantApiMiddleware(api, registry)
+    init_data = sign_init_data(registry.tenants["salon"], user_id=1)
+
+    assert await call(app, "/t/salon/api/me", init_data) == 200
+    # Подписанные ботом одного салона init data не принимаются другим, в том числе из кэша проверок
+    assert await call(app, "/t/other/api/me", init_data) == 403
+    assert await call(app, "/t/unknown/api/me", init_data) == 404
+    assert await call(app, "/api/me", init_data) == 404
+    assert registry._runtimes["salon"].in_use == 0
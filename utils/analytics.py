@@ -0,0 +1,170 @@
+import asyncio
+import datetime
+import logging
+from collections import defaultdict
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Appointment, DailyStats, Service
+from database.session import AsyncSessionLocal, dialect_insert
+from utils.time_utils import get_timezone, convert_to_timezone
+
+logger = logging.getLogger(__name__)
+
+STAT_FIELDS = ("bookings", "cancellations", "completed", "booked_minutes", "booked_revenue", "revenue")
+ACTIVE_STATUSES = ("pending", "confirmed", "completed")
+BACKFILL_BATCH_SIZE = 1000
+UPSERT_BATCH_SIZE = 100
+
+class StatusChange(NamedTuple):
+    """
+    Смена статуса записи для обновления дневных сводок.
+    old_status равен None для новой записи, price - стоимость на момент записи
+    (None - используется текущая цена услуги).
+    """
+    start_time: datetime.datetime
+    end_time: datetime.datetime
+    service_id: int
+    old_status: Optional[str]
+    new_status: str
+    price: Optional[float] = None
+
+def status_contribution(status: Optional[str], minutes: int, price: float) -> tuple:
+    """
+    Возвращает вклад записи с указанным статусом в поля DailyStats (в порядке STAT_FIELDS).
+
+    Args:
+        status (Optional[str]): Статус записи (None - записи нет).
+        minutes (int): Длительность записи в минутах.
+        price (float): Стоимость услуги.
+
+    Returns:
+        tuple: Значения bookings, cancellations, completed, booked_minutes, booked_revenue, revenue.
+    """
+    if status == "cancelled":
+        return (0, 1, 0, 0, 0.0, 0.0)
+    if status == "completed":
+        return (1, 0, 1, minutes, price, price)
+    if status in ACTIVE_STATUSES:
+        return (1, 0, 0, minutes, price, 0.0)
+    return (0, 0, 0, 0, 0.0, 0.0)
+
+async def upsert_deltas(session: AsyncSession, deltas: dict) -> None:
+    """
+    Прибавляет накопленные изменения к строкам DailyStats через INSERT ... ON CONFLICT.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        deltas (dict): {(день, service_id): [изменения в порядке STAT_FIELDS]}.
+    """
+    rows = [
+        {"day": day, "service_id": service_id, **dict(zip(STAT_FIELDS, values))}
+        for (day, service_id), values in deltas.items()
+        if any(values)
+    ]
+    # Пачками, чтобы не превысить лимит параметров запроса SQLite
+    for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+        insert_stmt = dialect_insert(session)(DailyStats).values(rows[i:i + UPSERT_BATCH_SIZE])
+        await session.execute(insert_stmt.on_conflict_do_update(
+            index_elements=[DailyStats.day, DailyStats.service_id],
+            set_={field: getattr(DailyStats, field) + getattr(insert_stmt.excluded, field) for field in STAT_FIELDS}
+        ))
+
+async def apply_status_changes(session: AsyncSession, changes: list[StatusChange]) -> None:
+    """
+    Обновляет дневные сводки по списку смен статуса. Изменение фиксируется
+    вместе с текущей транзакцией, поэтому вызывать нужно до session.commit().
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        changes (list[StatusChange]): Смены статусов.
+    """
+    changes = [change for change in changes if change.old_status != change.new_status]
+    if not changes:
+        return
+
+    timezone_str = await get_timezone(session)
+    # Текущие цены нужны только для записей, созданных до сохранения цены в записи
+    prices = {}
+    unpriced = {change.service_id for change in changes if change.price is None}
+    if unpriced:
+        result = await session.execute(select(Service.id, Service.price).where(Service.id.in_(unpriced)))
+        prices = dict(result.all())
+
+    deltas = defaultdict(lambda: [0] * len(STAT_FIELDS))
+    for change in changes:
+        minutes = int((change.end_time - change.start_time).total_seconds() // 60)
+        price = change.price if change.price is not None else prices.get(change.service_id, 0.0)
+        old = status_contribution(change.old_status, minutes, price)
+        new = status_contribution(change.new_status, minutes, price)
+        day = convert_to_timezone(change.start_time, timezone_str).date()
+        values = deltas[(day, change.service_id)]
+        for i in range(len(STAT_FIELDS)):
+            values[i] += new[i] - old[i]
+
+    await upsert_deltas(session, deltas)
+
+async def record_status_change(session: AsyncSession, appointment: Appointment, old_status: Optional[str], new_status: str) -> None:
+    """
+    Обновляет дневные сводки при смене статуса одной записи.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        appointment (Appointment): Запись.
+        old_status (Optional[str]): Прежний статус (None для новой записи).
+        new_status (str): Новый статус.
+    """
+    await apply_status_changes(session, [
+        StatusChange(
+            appointment.start_time, appointment.end_time, appointment.service_id,
+            old_status, new_status, appointment.price
+        )
+    ])
+
+async def rebuild_daily_stats(session: AsyncSession) -> None:
+    """
+    Полностью пересчитывает дневные сводки по всем записям (начальное заполнение
+    или восстановление после сбоя). Записи читаются пачками через серверный курсор.
+    Выручка считается по цене, сохраненной в записи, а для старых записей без нее -
+    по текущей цене услуги.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+    """
+    timezone_str = await get_timezone(session)
+    result = await session.execute(select(Service.id, Service.price))
+    prices = dict(result.all())
+
+    await session.execute(delete(DailyStats))
+
+    deltas = defaultdict(lambda: [0] * len(STAT_FIELDS))
+    stream = await session.stream(
+        select(Appointment.start_time, Appointment.end_time, Appointment.service_id, Appointment.status, Appointment.price)
+        .execution_options(yield_per=BACKFILL_BATCH_SIZE)
+    )
+    async for rows in stream.partitions():
+        for start_time, end_time, service_id, status, price in rows:
+            minutes = int((end_time - start_time).total_seconds() // 60)
+            if price is None:
+                price = prices.get(service_id, 0.0)
+            contribution = status_contribution(status, minutes, price)
+            values = deltas[(convert_to_timezone(start_time, timezone_str).date(), service_id)]
+            for i in range(len(STAT_FIELDS)):
+                values[i] += contribution[i]
+
+    await upsert_deltas(session, deltas)
+    await session.commit()
+    logger.info(f"Дневные сводки пересчитаны: {len(deltas)} строк.")
+
+async def main() -> None:
+    """
+    Пересчитывает дневные сводки (python -m utils.analytics).
+    """
+    async with AsyncSessionLocal() as session:
+        await rebuild_daily_stats(session)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+import logging
+from collections import defaultdict
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Ключ в session.info для тем, изменившихся в текущей транзакции
+PENDING_TOPICS_KEY = "cache_bus_topics"
+ALL_TOPICS = "*"
+
+class CacheBus:
+    """
+    Шина инвалидации кэшей внутри процесса.
+
+    Темы (имена таблиц из change_stamps и "events") публикуются после фиксации
+    транзакции, в которой они изменились. Подписчики - синхронные функции,
+    вызываемые в потоке цикла событий; они должны только сбрасывать кэш
+    или будить задачу. Между процессами шина не работает: в раздельном режиме
+    запуска кэши, которым нужна инвалидация, не включаются.
+    """
+    def __init__(self):
+        self._subscribers: dict[str, list[Callable[[set[str]], None]]] = defaultdict(list)
+
+    def subscribe(self, callback: Callable[[set[str]], None], *topics: str) -> None:
+        """
+        Подписывает функцию на темы (без тем - на все).
+
+        Args:
+            callback (Callable[[set[str]], None]): Функция, получающая множество изменившихся тем.
+            *topics (str): Темы.
+        """
+        for topic in topics or (ALL_TOPICS,):
+            self._subscribers[topic].append(callback)
+
+    def unsubscribe(self, callback: Callable[[set[str]], None], *topics: str) -> None:
+        """
+        Отписывает функцию от тем, на которые она была подписана через subscribe.
+
+        Args:
+            callback (Callable[[set[str]], None]): Функция подписчика.
+            *topics (str): Темы (те же, что при подписке).
+        """
+        for topic in topics or (ALL_TOPICS,):
+            if callback in self._subscribers.get(topic, ()):
+                self._subscribers[topic].remove(callback)
+
+    def publish(self, topics: Iterable[str]) -> None:
+        """
+        Уведомляет подписчиков об изменившихся темах. Каждый подписчик
+        вызывается не больше одного раза.
+
+        Args:
+            topics (Iterable[str]): Изменившиеся темы.
+        """
+        topics = set(topics)
+        callbacks = {id(callback): callback for callback in self._subscribers[ALL_TOPICS]}
+        for topic in topics:
+            callbacks.update((id(callback), callback) for callback in self._subscribers.get(topic, ()))
+        for callback in callbacks.values():
+            try:
+                callback(topics)
+            except Exception as e:
+                logger.error(f"Ошибка подписчика шины кэша: {e}")
+
+bus = CacheBus()
+
+def mark_changed(session: AsyncSession, *topics: str) -> None:
+    """
+    Отмечает темы как изменившиеся в текущей транзакции. Они будут
+    опубликованы в шину после session.commit() и отброшены при откате.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        *topics (str): Изменившиеся темы.
+    """
+    session.info.setdefault(PENDING_TOPICS_KEY, set()).update(topics)
+
+def has_pending_changes(session: AsyncSession) -> bool:
+    """
+    Возвращает True, если в текущей транзакции сессии есть незафиксированные изменения тем.
+    """
+    return bool(session.info.get(PENDING_TOPICS_KEY))
+
+@event.listens_for(Session, "after_commit")
+def _publish_after_commit(session: Session) -> None:
+    topics = session.info.pop(PENDING_TOPICS_KEY, None)
+    if topics:
+        bus.publish(topics)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(PENDING_TOPICS_KEY, None)
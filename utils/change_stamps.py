@@ -0,0 +1,104 @@
+import datetime
+from typing import Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import ChangeStamp
+from database.session import dialect_insert
+from utils.cache_bus import bus, mark_changed, has_pending_changes
+
+# Кэш get_stamp: {имена таблиц: (версия, время изменения)}. Включается только
+# в совмещенном режиме запуска, где все записи проходят через один процесс.
+_stamp_cache: Optional[dict[tuple[str, ...], tuple[int, Optional[datetime.datetime]]]] = None
+# Номер поколения кэша: увеличивается при каждом сбросе. Результат запроса
+# сохраняется, только если за время запроса сбросов не было.
+_stamp_generation = 0
+
+def enable_stamp_cache() -> None:
+    """
+    Включает кэширование версий в памяти процесса со сбросом через шину кэша.
+    Безопасно, только если таблицы не изменяются другими процессами.
+    """
+    global _stamp_cache
+    if _stamp_cache is not None:
+        return
+    _stamp_cache = {}
+
+    def invalidate(topics: set[str]) -> None:
+        global _stamp_generation
+        _stamp_generation += 1
+        for key in [key for key in _stamp_cache if topics.intersection(key)]:
+            del _stamp_cache[key]
+
+    bus.subscribe(invalidate)
+
+async def bump_version(session: AsyncSession, *names: str) -> None:
+    """
+    Увеличивает версию указанных таблиц. Изменение фиксируется вместе
+    с текущей транзакцией, поэтому вызывать нужно до session.commit().
+    Отметки создаются и увеличиваются одним INSERT ... ON CONFLICT, поэтому
+    первое изменение таблицы в параллельных транзакциях не приводит к конфликту ключа.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        *names (str): Имена изменившихся таблиц.
+    """
+    if not names:
+        return
+    now = datetime.datetime.now(datetime.timezone.utc)
+    insert_stmt = dialect_insert(session)(ChangeStamp).values(
+        [{"name": name, "version": 1, "updated_at": now} for name in names]
+    )
+    await session.execute(insert_stmt.on_conflict_do_update(
+        index_elements=[ChangeStamp.name],
+        set_={"version": ChangeStamp.version + 1, "updated_at": insert_stmt.excluded.updated_at}
+    ))
+    mark_changed(session, *names)
+
+async def get_stamp(session: AsyncSession, *names: str) -> tuple[int, Optional[datetime.datetime]]:
+    """
+    Возвращает суммарную версию и время последнего изменения указанных таблиц.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        *names (str): Имена отслеживаемых таблиц.
+
+    Returns:
+        tuple[int, Optional[datetime.datetime]]: Суммарная версия и время последнего
+        изменения в UTC (None, если таблицы еще не изменялись).
+    """
+    key = tuple(sorted(names))
+    # Внутри транзакции с незафиксированными изменениями кэш не используется
+    use_cache = _stamp_cache is not None and not has_pending_changes(session)
+    if use_cache and key in _stamp_cache:
+        return _stamp_cache[key]
+    generation = _stamp_generation
+
+    result = await session.execute(
+        select(func.coalesce(func.sum(ChangeStamp.version), 0), func.max(ChangeStamp.updated_at))
+        .where(ChangeStamp.name.in_(names))
+    )
+    version, updated_at = result.one()
+    if updated_at is not None and updated_at.tzinfo is None:
+        # SQLite не хранит часовой пояс, значения записываются в UTC
+        updated_at = updated_at.replace(tzinfo=datetime.timezone.utc)
+    # Если во время запроса зафиксировано изменение, прочитанная версия могла устареть
+    if use_cache and generation == _stamp_generation:
+        _stamp_cache[key] = (version, updated_at)
+    return version, updated_at
+
+async def get_version(session: AsyncSession, *names: str) -> int:
+    """
+    Возвращает суммарную версию указанных таблиц. Значение меняется
+    при любом изменении любой из них.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        *names (str): Имена отслеживаемых таблиц.
+
+    Returns:
+        int: Суммарная версия.
+    """
+    version, _ = await get_stamp(session, *names)
+    return version
@@ -0,0 +1,163 @@
+import asyncio
+import contextvars
+import datetime
+import json
+import logging
+from typing import Any, Callable, Optional
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Event
+from utils.cache_bus import bus, mark_changed
+
+logger = logging.getLogger(__name__)
+
+# Интервал опроса таблицы событий, в секундах
+POLL_INTERVAL = 1.0
+# Максимальное количество событий, читаемых за один опрос
+POLL_BATCH_SIZE = 100
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def record_event(session: AsyncSession, kind: str, payload: dict) -> None:
+    """
+    Добавляет событие в текущую транзакцию. Событие станет видно
+    подписчикам после session.commit().
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        kind (str): Тип события.
+        payload (dict): Данные события.
+    """
+    session.add(Event(kind=kind, payload=json.dumps(payload, default=_json_default, ensure_ascii=False)))
+    mark_changed(session, "events")
+
+async def get_events_after(session: AsyncSession, last_id: int, limit: int = POLL_BATCH_SIZE) -> list[Event]:
+    """
+    Возвращает события с id больше last_id в порядке возрастания.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        last_id (int): id последнего полученного события.
+        limit (int): Максимальное количество событий.
+
+    Returns:
+        list[Event]: Список событий.
+    """
+    result = await session.execute(
+        select(Event).where(Event.id > last_id).order_by(Event.id).limit(limit)
+    )
+    return result.scalars().all()
+
+async def get_last_event_id(session: AsyncSession) -> int:
+    """
+    Возвращает id последнего события (0, если событий нет).
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+
+    Returns:
+        int: id последнего события.
+    """
+    result = await session.execute(select(func.coalesce(func.max(Event.id), 0)))
+    return result.scalar_one()
+
+async def delete_old_events(session_pool, max_age: datetime.timedelta = datetime.timedelta(days=1)) -> None:
+    """
+    Удаляет события старше max_age.
+
+    Args:
+        session_pool: Фабрика асинхронных сессий.
+        max_age (datetime.timedelta): Максимальный возраст события.
+    """
+    threshold = datetime.datetime.now(datetime.timezone.utc) - max_age
+    async with session_pool() as session:
+        result = await session.execute(delete(Event).where(Event.created_at < threshold))
+        await session.commit()
+    if result.rowcount:
+        logger.info(f"Удалено устаревших событий: {result.rowcount}")
+
+class EventBroadcaster:
+    """
+    Рассылает новые события из таблицы events подписчикам внутри процесса.
+
+    Одна фоновая задача опрашивает таблицу по возрастанию id (дешевый диапазонный
+    запрос по первичному ключу) независимо от количества подписчиков. Задача
+    запускается при появлении первого подписчика и останавливается после ухода последнего.
+    """
+    def __init__(self, session_pool: Callable[[], AsyncSession], poll_interval: float = POLL_INTERVAL):
+        self.session_pool = session_pool
+        self.poll_interval = poll_interval
+        self.last_id = 0
+        self._subscribers: set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        # События, записанные в этом же процессе, читаются сразу, не дожидаясь опроса
+        self._wakeup = asyncio.Event()
+        bus.subscribe(self._on_change, "events")
+
+    def _on_change(self, topics: set[str]) -> None:
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """
+        Останавливает опрос и отписывается от шины (для рассылки базы салона,
+        ресурсы которого освобождаются в многоарендном режиме).
+        """
+        bus.unsubscribe(self._on_change, "events")
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def subscribe(self) -> asyncio.Queue:
+        """
+        Регистрирует подписчика.
+
+        Returns:
+            asyncio.Queue: Очередь, в которую будут поступать новые события.
+        """
+        if self._task is None:
+            async with self.session_pool() as session:
+                last_id = await get_last_event_id(session)
+            # Пока шел запрос, опрос мог запустить другой подписчик
+            if self._task is None:
+                self.last_id = last_id
+                # Чистый контекст: иначе опрос унаследует трассу и бюджет запросов первого подписчика
+                self._task = asyncio.create_task(self._poll(), context=contextvars.Context())
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """
+        Удаляет подписчика и останавливает опрос, если подписчиков не осталось.
+
+        Args:
+            queue (asyncio.Queue): Очередь, полученная из subscribe().
+        """
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                async with self.session_pool() as session:
+                    events = await get_events_after(session, self.last_id)
+                for event in events:
+                    for queue in self._subscribers:
+                        queue.put_nowait(event)
+                    self.last_id = event.id
+                if len(events) == POLL_BATCH_SIZE:
+                    continue
+            except Exception as e:
+                logger.error(f"Ошибка при чтении событий: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
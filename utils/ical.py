@@ -0,0 +1,119 @@
+import datetime
+from typing import Optional
+
+CRLF = "\r\n"
+
+CALENDAR_HEADER = CRLF.join((
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "PRODID:-//NailBot//Appointments//RU",
+    "CALSCALE:GREGORIAN",
+    "METHOD:PUBLISH",
+    "X-WR-CALNAME:Записи",
+)) + CRLF
+
+CALENDAR_FOOTER = "END:VCALENDAR" + CRLF
+
+STATUS_MAP = {
+    "pending": "TENTATIVE",
+    "confirmed": "CONFIRMED",
+    "completed": "CONFIRMED",
+    "cancelled": "CANCELLED",
+}
+
+def escape_text(value: str) -> str:
+    """
+    Экранирует текстовое значение по RFC 5545.
+
+    Args:
+        value (str): Исходный текст.
+
+    Returns:
+        str: Экранированный текст.
+    """
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+def fold_line(line: str) -> str:
+    """
+    Переносит строку длиннее 75 октетов по RFC 5545 и добавляет CRLF.
+
+    Args:
+        line (str): Строка контента.
+
+    Returns:
+        str: Строка с переносами, оканчивающаяся CRLF.
+    """
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + CRLF
+
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Не разрываем многобайтовые символы UTF-8
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74  # с учетом ведущего пробела в строке продолжения
+    return (CRLF + " ").join(parts) + CRLF
+
+def format_utc(dt: datetime.datetime) -> str:
+    """
+    Форматирует datetime в формате UTC для iCalendar (например, 20240101T090000Z).
+
+    Args:
+        dt (datetime.datetime): Время (наивное значение считается UTC).
+
+    Returns:
+        str: Время в формате iCalendar.
+    """
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(datetime.timezone.utc)
+    return dt.strftime("%Y%m%dT%H%M%SZ")
+
+def format_vevent(
+    uid: str,
+    summary: str,
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    status: str,
+    created_at: Optional[datetime.datetime] = None,
+    description: str = ""
+) -> str:
+    """
+    Формирует компонент VEVENT для записи.
+
+    Args:
+        uid (str): Уникальный идентификатор события.
+        summary (str): Заголовок события.
+        start_time (datetime.datetime): Время начала (UTC).
+        end_time (datetime.datetime): Время окончания (UTC).
+        status (str): Статус записи ('pending', 'confirmed', 'cancelled', 'completed').
+        created_at (Optional[datetime.datetime]): Время создания записи.
+        description (str, optional): Описание события.
+
+    Returns:
+        str: Текст компонента VEVENT.
+    """
+    stamp = format_utc(created_at or start_time)
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{format_utc(start_time)}",
+        f"DTEND:{format_utc(end_time)}",
+        f"SUMMARY:{escape_text(summary)}",
+        f"STATUS:{STATUS_MAP.get(status, 'CONFIRMED')}",
+    ]
+    if description:
+        lines.append(f"DESCRIPTION:{escape_text(description)}")
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) for line in lines)
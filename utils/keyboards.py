@@ -1,8 +1,15 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ReplyKeyboardMarkup, KeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder, ReplyKeyboardBuilder
 
-from database.models import Service
+from database.models import Service, Master
+import calendar
 import datetime
+from functools import lru_cache
+from typing import Iterable
+
+from utils.metrics import track_lru_cache
+
+WEEKDAY_NAMES = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс")
 
 def main_menu_keyboard() -> InlineKeyboardMarkup:
     """
@@ -43,6 +50,23 @@ def services_keyboard(services: list[Service]) -> InlineKeyboardMarkup:
     builder.row(InlineKeyboardButton(text="Назад в главное меню", callback_data="back_to_main_menu"))
     return builder.as_markup()
 
+def masters_keyboard(masters: list[Master]) -> InlineKeyboardMarkup:
+    """
+    Создает инлайн-клавиатуру выбора мастера с вариантом "Любой мастер".
+
+    Args:
+        masters (list[Master]): Список активных мастеров.
+
+    Returns:
+        InlineKeyboardMarkup: Инлайн-клавиатура со списком мастеров.
+    """
+    builder = InlineKeyboardBuilder()
+    builder.row(InlineKeyboardButton(text="Любой мастер", callback_data="master_any"))
+    for master in masters:
+        builder.row(InlineKeyboardButton(text=master.name, callback_data=f"master_{master.id}"))
+    builder.row(InlineKeyboardButton(text="Назад в главное меню", callback_data="back_to_main_menu"))
+    return builder.as_markup()
+
 def appointments_keyboard(appointments: list) -> InlineKeyboardMarkup:
     """
     Создает инлайн-клавиатуру со списком записей и кнопками для отмены.
@@ -81,58 +105,77 @@ def confirmation_cancel_keyboard(appointment_id: int) -> InlineKeyboardMarkup:
     )
     return builder.as_markup()
 
-def calendar_keyboard(year: int, month: int, available_dates: list[datetime.date]) -> InlineKeyboardMarkup:
+def month_availability_bitmap(year: int, month: int, available_dates: Iterable[datetime.date]) -> int:
+    """
+    Упаковывает доступные даты месяца в битовую маску (бит day-1 соответствует дню day).
+    Прошедшие даты в маску не попадают.
+
+    Args:
+        year (int): Год.
+        month (int): Месяц.
+        available_dates (Iterable[datetime.date]): Доступные для записи даты.
+
+    Returns:
+        int: Битовая маска доступных дней месяца.
+    """
+    today = datetime.date.today()
+    bitmap = 0
+    for date in available_dates:
+        if date.year == year and date.month == month and date >= today:
+            bitmap |= 1 << (date.day - 1)
+    return bitmap
+
+def calendar_keyboard(year: int, month: int, available_dates: Iterable[datetime.date]) -> InlineKeyboardMarkup:
     """
     Создает инлайн-клавиатуру с календарем для выбора даты.
 
+    Готовая клавиатура кэшируется по ключу (год, месяц, битовая маска доступности),
+    поэтому повторная отрисовка того же месяца не пересобирает сетку.
+
     Args:
         year (int): Год для отображения.
         month (int): Месяц для отображения.
-        available_dates (list[datetime.date]): Список доступных для записи дат.
+        available_dates (Iterable[datetime.date]): Доступные для записи даты.
+
+    Returns:
+        InlineKeyboardMarkup: Инлайн-клавиатура календаря.
+    """
+    return render_calendar_keyboard(year, month, month_availability_bitmap(year, month, available_dates))
+
+@lru_cache(maxsize=256)
+def render_calendar_keyboard(year: int, month: int, bitmap: int) -> InlineKeyboardMarkup:
+    """
+    Строит клавиатуру календаря по битовой маске доступных дней (с кэшированием).
+
+    Args:
+        year (int): Год для отображения.
+        month (int): Месяц для отображения.
+        bitmap (int): Битовая маска доступных дней (см. month_availability_bitmap).
 
     Returns:
         InlineKeyboardMarkup: Инлайн-клавиатура календаря.
     """
     builder = InlineKeyboardBuilder()
-    today = datetime.date.today()
+    first_day_of_month = datetime.date(year, month, 1)
 
     # Заголовок с месяцем и годом
-    builder.row(InlineKeyboardButton(text=f"{datetime.date(year, month, 1).strftime('%B %Y')}", callback_data="ignore"))
+    builder.row(InlineKeyboardButton(text=f"{first_day_of_month.strftime('%B %Y')}", callback_data="ignore"))
 
     # Дни недели
-    builder.row(
-        InlineKeyboardButton(text="Пн", callback_data="ignore"),
-        InlineKeyboardButton(text="Вт", callback_data="ignore"),
-        InlineKeyboardButton(text="Ср", callback_data="ignore"),
-        InlineKeyboardButton(text="Чт", callback_data="ignore"),
-        InlineKeyboardButton(text="Пт", callback_data="ignore"),
-        InlineKeyboardButton(text="Сб", callback_data="ignore"),
-        InlineKeyboardButton(text="Вс", callback_data="ignore")
-    )
+    builder.row(*(InlineKeyboardButton(text=name, callback_data="ignore") for name in WEEKDAY_NAMES))
 
-    # Дни месяца
-    first_day_of_month = datetime.date(year, month, 1)
-    # Определяем, с какого дня недели начинается месяц (0=Пн, 6=Вс)
-    # Python's weekday() returns 0 for Monday, 6 for Sunday
-    # We want to start our calendar grid on Monday, so we need to adjust
-    start_offset = first_day_of_month.weekday()
+    # Дни месяца. weekday() возвращает 0 для понедельника, сетка начинается с понедельника
+    start_offset, days_in_month = calendar.monthrange(year, month)
 
     # Заполняем пустые клетки до первого дня месяца
-    row_buttons = []
-    for _ in range(start_offset):
-        row_buttons.append(InlineKeyboardButton(text=" ", callback_data="ignore"))
-
-    if month == 12:
-        days_in_month = 31
-    else:
-        days_in_month = (datetime.date(year, month + 1, 1) - datetime.timedelta(days=1)).day
+    row_buttons = [InlineKeyboardButton(text=" ", callback_data="ignore") for _ in range(start_offset)]
 
     for day in range(1, days_in_month + 1):
-        current_date = datetime.date(year, month, day)
-        if current_date in available_dates and current_date >= today:
-            row_buttons.append(InlineKeyboardButton(text=str(day), callback_data=f"date_{current_date.isoformat()}"))
+        if bitmap >> (day - 1) & 1:
+            callback_data = f"date_{year:04d}-{month:02d}-{day:02d}"
         else:
-            row_buttons.append(InlineKeyboardButton(text=str(day), callback_data="ignore"))
+            callback_data = "ignore"
+        row_buttons.append(InlineKeyboardButton(text=str(day), callback_data=callback_data))
 
         if len(row_buttons) == 7:
             builder.row(*row_buttons)
@@ -141,6 +184,8 @@ def calendar_keyboard(year: int, month: int, available_dates: list[datetime.date
     if row_buttons:
         builder.row(*row_buttons)
 
+    builder.row(InlineKeyboardButton(text="Ближайшее свободное время", callback_data="nearest_slot"))
+
     # Кнопки навигации по месяцам
     prev_month = first_day_of_month - datetime.timedelta(days=1)
     next_month = first_day_of_month + datetime.timedelta(days=days_in_month)
@@ -153,12 +198,25 @@ def calendar_keyboard(year: int, month: int, available_dates: list[datetime.date
 
     return builder.as_markup()
 
-def time_slots_keyboard(time_slots: list[datetime.time]) -> InlineKeyboardMarkup:
+def time_slots_keyboard(time_slots: Iterable[datetime.time]) -> InlineKeyboardMarkup:
     """
     Создает инлайн-клавиатуру с доступными временными слотами.
 
     Args:
-        time_slots (list[datetime.time]): Список доступных временных слотов.
+        time_slots (Iterable[datetime.time]): Доступные временные слоты.
+
+    Returns:
+        InlineKeyboardMarkup: Инлайн-клавиатура временных слотов.
+    """
+    return render_time_slots_keyboard(tuple(time_slots))
+
+@lru_cache(maxsize=256)
+def render_time_slots_keyboard(time_slots: tuple[datetime.time, ...]) -> InlineKeyboardMarkup:
+    """
+    Строит клавиатуру временных слотов (с кэшированием по набору слотов).
+
+    Args:
+        time_slots (tuple[datetime.time, ...]): Доступные временные слоты.
 
     Returns:
         InlineKeyboardMarkup: Инлайн-клавиатура временных слотов.
@@ -187,3 +245,6 @@ def confirmation_keyboard() -> InlineKeyboardMarkup:
         InlineKeyboardButton(text="Отменить", callback_data="cancel_appointment_creation")
     )
     return builder.as_markup()
+
+track_lru_cache("calendar_keyboard", render_calendar_keyboard)
+track_lru_cache("time_slots_keyboard", render_time_slots_keyboard)
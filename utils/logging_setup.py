@@ -0,0 +1,94 @@
+import atexit
+import copy
+import datetime
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from config import load_config
+from utils.tracing import current_trace_id
+
+config = load_config()
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+# uvicorn настраивает собственные обработчики до импорта приложения
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: Optional[QueueListener] = None
+
+class JsonFormatter(logging.Formatter):
+    """
+    Форматирует запись лога как одну строку JSON.
+    """
+    def __init__(self, service_name: str):
+        super().__init__()
+        self.service_name = service_name
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "service": self.service_name,
+            "message": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            entry["trace_id"] = trace_id
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler, который в потоке вызывающего только подставляет аргументы
+    в сообщение и запоминает текст исключения и идентификатор трассы.
+    Форматирование и запись выполняются в фоновом потоке QueueListener.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        record.trace_id = current_trace_id()
+        return record
+
+def setup_logging(service_name: str) -> None:
+    """
+    Настраивает неблокирующее логирование: все логгеры пишут в очередь,
+    а фоновый поток выводит записи в stderr (текстом или JSON при LOG_JSON=true).
+    Задержки вывода (например, переполненный journald) не останавливают цикл событий.
+
+    Args:
+        service_name (str): Имя сервиса для JSON-записей ("bot" или "miniapp").
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter(service_name) if config.logging.json else logging.Formatter(TEXT_FORMAT))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(NonBlockingQueueHandler(log_queue))
+    root.setLevel(config.logging.level)
+
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    for name, level in config.logging.levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Дописываем оставшиеся записи при завершении процесса
+    atexit.register(_listener.stop)
@@ -0,0 +1,239 @@
+import datetime
+import heapq
+from collections import defaultdict
+from typing import Iterable, Optional, Union
+
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.models import Master, MasterSchedule, MasterHoliday, WorkSchedule, Holiday, Appointment
+from utils.time_utils import (
+    get_planning_horizon, get_timezone, get_current_time_in_timezone,
+    get_available_time_slots, as_date
+)
+
+DaySchedule = Union[WorkSchedule, MasterSchedule]
+
+async def get_active_masters(session: AsyncSession) -> list[Master]:
+    """
+    Возвращает список мастеров, принимающих записи.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+
+    Returns:
+        list[Master]: Список активных мастеров, упорядоченный по имени.
+    """
+    result = await session.execute(select(Master).where(Master.active == True).order_by(Master.name, Master.id))
+    return result.scalars().all()
+
+async def get_master_schedules(session: AsyncSession, master_ids: Iterable[int]) -> dict[int, dict[int, DaySchedule]]:
+    """
+    Строит недельное расписание каждого мастера: строки MasterSchedule
+    перекрывают общее расписание салона (WorkSchedule) для своих дней недели.
+    Выполняет два запроса независимо от числа мастеров.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        master_ids (Iterable[int]): ID мастеров.
+
+    Returns:
+        dict[int, dict[int, DaySchedule]]: {ID мастера: {день недели: расписание}}.
+    """
+    master_ids = list(master_ids)
+    salon = (await session.execute(select(WorkSchedule))).scalars().all()
+    schedules = {master_id: {row.weekday: row for row in salon} for master_id in master_ids}
+
+    result = await session.execute(select(MasterSchedule).where(MasterSchedule.master_id.in_(master_ids)))
+    for row in result.scalars():
+        schedules[row.master_id][row.weekday] = row
+    return schedules
+
+async def get_master_available_dates(session: AsyncSession, master_ids: Iterable[int]) -> dict[int, set[datetime.date]]:
+    """
+    Возвращает доступные для записи даты каждого мастера на горизонте планирования.
+
+    Расписания, общие выходные и выходные мастеров загружаются по одному разу,
+    после чего даты каждого мастера считаются в памяти: число запросов
+    не зависит ни от числа мастеров, ни от длины горизонта.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        master_ids (Iterable[int]): ID мастеров.
+
+    Returns:
+        dict[int, set[datetime.date]]: {ID мастера: множество доступных дат}.
+    """
+    master_ids = list(master_ids)
+    planning_horizon = await get_planning_horizon(session)
+    timezone_str = await get_timezone(session)
+    today = get_current_time_in_timezone(timezone_str).date()
+    horizon = [today + datetime.timedelta(days=i) for i in range(planning_horizon)]
+
+    schedules = await get_master_schedules(session, master_ids)
+    salon_holidays = {as_date(value) for value in (await session.execute(select(Holiday.date))).scalars()}
+    master_holidays: dict[int, set[datetime.date]] = defaultdict(set)
+    result = await session.execute(
+        select(MasterHoliday.master_id, MasterHoliday.date)
+        .where(MasterHoliday.master_id.in_(master_ids), MasterHoliday.date >= today)
+    )
+    for master_id, date in result:
+        master_holidays[master_id].add(date)
+
+    available: dict[int, set[datetime.date]] = {}
+    for master_id in master_ids:
+        working_weekdays = {weekday for weekday, row in schedules[master_id].items() if row.is_working}
+        days_off = master_holidays[master_id]
+        available[master_id] = {
+            date for date in horizon
+            if date.weekday() in working_weekdays and date not in salon_holidays and date not in days_off
+        }
+    return available
+
+async def get_master_time_slots(
+    session: AsyncSession,
+    master_ids: Iterable[int],
+    date: datetime.date,
+    service_duration: int,
+    timezone_str: str
+) -> tuple[dict[int, list[datetime.time]], dict[int, int]]:
+    """
+    Рассчитывает свободное время каждого мастера на день.
+
+    Записи всех мастеров за день загружаются одним запросом (индекс
+    ix_appointments_master_id_start_time) и раскладываются по мастерам.
+    Записи без мастера (созданные до появления мастеров) занимают время всех мастеров.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        master_ids (Iterable[int]): ID мастеров.
+        date (datetime.date): Дата.
+        service_duration (int): Длительность услуги в минутах.
+        timezone_str (str): Часовой пояс.
+
+    Returns:
+        tuple[dict[int, list[datetime.time]], dict[int, int]]: Свободные слоты
+            каждого мастера и число его записей на этот день (загрузка).
+    """
+    master_ids = list(master_ids)
+    schedules = await get_master_schedules(session, master_ids)
+    result = await session.execute(
+        select(MasterHoliday.master_id)
+        .where(MasterHoliday.master_id.in_(master_ids), MasterHoliday.date == date)
+    )
+    days_off = set(result.scalars())
+
+    start_of_day = datetime.datetime.combine(date, datetime.time.min)
+    end_of_day = datetime.datetime.combine(date, datetime.time.max)
+    result = await session.execute(
+        select(Appointment)
+        .where(
+            Appointment.start_time >= start_of_day,
+            Appointment.start_time <= end_of_day,
+            Appointment.status != "cancelled",
+            master_appointments_filter(master_ids),
+        )
+        .order_by(Appointment.start_time)
+    )
+    return compute_master_slots(
+        master_ids, schedules, days_off, result.scalars().all(), date, service_duration, timezone_str
+    )
+
+def master_appointments_filter(master_ids: Iterable[int]):
+    """
+    Условие отбора записей, занимающих время мастеров: их собственные записи и записи без мастера.
+    """
+    return or_(Appointment.master_id.in_(list(master_ids)), Appointment.master_id.is_(None))
+
+def compute_master_slots(
+    master_ids: list[int],
+    schedules: dict[int, dict[int, DaySchedule]],
+    days_off: set[int],
+    appointments: Iterable[Appointment],
+    date: datetime.date,
+    service_duration: int,
+    timezone_str: str
+) -> tuple[dict[int, list[datetime.time]], dict[int, int]]:
+    """
+    Раскладывает записи дня по мастерам и рассчитывает свободные слоты каждого.
+
+    Args:
+        master_ids (list[int]): ID мастеров.
+        schedules (dict[int, dict[int, DaySchedule]]): Расписания из get_master_schedules.
+        days_off (set[int]): ID мастеров, у которых этот день выходной.
+        appointments (Iterable[Appointment]): Записи дня (мастеров и без мастера).
+        date (datetime.date): Дата.
+        service_duration (int): Длительность услуги в минутах.
+        timezone_str (str): Часовой пояс.
+
+    Returns:
+        tuple[dict[int, list[datetime.time]], dict[int, int]]: Свободные слоты и загрузка мастеров.
+    """
+    shared: list[Appointment] = []
+    by_master: dict[int, list[Appointment]] = defaultdict(list)
+    for appointment in appointments:
+        if appointment.master_id is None:
+            shared.append(appointment)
+        else:
+            by_master[appointment.master_id].append(appointment)
+
+    slots: dict[int, list[datetime.time]] = {}
+    load: dict[int, int] = {}
+    for master_id in master_ids:
+        schedule: Optional[DaySchedule] = schedules[master_id].get(date.weekday())
+        if master_id in days_off:
+            schedule = None
+        slots[master_id] = get_available_time_slots(
+            schedule, shared + by_master[master_id], service_duration, date, timezone_str
+        )
+        load[master_id] = len(by_master[master_id])
+    return slots, load
+
+async def get_master_holidays(
+    session: AsyncSession,
+    master_ids: Iterable[int],
+    date_from: datetime.date
+) -> dict[datetime.date, set[int]]:
+    """
+    Возвращает выходные мастеров начиная с даты одним запросом.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        master_ids (Iterable[int]): ID мастеров.
+        date_from (datetime.date): Начальная дата.
+
+    Returns:
+        dict[datetime.date, set[int]]: {дата: ID мастеров, у которых она выходная}.
+    """
+    result = await session.execute(
+        select(MasterHoliday.master_id, MasterHoliday.date)
+        .where(MasterHoliday.master_id.in_(list(master_ids)), MasterHoliday.date >= date_from)
+    )
+    holidays: dict[datetime.date, set[int]] = defaultdict(set)
+    for master_id, date in result:
+        holidays[date].add(master_id)
+    return holidays
+
+def merge_free_slots(slots: dict[int, list[datetime.time]], load: dict[int, int]) -> dict[datetime.time, int]:
+    """
+    Объединяет свободные слоты мастеров для режима "любой мастер".
+
+    Отсортированные списки слотов сливаются через heapq.merge за O(N log M)
+    (N - всего слотов, M - мастеров). Если время свободно у нескольких мастеров,
+    слот достается наименее загруженному в этот день, при равенстве - с меньшим ID.
+
+    Args:
+        slots (dict[int, list[datetime.time]]): Свободные слоты каждого мастера (по возрастанию).
+        load (dict[int, int]): Число записей каждого мастера на день.
+
+    Returns:
+        dict[datetime.time, int]: {время: ID мастера}, упорядоченный по времени.
+    """
+    streams = [
+        [(time, load.get(master_id, 0), master_id) for time in times]
+        for master_id, times in slots.items()
+    ]
+    merged: dict[datetime.time, int] = {}
+    for time, _, master_id in heapq.merge(*streams):
+        merged.setdefault(time, master_id)
+    return merged
@@ -79,6 +79,8 @@ MASTER_CANCELLED_APPOINTMENT_MESSAGE = """
 Время: {time}
 """
 
+ADMIN_DIGEST_HEADER = "Сводка событий ({count}):"
+
 REMINDER_24H_MESSAGE = """
 Напоминание!
 
@@ -0,0 +1,272 @@
+import asyncio
+import datetime
+import logging
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Optional
+
+from apscheduler.events import EVENT_JOB_SUBMITTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        # Последний элемент - наблюдения больше всех границ (+Inf)
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+class _Metric(ABC):
+    """
+    Метрика с набором меток. Дочерние объекты для каждой комбинации значений меток
+    создаются один раз, поэтому запись значения не выделяет память.
+    """
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict = {}
+        REGISTRY.append(self)
+
+    @abstractmethod
+    def _new_child(self):
+        """
+        Создает дочерний объект для новой комбинации значений меток.
+        """
+
+    def labels(self, *values):
+        """
+        Возвращает дочерний объект для значений меток (в порядке labelnames).
+        """
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._new_child()
+        return child
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        """
+        Возвращает строки значений метрики в текстовом формате Prometheus (без HELP/TYPE).
+        """
+
+class Counter(_Metric):
+    """
+    Монотонно возрастающий счетчик.
+    """
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_number(child.value)}"
+            for values, child in self._children.items()
+        ]
+
+class Histogram(_Metric):
+    """
+    Гистограмма распределения значений (например, длительностей в секундах).
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def render(self) -> list[str]:
+        lines = []
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, f'le="{_format_number(float(bound))}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_number(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+REGISTRY: list[_Metric] = []
+# Функции, обновляющие значения метрик непосредственно перед выгрузкой
+_scrape_hooks: list[Callable[[], None]] = []
+
+BOT_UPDATE_DURATION = Histogram(
+    "bot_update_duration_seconds", "Время обработки обновления обработчиком бота.", ("handler",)
+)
+BOT_UPDATE_ERRORS = Counter(
+    "bot_update_errors_total", "Количество исключений в обработчиках бота.", ("handler",)
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса.", ("method", "route", "status")
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds", "Время выполнения SQL-запросов.", ("operation",)
+)
+TELEGRAM_API_DURATION = Histogram(
+    "telegram_api_duration_seconds", "Время вызова методов Telegram Bot API.", ("method",)
+)
+TELEGRAM_API_ERRORS = Counter(
+    "telegram_api_errors_total", "Количество ошибок вызовов Telegram Bot API.", ("method", "error")
+)
+SCHEDULER_JOB_LAG = Histogram(
+    "scheduler_job_lag_seconds", "Задержка запуска задачи планировщика относительно расписания.",
+    ("job",), buckets=LAG_BUCKETS
+)
+SCHEDULER_JOB_ERRORS = Counter(
+    "scheduler_job_errors_total", "Количество ошибок и пропусков задач планировщика.", ("job", "kind")
+)
+CACHE_HITS = Counter("cache_hits_total", "Количество попаданий в кэш.", ("cache",))
+CACHE_MISSES = Counter("cache_misses_total", "Количество промахов кэша.", ("cache",))
+
+def render_metrics() -> str:
+    """
+    Выгружает все метрики в текстовом формате Prometheus.
+
+    Returns:
+        str: Содержимое ответа для эндпоинта /metrics.
+    """
+    for hook in _scrape_hooks:
+        hook()
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+def track_lru_cache(name: str, cached_function) -> None:
+    """
+    Публикует статистику functools.lru_cache как метрики cache_hits_total/cache_misses_total.
+
+    Args:
+        name (str): Значение метки cache.
+        cached_function: Функция, обернутая в lru_cache.
+    """
+    hits, misses = CACHE_HITS.labels(name), CACHE_MISSES.labels(name)
+
+    def update() -> None:
+        info = cached_function.cache_info()
+        hits.value, misses.value = info.hits, info.misses
+
+    _scrape_hooks.append(update)
+
+def _statement_operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[:1]
+    return keyword[0].upper() if keyword else "OTHER"
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Подключает учет количества и длительности SQL-запросов к движку.
+
+    Args:
+        engine (AsyncEngine): Асинхронный движок SQLAlchemy.
+    """
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_started_at = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._metrics_started_at
+        DB_QUERY_DURATION.labels(_statement_operation(statement)).observe(elapsed)
+
+def instrument_scheduler(scheduler) -> None:
+    """
+    Подключает учет задержки запуска, ошибок и пропусков задач планировщика.
+
+    Args:
+        scheduler: Планировщик APScheduler.
+    """
+    def listener(job_event) -> None:
+        if job_event.code == EVENT_JOB_SUBMITTED:
+            now = datetime.datetime.now(datetime.timezone.utc)
+            for scheduled in job_event.scheduled_run_times:
+                SCHEDULER_JOB_LAG.labels(job_event.job_id).observe(max((now - scheduled).total_seconds(), 0.0))
+        elif job_event.code == EVENT_JOB_ERROR:
+            SCHEDULER_JOB_ERRORS.labels(job_event.job_id, "error").inc()
+        else:
+            SCHEDULER_JOB_ERRORS.labels(job_event.job_id, "missed").inc()
+
+    scheduler.add_listener(listener, EVENT_JOB_SUBMITTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED)
+
+async def _handle_metrics_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        # Заголовки запроса не нужны, дочитываем их до пустой строки
+        while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+            pass
+
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+            status, content_type, body = "200 OK", CONTENT_TYPE, render_metrics().encode()
+        else:
+            status, content_type, body = "404 Not Found", "text/plain; charset=utf-8", b"Not Found\n"
+
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+async def start_metrics_server(host: str, port: int) -> Optional[asyncio.AbstractServer]:
+    """
+    Запускает HTTP-сервер, отдающий метрики по адресу /metrics (для процесса бота).
+
+    Args:
+        host (str): Адрес для прослушивания.
+        port (int): Порт (0 - сервер не запускается).
+
+    Returns:
+        Optional[asyncio.AbstractServer]: Запущенный сервер или None.
+    """
+    if not port:
+        return None
+    server = await asyncio.start_server(_handle_metrics_connection, host, port)
+    logger.info(f"Метрики доступны по адресу http://{host}:{port}/metrics")
+    return server
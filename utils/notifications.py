@@ -0,0 +1,119 @@
+import asyncio
+import contextvars
+import logging
+from typing import Optional
+
+from aiogram import Bot
+
+from utils.messages import ADMIN_DIGEST_HEADER
+
+logger = logging.getLogger(__name__)
+
+# Максимальная длина сообщения в Telegram
+MAX_MESSAGE_LENGTH = 4096
+DIGEST_SEPARATOR = "\n--------------------\n"
+
+class AdminNotifier:
+    """
+    Буфер уведомлений администратору.
+
+    Уведомления ставятся в очередь и отправляются фоновой задачей, поэтому
+    обработчики не ждут ответа Telegram. Если с момента последней отправки
+    прошло больше окна `window` секунд, событие уходит сразу. Иначе все события,
+    накопленные до конца окна, объединяются в одно сообщение-сводку.
+    """
+    def __init__(self, bot: Bot, admin_id: int, window: float = 60):
+        self.bot = bot
+        self.admin_id = admin_id
+        self.window = window
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        # Уведомления, взятые из очереди и ожидающие конца окна (сохраняются при остановке)
+        self._pending: list[str] = []
+        self._last_sent: Optional[float] = None
+
+    def notify(self, text: str) -> None:
+        """
+        Ставит уведомление в очередь на отправку. Не блокирует вызывающего.
+
+        Args:
+            text (str): Текст уведомления.
+        """
+        self._queue.put_nowait(text)
+
+    def start(self) -> None:
+        """
+        Запускает фоновую задачу отправки уведомлений.
+        """
+        if self._task is None:
+            # Чистый контекст: в многоарендном режиме буфер создается во время обработки
+            # обновления, и задача не должна унаследовать его трассу и бюджет запросов
+            self._task = asyncio.create_task(self._worker(), context=contextvars.Context())
+
+    async def stop(self) -> None:
+        """
+        Останавливает фоновую задачу и отправляет оставшиеся уведомления.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        batch, self._pending = self._drain(self._pending), []
+        await self._send(batch)
+
+    def _drain(self, batch: list[str]) -> list[str]:
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._pending.append(await self._queue.get())
+            if self._last_sent is not None:
+                delay = self._last_sent + self.window - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            batch, self._pending = self._drain(self._pending), []
+            await self._send(batch)
+            self._last_sent = loop.time()
+
+    async def _send(self, batch: list[str]) -> None:
+        if not batch:
+            return
+
+        if len(batch) == 1:
+            chunks = [batch[0]]
+        else:
+            chunks = build_digest(batch)
+
+        for chunk in chunks:
+            try:
+                await self.bot.send_message(chat_id=self.admin_id, text=chunk)
+            except Exception as e:
+                logger.error(f"Не удалось отправить уведомление администратору: {e}")
+
+def build_digest(events: list[str]) -> list[str]:
+    """
+    Объединяет события в сводку, разбивая ее на сообщения допустимой длины.
+
+    Args:
+        events (list[str]): Тексты событий.
+
+    Returns:
+        list[str]: Список сообщений-сводок.
+    """
+    header = ADMIN_DIGEST_HEADER.format(count=len(events))
+    chunks = []
+    current = header
+    for event in events:
+        event = event[:MAX_MESSAGE_LENGTH - len(header) - len(DIGEST_SEPARATOR)]
+        if len(current) + len(DIGEST_SEPARATOR) + len(event) > MAX_MESSAGE_LENGTH:
+            chunks.append(current)
+            current = header
+        current += DIGEST_SEPARATOR + event
+    chunks.append(current)
+    return chunks
@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+# Ограничение глубины стека, чтобы один образец не стоил слишком дорого
+MAX_STACK_DEPTH = 128
+OTHER_LABEL = "other"
+
+class SamplingProfiler:
+    """
+    Семплирующий профилировщик цикла событий.
+
+    Пока идет профилирование, фоновый поток через заданный интервал снимает стек
+    потока цикла событий и считает одинаковые стеки. Каждый образец относится
+    к обработчику или маршруту, если его функция есть в стеке (см. code_labels).
+    Результат - файл в формате collapsed stacks (flamegraph.pl, speedscope).
+    Вне профилирования профилировщик ничего не делает.
+    """
+    def __init__(self, labels: Optional[dict[CodeType, str]] = None, interval: float = 0.005):
+        self.labels = labels or {}
+        self.interval = interval
+        self._frame_names: dict[CodeType, str] = {}
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def _frame_name(self, code: CodeType) -> str:
+        name = self._frame_names.get(code)
+        if name is None:
+            try:
+                filename = Path(code.co_filename).resolve().relative_to(PROJECT_DIR).as_posix()
+            except ValueError:
+                filename = Path(code.co_filename).name
+            name = self._frame_names[code] = f"{code.co_qualname}({filename}:{code.co_firstlineno})"
+        return name
+
+    def _collapse(self, frame: Optional[FrameType]) -> str:
+        names = []
+        label = None
+        while frame is not None and len(names) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            # Ближайший к вершине стека обработчик точнее всего описывает образец
+            if label is None:
+                label = self.labels.get(code)
+            names.append(self._frame_name(code))
+            frame = frame.f_back
+        names.append(label or OTHER_LABEL)
+        names.reverse()
+        return ";".join(names)
+
+    def _sample(self, thread_id: int, duration: float, stacks: Counter) -> None:
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                stacks[self._collapse(frame)] += 1
+            del frame
+            time.sleep(self.interval)
+
+    async def profile(self, duration: float) -> str:
+        """
+        Профилирует текущий цикл событий в течение duration секунд.
+
+        Args:
+            duration (float): Длительность профилирования в секундах.
+
+        Returns:
+            str: Стеки в формате collapsed ("корень;...;функция количество" в каждой строке).
+
+        Raises:
+            RuntimeError: Если профилирование уже идет.
+        """
+        if self._running:
+            raise RuntimeError("Профилирование уже запущено")
+        self._running = True
+        try:
+            stacks: Counter = Counter()
+            logger.info(f"Запуск профилирования на {duration} с")
+            await asyncio.to_thread(self._sample, threading.get_ident(), duration, stacks)
+            logger.info(f"Профилирование завершено: {sum(stacks.values())} образцов")
+            return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        finally:
+            self._running = False
+
+def code_labels(prefix: str, named_callables: Iterable[tuple[str, object]]) -> dict[CodeType, str]:
+    """
+    Строит соответствие объектов кода функций меткам для атрибуции образцов.
+
+    Args:
+        prefix (str): Префикс метки (например, "handler" или "route").
+        named_callables (Iterable[tuple[str, object]]): Пары (имя, функция).
+
+    Returns:
+        dict[CodeType, str]: {объект кода: "префикс:имя"}.
+    """
+    labels = {}
+    for name, func in named_callables:
+        code = getattr(getattr(func, "__wrapped__", func), "__code__", None)
+        if code is not None:
+            labels[code] = f"{prefix}:{name}"
+    return labels
@@ -0,0 +1,127 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from utils.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_EXCEEDED = Counter(
+    "query_budget_exceeded_total", "Количество обновлений и запросов, превысивших бюджет SQL-запросов.", ("scope",)
+)
+
+@dataclass
+class QueryStats:
+    """
+    Статистика SQL-запросов в пределах одного обновления или HTTP-запроса.
+
+    Attributes:
+        count (int): Количество выполненных запросов.
+        duration (float): Суммарное время выполнения в секундах.
+        statements (list[str]): Тексты запросов (только если включен сбор текстов).
+    """
+    count: int = 0
+    duration: float = 0.0
+    statements: Optional[list[str]] = field(default=None, repr=False)
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def instrument_query_budget(engine: AsyncEngine) -> None:
+    """
+    Подключает подсчет SQL-запросов движка в текущей статистике (см. track_queries).
+    Контекст asyncio-задачи передается SQLAlchemy в синхронные обработчики событий,
+    поэтому запросы разных обновлений не смешиваются.
+
+    Args:
+        engine (AsyncEngine): Асинхронный движок SQLAlchemy.
+    """
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._budget_started_at = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        if stats is None:
+            return
+        stats.count += 1
+        stats.duration += time.perf_counter() - context._budget_started_at
+        if stats.statements is not None:
+            stats.statements.append(statement)
+
+@contextmanager
+def track_queries(collect_statements: bool = False) -> Iterator[QueryStats]:
+    """
+    Считает SQL-запросы, выполненные внутри блока. Вложенные блоки
+    добавляют свою статистику к внешнему.
+
+    Args:
+        collect_statements (bool): Сохранять ли тексты запросов.
+
+    Yields:
+        QueryStats: Статистика, обновляемая по мере выполнения запросов.
+    """
+    stats = QueryStats(statements=[] if collect_statements else None)
+    parent = _current_stats.get()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+        if parent is not None:
+            parent.count += stats.count
+            parent.duration += stats.duration
+            if parent.statements is not None and stats.statements is not None:
+                parent.statements.extend(stats.statements)
+
+def check_budget(scope: str, stats: QueryStats, max_queries: int, max_duration: float) -> bool:
+    """
+    Проверяет статистику на превышение бюджета и пишет предупреждение в лог.
+
+    Args:
+        scope (str): Имя обработчика или маршрута (для лога и метрики).
+        stats (QueryStats): Статистика запросов.
+        max_queries (int): Допустимое количество запросов (0 - без ограничения).
+        max_duration (float): Допустимое суммарное время в секундах (0 - без ограничения).
+
+    Returns:
+        bool: True, если бюджет не превышен.
+    """
+    exceeded = (max_queries and stats.count > max_queries) or (max_duration and stats.duration > max_duration)
+    if not exceeded:
+        return True
+    QUERY_BUDGET_EXCEEDED.labels(scope).inc()
+    logger.warning(
+        f"Превышен бюджет SQL-запросов в {scope}: {stats.count} запросов "
+        f"(лимит {max_queries}), {stats.duration * 1000:.1f} мс (лимит {max_duration * 1000:.0f} мс)"
+    )
+    return False
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Хелпер для тестов: завершается AssertionError, если внутри блока выполнено
+    больше max_queries SQL-запросов. Текст ошибки содержит все запросы,
+    что упрощает поиск N+1.
+
+    Пример:
+        with assert_max_queries(3):
+            await service_chosen_handler(callback, state, session)
+
+    Args:
+        max_queries (int): Допустимое количество запросов.
+
+    Yields:
+        QueryStats: Статистика запросов блока.
+    """
+    with track_queries(collect_statements=True) as stats:
+        yield stats
+    if stats.count > max_queries:
+        statements = "\n".join(f"  {i}. {statement}" for i, statement in enumerate(stats.statements, start=1))
+        raise AssertionError(f"Выполнено {stats.count} SQL-запросов, допустимо {max_queries}:\n{statements}")
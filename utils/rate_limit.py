@@ -0,0 +1,74 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+class TokenBucketLimiter:
+    """
+    Ограничитель частоты запросов на основе корзин токенов (token bucket) по ключу.
+
+    Каждая корзина вмещает до `burst` токенов и пополняется со скоростью `rate`
+    токенов в секунду; запрос расходует один токен. Проверка выполняется за O(1).
+    Корзины хранятся в порядке последнего обращения, поэтому простаивающие
+    корзины удаляются с начала словаря по ходу обычных проверок (ленивое вытеснение).
+    """
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        # Корзина, простоявшая дольше этого времени, полностью пополнена и не нужна
+        self.idle_ttl = burst / rate if rate > 0 else math.inf
+        self._buckets: OrderedDict[Hashable, list[float]] = OrderedDict()
+
+    def allow(self, key: Hashable) -> bool:
+        """
+        Проверяет, можно ли выполнить запрос, и расходует токен.
+
+        Args:
+            key (Hashable): Ключ корзины (например, ID пользователя или IP-адрес).
+
+        Returns:
+            bool: True, если запрос разрешен.
+        """
+        return self.retry_after(key) == 0
+
+    def retry_after(self, key: Hashable) -> float:
+        """
+        Расходует токен, если он есть, и возвращает 0. Иначе возвращает
+        время в секундах до появления следующего токена.
+
+        Args:
+            key (Hashable): Ключ корзины.
+
+        Returns:
+            float: 0, если запрос разрешен, иначе время ожидания в секундах.
+        """
+        now = self.clock()
+        self._evict_idle(now)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [float(self.burst), now]
+            self._buckets[key] = bucket
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0
+        return (1 - bucket[0]) / self.rate if self.rate > 0 else math.inf
+
+    def _evict_idle(self, now: float) -> None:
+        # Удаляем не более двух корзин за вызов, чтобы сохранить O(1)
+        for _ in range(2):
+            if not self._buckets:
+                return
+            key, bucket = next(iter(self._buckets.items()))
+            if now - bucket[1] < self.idle_ttl:
+                return
+            del self._buckets[key]
+
+    def __len__(self) -> int:
+        return len(self._buckets)
@@ -9,6 +9,8 @@ from sqlalchemy.orm import selectinload
 
 from database.models import Appointment
 from config import load_config
+from utils.events import delete_old_events
+from utils.tenants import TenantRegistry, TenantRuntime
 
 logger = logging.getLogger(__name__)
 config = load_config()
@@ -91,3 +93,62 @@ def setup_scheduler(scheduler: AsyncIOScheduler, bot: Bot, session_pool):
         id='appointment_reminders'
     )
     logger.info("Задача для проверки напоминаний добавлена в планировщик.")
+
+    scheduler.add_job(
+        delete_old_events,
+        'interval',
+        hours=1,
+        args=(session_pool,),
+        id='events_cleanup'
+    )
+    logger.info("Задача для очистки ленты событий добавлена в планировщик.")
+
+async def tenant_reminders(runtime: TenantRuntime) -> None:
+    """
+    Отправляет напоминания клиентам одного салона.
+    """
+    await check_upcoming_appointments(runtime.bot, runtime.session_pool)
+
+async def tenant_events_cleanup(runtime: TenantRuntime) -> None:
+    """
+    Очищает ленту событий одного салона.
+    """
+    await delete_old_events(runtime.session_pool)
+
+async def run_for_tenants(registry: TenantRegistry, job) -> None:
+    """
+    Выполняет задачу для каждого салона по очереди. Ошибка в одном салоне
+    не прерывает остальные. Задача не продлевает время жизни ресурсов салона:
+    ресурсы простаивающего салона создаются только на время задачи.
+
+    Args:
+        registry (TenantRegistry): Реестр салонов.
+        job: Асинхронная функция, принимающая TenantRuntime.
+    """
+    for tenant_id in list(registry.tenants):
+        try:
+            async with registry.use_transient(tenant_id) as runtime:
+                await job(runtime)
+        except Exception as e:
+            logger.error(f"Салон {tenant_id}: ошибка задачи {job.__name__}: {e}")
+
+def setup_tenant_scheduler(scheduler: AsyncIOScheduler, registry: TenantRegistry):
+    """
+    Настраивает задачи планировщика для многоарендного режима: одна задача
+    на все салоны вместо задачи на каждый салон.
+    """
+    scheduler.add_job(
+        run_for_tenants,
+        'interval',
+        minutes=30,
+        args=(registry, tenant_reminders),
+        id='appointment_reminders'
+    )
+    scheduler.add_job(
+        run_for_tenants,
+        'interval',
+        hours=1,
+        args=(registry, tenant_events_cleanup),
+        id='events_cleanup'
+    )
+    logger.info(f"Задачи планировщика добавлены для {len(registry.tenants)} салонов.")
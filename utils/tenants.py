@@ -0,0 +1,343 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import re
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.enums import ParseMode
+from aiogram.webhook.aiohttp_server import BaseRequestHandler
+from aiohttp import web
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from config import Config
+from database.session import create_database_engine, create_session_pool, init_db
+from database.init_db import create_initial_data
+from utils.events import EventBroadcaster
+from utils.notifications import AdminNotifier
+
+logger = logging.getLogger(__name__)
+
+TENANT_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+WEBHOOK_PATH = "/webhook/{tenant_id}"
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+@dataclass(frozen=True)
+class Tenant:
+    """
+    Салон в многоарендном режиме.
+
+    Attributes:
+        id (str): Идентификатор салона (используется в пути вебхука и имени файла БД).
+        bot_token (str): Токен бота салона.
+        admin_id (int): Telegram ID администратора салона.
+        database_url (str): URL базы данных салона.
+        calendar_feed_token (str): Токен iCalendar-ленты салона (пустая строка - лента отключена).
+    """
+    id: str
+    bot_token: str
+    admin_id: int
+    database_url: str
+    calendar_feed_token: str = ""
+
+    @property
+    def bot_id(self) -> int:
+        return int(self.bot_token.split(":", 1)[0])
+
+    @property
+    def webhook_secret(self) -> str:
+        # Секрет выводится из токена, поэтому его не нужно хранить отдельно
+        return hmac.new(self.bot_token.encode(), b"webhook", hashlib.sha256).hexdigest()
+
+    @property
+    def web_app_secret(self) -> bytes:
+        # Ключ проверки init data мини-приложения этого бота (как SECRET_KEY в miniapp/auth.py)
+        return hmac.new(b"WebAppData", self.bot_token.encode(), hashlib.sha256).digest()
+
+def load_tenants(path: str, database_url_template: str) -> dict[str, Tenant]:
+    """
+    Загружает список салонов из JSON-файла вида
+    [{"id": "salon-1", "bot_token": "...", "admin_id": 123, "database_url": "...", "calendar_feed_token": "..."}].
+    Если database_url не указан, он строится по шаблону TENANT_DATABASE_URL.
+
+    Args:
+        path (str): Путь к файлу.
+        database_url_template (str): Шаблон URL базы данных с подстановкой {tenant_id}.
+
+    Returns:
+        dict[str, Tenant]: {ID салона: салон}.
+
+    Raises:
+        ValueError: Если ID салона некорректен или повторяется.
+    """
+    tenants: dict[str, Tenant] = {}
+    for item in json.loads(Path(path).read_text(encoding="utf-8")):
+        tenant_id = str(item["id"])
+        if not TENANT_ID_PATTERN.match(tenant_id):
+            raise ValueError(f"Некорректный ID салона: {tenant_id!r}")
+        if tenant_id in tenants:
+            raise ValueError(f"ID салона повторяется: {tenant_id}")
+        tenants[tenant_id] = Tenant(
+            id=tenant_id,
+            bot_token=item["bot_token"],
+            admin_id=int(item["admin_id"]),
+            database_url=item.get("database_url") or database_url_template.format(tenant_id=tenant_id),
+            calendar_feed_token=item.get("calendar_feed_token", ""),
+        )
+    return tenants
+
+class TenantRuntime:
+    """
+    Ресурсы салона, которые создаются при первом обращении и освобождаются
+    после простоя: движок БД с пулом соединений, буфер уведомлений администратору
+    и (при подключении к живой ленте API) рассылка событий.
+    """
+    def __init__(self, tenant: Tenant, bot: Bot, engine: AsyncEngine, notify_window: float):
+        self.tenant = tenant
+        self.bot = bot
+        self.engine = engine
+        self.session_pool: async_sessionmaker[AsyncSession] = create_session_pool(engine)
+        self.admin_notifier = AdminNotifier(bot, tenant.admin_id, window=notify_window)
+        self.last_used = 0.0
+        self.in_use = 0
+        self._broadcaster: Optional[EventBroadcaster] = None
+
+    @property
+    def broadcaster(self) -> EventBroadcaster:
+        """
+        Рассылка событий живой ленты салона (создается при первом подписчике).
+        """
+        if self._broadcaster is None:
+            self._broadcaster = EventBroadcaster(self.session_pool)
+        return self._broadcaster
+
+    async def close(self) -> None:
+        if self._broadcaster is not None:
+            self._broadcaster.close()
+        await self.admin_notifier.stop()
+        await self.engine.dispose()
+
+class TenantRegistry:
+    """
+    Реестр салонов многоарендного режима.
+
+    Боты всех салонов используют одну HTTP-сессию aiohttp. Движок БД и буфер
+    уведомлений салона создаются при первом обновлении и освобождаются, если
+    обновлений не было дольше idle_ttl секунд, так что простаивающий салон
+    занимает в памяти только запись реестра и объект Bot.
+    """
+    def __init__(self, tenants: dict[str, Tenant], config: Config):
+        self.tenants = tenants
+        self.idle_ttl = config.tenants.idle_ttl
+        self.notify_window = config.notifications.admin_digest_window
+        self.session = AiohttpSession()
+        self._tenant_by_bot = {tenant.bot_id: tenant.id for tenant in tenants.values()}
+        self._bots: dict[str, Bot] = {}
+        self._runtimes: dict[str, TenantRuntime] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._initialized: set[str] = set()
+        self._evict_task: Optional[asyncio.Task] = None
+
+    def tenant_for_bot(self, bot_id: int) -> Optional[str]:
+        """
+        Возвращает ID салона по ID бота (None, если бот не зарегистрирован).
+        """
+        return self._tenant_by_bot.get(bot_id)
+
+    def bot(self, tenant_id: str) -> Bot:
+        """
+        Возвращает бота салона (объект создается один раз и использует общую HTTP-сессию).
+
+        Raises:
+            KeyError: Если салон не найден.
+        """
+        bot = self._bots.get(tenant_id)
+        if bot is None:
+            tenant = self.tenants[tenant_id]
+            bot = self._bots[tenant_id] = Bot(tenant.bot_token, session=self.session, parse_mode=ParseMode.HTML)
+        return bot
+
+    async def _create_runtime(self, tenant: Tenant) -> TenantRuntime:
+        url = make_url(tenant.database_url)
+        if url.get_backend_name() == "sqlite" and url.database:
+            Path(url.database).parent.mkdir(parents=True, exist_ok=True)
+
+        runtime = TenantRuntime(tenant, self.bot(tenant.id), create_database_engine(tenant.database_url), self.notify_window)
+        if tenant.id not in self._initialized:
+            # Схема и начальные данные проверяются один раз за время жизни процесса
+            await init_db(runtime.engine)
+            async with runtime.session_pool() as session:
+                await create_initial_data(session, tenant.admin_id)
+            self._initialized.add(tenant.id)
+        runtime.admin_notifier.start()
+        logger.debug(f"Салон {tenant.id}: ресурсы созданы")
+        return runtime
+
+    async def _acquire(self, tenant_id: str) -> TenantRuntime:
+        """
+        Возвращает ресурсы салона, создавая их под блокировкой салона, так что
+        у салона никогда не бывает двух движков и буферов уведомлений одновременно.
+        Счетчик использования увеличивается до первой точки переключения.
+        """
+        runtime = self._runtimes.get(tenant_id)
+        if runtime is None:
+            tenant = self.tenants[tenant_id]
+            lock = self._locks.setdefault(tenant_id, asyncio.Lock())
+            async with lock:
+                runtime = self._runtimes.get(tenant_id)
+                if runtime is None:
+                    runtime = self._runtimes[tenant_id] = await self._create_runtime(tenant)
+        runtime.in_use += 1
+        return runtime
+
+    @asynccontextmanager
+    async def use(self, tenant_id: str) -> AsyncIterator[TenantRuntime]:
+        """
+        Выдает ресурсы салона для обработки обновления, при необходимости создавая их,
+        и продлевает время их жизни. Пока блок выполняется, ресурсы не освобождаются.
+
+        Args:
+            tenant_id (str): ID салона.
+
+        Yields:
+            TenantRuntime: Ресурсы салона.
+
+        Raises:
+            KeyError: Если салон не найден.
+        """
+        runtime = await self._acquire(tenant_id)
+        runtime.last_used = time.monotonic()
+        try:
+            yield runtime
+        finally:
+            runtime.in_use -= 1
+
+    @asynccontextmanager
+    async def use_transient(self, tenant_id: str) -> AsyncIterator[TenantRuntime]:
+        """
+        Выдает ресурсы салона для фоновой задачи без продления времени их жизни.
+        Ресурсы, которые ни разу не использовались для обработки обновлений
+        (созданы только для фоновых задач), освобождаются сразу после последнего
+        такого блока, так что обход всех салонов не держит их в памяти.
+
+        Args:
+            tenant_id (str): ID салона.
+
+        Yields:
+            TenantRuntime: Ресурсы салона.
+
+        Raises:
+            KeyError: Если салон не найден.
+        """
+        runtime = await self._acquire(tenant_id)
+        try:
+            yield runtime
+        finally:
+            runtime.in_use -= 1
+            # Если за это время пришло обновление, ресурсы остаются до обычного освобождения по простою
+            if runtime.in_use == 0 and runtime.last_used == 0 and self._runtimes.get(tenant_id) is runtime:
+                del self._runtimes[tenant_id]
+                await runtime.close()
+
+    async def evict_idle(self) -> int:
+        """
+        Освобождает ресурсы салонов, простаивающих дольше idle_ttl.
+
+        Returns:
+            int: Количество освобожденных салонов.
+        """
+        deadline = time.monotonic() - self.idle_ttl
+        idle = [
+            tenant_id for tenant_id, runtime in self._runtimes.items()
+            if runtime.in_use == 0 and runtime.last_used < deadline
+        ]
+        for tenant_id in idle:
+            runtime = self._runtimes.pop(tenant_id)
+            self._locks.pop(tenant_id, None)
+            await runtime.close()
+        if idle:
+            logger.info(f"Освобождены ресурсы простаивающих салонов: {len(idle)}, активных: {len(self._runtimes)}")
+        return len(idle)
+
+    async def _evict_loop(self) -> None:
+        while True:
+            await asyncio.sleep(max(self.idle_ttl / 2, 1))
+            try:
+                await self.evict_idle()
+            except Exception as e:
+                logger.error(f"Ошибка освобождения ресурсов салонов: {e}")
+
+    def start(self) -> None:
+        """
+        Запускает фоновое освобождение ресурсов простаивающих салонов.
+        """
+        if self._evict_task is None:
+            self._evict_task = asyncio.create_task(self._evict_loop())
+
+    async def close(self) -> None:
+        """
+        Останавливает фоновую задачу, освобождает ресурсы всех салонов и закрывает HTTP-сессию.
+        """
+        if self._evict_task is not None:
+            self._evict_task.cancel()
+            try:
+                await self._evict_task
+            except asyncio.CancelledError:
+                pass
+            self._evict_task = None
+        for runtime in self._runtimes.values():
+            await runtime.close()
+        self._runtimes.clear()
+        await self.session.close()
+
+    async def set_webhooks(self, base_url: str, allowed_updates: list[str]) -> None:
+        """
+        Регистрирует вебхуки ботов всех салонов. Ресурсы салонов при этом не создаются.
+
+        Args:
+            base_url (str): Внешний адрес сервера вебхуков.
+            allowed_updates (list[str]): Типы обновлений, которые обрабатывает диспетчер.
+        """
+        for tenant in self.tenants.values():
+            try:
+                await self.bot(tenant.id).set_webhook(
+                    f"{base_url}{WEBHOOK_PATH.format(tenant_id=tenant.id)}",
+                    secret_token=tenant.webhook_secret,
+                    allowed_updates=allowed_updates,
+                )
+            except Exception as e:
+                logger.error(f"Салон {tenant.id}: не удалось установить вебхук: {e}")
+        logger.info(f"Вебхуки установлены для {len(self.tenants)} салонов")
+
+class TenantRequestHandler(BaseRequestHandler):
+    """
+    Обработчик вебхуков многоарендного режима: один путь /webhook/{tenant_id}
+    для всех салонов. Бот выбирается по ID салона из пути, запрос проверяется
+    по секретному заголовку салона до создания его ресурсов.
+    """
+    def __init__(self, dispatcher: Dispatcher, registry: TenantRegistry, **data):
+        super().__init__(dispatcher=dispatcher, handle_in_background=True, **data)
+        self.registry = registry
+
+    async def close(self) -> None:
+        await self.registry.close()
+
+    async def resolve_bot(self, request: web.Request) -> Bot:
+        tenant = self.registry.tenants.get(request.match_info.get("tenant_id", ""))
+        if tenant is None:
+            raise web.HTTPNotFound()
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), tenant.webhook_secret):
+            raise web.HTTPUnauthorized()
+        return self.registry.bot(tenant.id)
+
+    def verify_secret(self, telegram_secret_token: str, bot: Bot) -> bool:
+        # Секрет уже проверен в resolve_bot
+        return True
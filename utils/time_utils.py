@@ -1,5 +1,5 @@
 import datetime
-from typing import Optional
+from typing import AsyncIterator, Iterable, Optional
 
 import pytz
 from sqlalchemy import select
@@ -7,6 +7,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.models import WorkSchedule, Holiday, Settings, Appointment
 
+# Размер пачки строк при потоковом чтении записей по дням
+STREAM_BATCH_SIZE = 100
+
 async def get_timezone(session: AsyncSession) -> str:
     """
     Извлекает часовой пояс из настроек базы данных.
@@ -64,6 +67,61 @@ async def is_holiday(session: AsyncSession, date: datetime.date) -> bool:
     holiday = result.scalar_one_or_none()
     return holiday is not None
 
+def dates_to_bitmap(start: datetime.date, dates: set[datetime.date]) -> int:
+    """
+    Упаковывает множество дат в битовую маску относительно начальной даты
+    (бит i соответствует дате start + i дней).
+
+    Args:
+        start (datetime.date): Начальная дата.
+        dates (set[datetime.date]): Множество дат (даты раньше start игнорируются).
+
+    Returns:
+        int: Битовая маска.
+    """
+    bitmap = 0
+    for date in dates:
+        offset = (date - start).days
+        if offset >= 0:
+            bitmap |= 1 << offset
+    return bitmap
+
+def bitmap_to_dates(start: datetime.date, bitmap: int) -> set[datetime.date]:
+    """
+    Распаковывает битовую маску, построенную dates_to_bitmap, обратно в множество дат.
+
+    Args:
+        start (datetime.date): Начальная дата.
+        bitmap (int): Битовая маска.
+
+    Returns:
+        set[datetime.date]: Множество дат.
+    """
+    dates = set()
+    offset = 0
+    while bitmap:
+        if bitmap & 1:
+            dates.add(start + datetime.timedelta(days=offset))
+        bitmap >>= 1
+        offset += 1
+    return dates
+
+def as_date(value: datetime.date | datetime.datetime | str) -> datetime.date:
+    """
+    Приводит значение Holiday.date к datetime.date (в SQLite колонка хранится строкой).
+
+    Args:
+        value (datetime.date | datetime.datetime | str): Значение из базы данных.
+
+    Returns:
+        datetime.date: Дата.
+    """
+    if isinstance(value, str):
+        return datetime.date.fromisoformat(value[:10])
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
 def convert_to_timezone(dt: datetime.datetime, tz_name: str) -> datetime.datetime:
     """
     Конвертирует datetime объект в указанный часовой пояс.
@@ -135,6 +193,73 @@ async def get_appointments_for_day(session: AsyncSession, date: datetime.date) -
     )
     return result.scalars().all()
 
+def as_utc(dt: datetime.datetime) -> datetime.datetime:
+    """
+    Приводит время из базы данных к aware UTC (SQLite не хранит часовой пояс, значения записываются в UTC).
+    """
+    return dt.replace(tzinfo=pytz.utc) if dt.tzinfo is None else dt
+
+async def stream_appointments_by_day(
+    session: AsyncSession,
+    dates: Iterable[datetime.date],
+    timezone_str: str,
+    *criteria
+) -> AsyncIterator[tuple[datetime.date, list[Appointment]]]:
+    """
+    Выдает для каждой даты (по возрастанию) записи, пересекающиеся с этим днем.
+
+    Записи читаются одним запросом по индексу start_time в порядке start_time
+    пачками по STREAM_BATCH_SIZE и только по мере перебора дат: если перебор
+    прерван, записи после последнего просмотренного дня не загружаются.
+    Генератор нужно закрывать (contextlib.aclosing), чтобы освободить курсор.
+
+    Args:
+        session (AsyncSession): Асинхронная сессия базы данных.
+        dates (Iterable[datetime.date]): Даты.
+        timezone_str (str): Часовой пояс, в котором считаются границы дней.
+        *criteria: Дополнительные условия отбора записей.
+
+    Yields:
+        tuple[datetime.date, list[Appointment]]: Дата и ее записи.
+    """
+    dates = sorted(dates)
+    if not dates:
+        return
+
+    tz = pytz.timezone(timezone_str)
+
+    def day_start(date: datetime.date) -> datetime.datetime:
+        return tz.localize(datetime.datetime.combine(date, datetime.time.min)).astimezone(pytz.utc)
+
+    result = await session.stream_scalars(
+        select(Appointment)
+        .where(Appointment.start_time >= day_start(dates[0]).replace(tzinfo=None), *criteria)
+        .order_by(Appointment.start_time, Appointment.id)
+        .execution_options(yield_per=STREAM_BATCH_SIZE)
+    )
+    try:
+        buffered: list[Appointment] = []
+        lookahead: Optional[Appointment] = None
+        exhausted = False
+        for date in dates:
+            start = day_start(date)
+            end = day_start(date + datetime.timedelta(days=1))
+            while not exhausted:
+                if lookahead is None:
+                    lookahead = await anext(result, None)
+                    if lookahead is None:
+                        exhausted = True
+                        break
+                if as_utc(lookahead.start_time) >= end:
+                    break
+                buffered.append(lookahead)
+                lookahead = None
+            # Записи, закончившиеся до начала дня, больше не понадобятся
+            buffered = [appointment for appointment in buffered if as_utc(appointment.end_time) > start]
+            yield date, [appointment for appointment in buffered if as_utc(appointment.start_time) < end]
+    finally:
+        await result.close()
+
 def get_available_time_slots(
     schedule: WorkSchedule,
     appointments: list[Appointment],
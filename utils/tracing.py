@@ -0,0 +1,198 @@
+import atexit
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import load_config
+
+logger = logging.getLogger(__name__)
+config = load_config()
+
+# Текст SQL-запроса в теге span обрезается до этой длины
+MAX_STATEMENT_LENGTH = 500
+
+class Span:
+    """
+    Участок трассы: обработчик, SQL-запрос или вызов Bot API.
+    """
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "timestamp", "started_ns", "duration", "tags")
+
+    def __init__(self, trace: "Trace", name: str, kind: Optional[str], parent_id: Optional[str], tags: dict):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.timestamp = time.time_ns() // 1000
+        self.started_ns = time.perf_counter_ns()
+        self.duration: Optional[int] = None
+        self.tags = tags
+
+    def set_tag(self, key: str, value) -> None:
+        self.tags[key] = str(value)
+
+    def finish(self) -> None:
+        self.duration = max((time.perf_counter_ns() - self.started_ns) // 1000, 1)
+        self.trace.spans.append(self)
+
+    def to_zipkin(self, service_name: str) -> dict:
+        span = {
+            "traceId": self.trace.trace_id,
+            "id": self.span_id,
+            "name": self.name,
+            "timestamp": self.timestamp,
+            "duration": self.duration,
+            "localEndpoint": {"serviceName": service_name},
+            "tags": self.tags,
+        }
+        if self.parent_id:
+            span["parentId"] = self.parent_id
+        if self.kind:
+            span["kind"] = self.kind
+        return span
+
+class Trace:
+    """
+    Трасса одного обновления или HTTP-запроса: идентификатор и завершенные участки.
+    """
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.spans: list[Span] = []
+
+class FileExporter:
+    """
+    Записывает трассы в файл в формате Zipkin v2 JSON: одна строка - массив
+    участков одной трассы. Файл можно загрузить в Zipkin или Jaeger (POST /api/v2/spans).
+    """
+    def __init__(self, path: str, service_name: str):
+        self.service_name = service_name
+        self._file = open(path, "a", encoding="utf-8", buffering=64 * 1024)
+        atexit.register(self.close)
+
+    def export(self, trace: Trace) -> None:
+        self._file.write(json.dumps(
+            [span.to_zipkin(self.service_name) for span in trace.spans], ensure_ascii=False
+        ) + "\n")
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+_exporter: Optional[FileExporter] = None
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def configure_tracing(service_name: str) -> None:
+    """
+    Включает трассировку процесса, если задана доля трассируемых запросов (TRACING_SAMPLE_RATE > 0).
+
+    Args:
+        service_name (str): Имя сервиса в трассах ("bot" или "miniapp").
+    """
+    global _exporter
+    if config.tracing.sample_rate <= 0 or _exporter is not None:
+        return
+    _exporter = FileExporter(config.tracing.file, service_name)
+    logger.info(f"Трассировка включена: {config.tracing.sample_rate:.0%} запросов, файл {config.tracing.file}")
+
+def current_trace_id() -> Optional[str]:
+    """
+    Возвращает идентификатор текущей трассы (None, если запрос не трассируется).
+    """
+    span = _current_span.get()
+    return span.trace.trace_id if span is not None else None
+
+@contextmanager
+def start_trace(name: str, kind: Optional[str] = None, **tags) -> Iterator[Optional[Span]]:
+    """
+    Начинает трассу с корневым участком, если трассировка включена и запрос попал в выборку.
+    По завершении блока трасса передается экспортеру.
+
+    Args:
+        name (str): Имя корневого участка.
+        kind (Optional[str]): Тип участка Zipkin (SERVER, CLIENT и т. д.).
+        **tags: Теги участка.
+
+    Yields:
+        Optional[Span]: Корневой участок или None, если запрос не трассируется.
+    """
+    if _exporter is None or random.random() >= config.tracing.sample_rate:
+        yield None
+        return
+
+    root = Span(Trace(), name, kind, None, {key: str(value) for key, value in tags.items()})
+    token = _current_span.set(root)
+    try:
+        yield root
+    except Exception as e:
+        root.set_tag("error", type(e).__name__)
+        raise
+    finally:
+        _current_span.reset(token)
+        root.finish()
+        try:
+            _exporter.export(root.trace)
+        except Exception as e:
+            logger.error(f"Не удалось записать трассу: {e}")
+
+def start_span(name: str, kind: Optional[str] = None, **tags) -> Optional[Span]:
+    """
+    Открывает дочерний участок текущей трассы, не делая его текущим
+    (для участков без вложенных, например SQL-запросов). Завершается вызовом finish().
+
+    Returns:
+        Optional[Span]: Участок или None, если запрос не трассируется.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, kind, parent.span_id, tags)
+
+@contextmanager
+def span(name: str, kind: Optional[str] = None, **tags) -> Iterator[Optional[Span]]:
+    """
+    Оборачивает блок в дочерний участок текущей трассы.
+
+    Yields:
+        Optional[Span]: Участок или None, если запрос не трассируется.
+    """
+    child = start_span(name, kind, **{key: str(value) for key, value in tags.items()})
+    if child is None:
+        yield None
+        return
+
+    token = _current_span.set(child)
+    try:
+        yield child
+    except Exception as e:
+        child.set_tag("error", type(e).__name__)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.finish()
+
+def instrument_tracing(engine: AsyncEngine) -> None:
+    """
+    Добавляет участок трассы для каждого SQL-запроса движка.
+
+    Args:
+        engine (AsyncEngine): Асинхронный движок SQLAlchemy.
+    """
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._trace_span = start_span("sql", "CLIENT")
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        sql_span = context._trace_span
+        if sql_span is not None:
+            sql_span.tags["sql.query"] = statement[:MAX_STATEMENT_LENGTH]
+            sql_span.finish()